@@ -1,75 +1,9 @@
 from django.contrib import admin
-from django.contrib.auth.models import User
-from django.contrib.auth.admin import UserAdmin
 from django.db.models import Count
-from django.core.exceptions import PermissionDenied
-from django.template.response import TemplateResponse
-from django.urls import path, reverse
-from .models import ArticleCategory, Article, News, Page, ContactMessage, FAQ, Tag
-from jobs.models import JobVacancy, JobLocation, Category as JobCategory, Skill, JobApplication
-from users.models import JobSeekerProfile, EmployerProfile
-
-# Переопределяем view административной главной страницы для подсчета статистики
-class CustomAdminSite(admin.AdminSite):
-    site_header = "Панель администратора службы занятости"
-    site_title = "Администрирование сайта"
-    index_title = "Управление сайтом"
-    
-    def _build_app_dict(self, request, label=None):
-        """
-        Переопределяем метод для добавления правильных URL
-        """
-        app_dict = super()._build_app_dict(request, label)
-        return app_dict
-    
-    def get_app_list(self, request):
-        """
-        Возвращаем список приложений, включая модели и URL для админки
-        """
-        # Сначала получаем стандартный список приложений
-        app_dict = self._build_app_dict(request)
-        app_list = sorted(app_dict.values(), key=lambda x: x['name'].lower())
-        
-        return app_list
-    
-    def index(self, request, extra_context=None):
-        if not request.user.is_staff:
-            raise PermissionDenied
-        
-        # Статистика для главной страницы админки
-        vacancy_count = JobVacancy.objects.count()
-        user_count = User.objects.count()
-        employer_count = EmployerProfile.objects.count()
-        jobseeker_count = JobSeekerProfile.objects.count()
-        article_count = Article.objects.count()
-        news_count = News.objects.count()
-        message_count = ContactMessage.objects.count()
-        
-        context = {
-            'vacancy_count': vacancy_count,
-            'user_count': user_count,
-            'employer_count': employer_count,
-            'jobseeker_count': jobseeker_count,
-            'article_count': article_count,
-            'news_count': news_count,
-            'content_count': article_count + news_count,
-            'message_count': message_count,
-            **(extra_context or {}),
-        }
-        
-        return super().index(request, context)
-
-# Заменяем стандартный AdminSite на наш кастомный
-admin_site = CustomAdminSite(name='admin')
-
-# Регистрация стандартных моделей
-from django.contrib.auth.models import User, Group
-from django.contrib.auth.admin import UserAdmin, GroupAdmin
-admin_site.register(User, UserAdmin)
-admin_site.register(Group, GroupAdmin)
-
-# Переопределяем admin.site глобально
-admin.site = admin_site
+from django.utils import timezone
+from .models import ArticleCategory, Article, News, Page, ContactMessage, FAQ, Tag, Notification, SearchQuery, PopularQuery
+from . import caching
+from .notifications import enqueue
 
 # Класс для категорий статей
 class ArticleCategoryAdmin(admin.ModelAdmin):
@@ -121,10 +55,12 @@ class ArticleAdmin(admin.ModelAdmin):
     
     def make_published(self, request, queryset):
         queryset.update(is_published=True)
+        caching.bump(caching.ARTICLES)
     make_published.short_description = "Опубликовать выбранные статьи"
     
     def make_unpublished(self, request, queryset):
         queryset.update(is_published=False)
+        caching.bump(caching.ARTICLES)
     make_unpublished.short_description = "Снять с публикации выбранные статьи"
     
     def save_model(self, request, obj, form, change):
@@ -159,10 +95,12 @@ class NewsAdmin(admin.ModelAdmin):
     
     def make_published(self, request, queryset):
         queryset.update(is_published=True)
+        caching.bump(caching.NEWS)
     make_published.short_description = "Опубликовать выбранные новости"
     
     def make_unpublished(self, request, queryset):
         queryset.update(is_published=False)
+        caching.bump(caching.NEWS)
     make_unpublished.short_description = "Снять с публикации выбранные новости"
     
     def save_model(self, request, obj, form, change):
@@ -213,7 +151,15 @@ class ContactMessageAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         if 'response' in form.changed_data:
             obj.responded_by = request.user
+            obj.responded_at = timezone.now()
         super().save_model(request, obj, form, change)
+        if 'response' in form.changed_data and obj.response:
+            enqueue(
+                obj.email,
+                'contact_reply',
+                f"Ответ на ваше обращение «{obj.subject}»",
+                obj.response,
+            )
 
 # Класс для FAQ
 class FAQAdmin(admin.ModelAdmin):
@@ -230,11 +176,43 @@ class FAQAdmin(admin.ModelAdmin):
         }),
     )
 
-# Регистрация моделей в admin_site
-admin_site.register(ArticleCategory, ArticleCategoryAdmin)
-admin_site.register(Tag, TagAdmin)
-admin_site.register(Article, ArticleAdmin)
-admin_site.register(News, NewsAdmin)
-admin_site.register(Page, PageAdmin)
-admin_site.register(ContactMessage, ContactMessageAdmin)
-admin_site.register(FAQ, FAQAdmin)
+# Класс для очереди уведомлений
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'event_type', 'subject', 'created_at', 'sent_at')
+    list_filter = ('event_type', 'sent_at')
+    search_fields = ('recipient', 'subject')
+    date_hierarchy = 'created_at'
+    readonly_fields = ('recipient', 'event_type', 'subject', 'body', 'created_at', 'sent_at')
+    list_per_page = 50
+
+# Журнал поиска заполняется сайтом, популярные запросы - командой refresh_popular_queries
+class SearchQueryAdmin(admin.ModelAdmin):
+    list_display = ('query', 'source', 'filters', 'results', 'elapsed_ms', 'created_at')
+    list_filter = ('source',)
+    search_fields = ('query',)
+    date_hierarchy = 'created_at'
+    readonly_fields = ('source', 'query', 'filters', 'results', 'elapsed_ms', 'created_at')
+    list_per_page = 50
+
+class PopularQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        'query', 'source', 'filters', 'searches', 'zero_results', 'results', 'avg_elapsed_ms', 'max_elapsed_ms',
+    )
+    list_filter = ('source',)
+    search_fields = ('query',)
+    readonly_fields = (
+        'source', 'query', 'filters', 'searches', 'zero_results', 'results', 'avg_elapsed_ms', 'max_elapsed_ms',
+        'updated_at',
+    )
+
+# Регистрация моделей в админке
+admin.site.register(ArticleCategory, ArticleCategoryAdmin)
+admin.site.register(Tag, TagAdmin)
+admin.site.register(Article, ArticleAdmin)
+admin.site.register(News, NewsAdmin)
+admin.site.register(Page, PageAdmin)
+admin.site.register(ContactMessage, ContactMessageAdmin)
+admin.site.register(FAQ, FAQAdmin)
+admin.site.register(Notification, NotificationAdmin)
+admin.site.register(SearchQuery, SearchQueryAdmin)
+admin.site.register(PopularQuery, PopularQueryAdmin)
@@ -0,0 +1,91 @@
+"""
+Асинхронные представления.
+
+Под ASGI (gunicorn с воркером uvicorn, см. gunicorn.conf.py) асинхронное
+представление не занимает поток процесса, пока ждёт базу: в это время
+процесс обслуживает другие запросы.
+
+Асинхронные методы ORM Django 4.2 (``aget``, ``aexists``, ``async for``)
+выполняют SQL по очереди в одном потоке запроса. Независимые запросы страницы
+``run_concurrently`` отправляет одновременно: каждый выполняется в отдельном
+потоке со своим соединением, которое закрывается сразу после запроса. Поэтому
+в продакшене с PostgreSQL нужен пул соединений (employment_project/backends/
+postgresql), а с ``ASYNC_CONCURRENT_QUERIES = False`` запросы выполняются
+по очереди, как в остальном асинхронном ORM.
+
+Число таких потоков во всём процессе ограничено ``DB_CONCURRENT_QUERIES``
+(``query_slot()``; его занимают и источники поиска, core/search.py): иначе
+несколько одновременных страниц разобрали бы весь пул соединений, и запросы
+ждали бы его до ``DB_POOL_TIMEOUT``.
+
+Проверка форм, сессия и ``request.user`` в Django 4.2 доступны только
+синхронно, поэтому представления обращаются к ним через ``sync_to_async``.
+Шаблон отрисовывается после представления в синхронном потоке, но все его
+данные загружаются заранее, и при отрисовке запросов к базе нет.
+"""
+import asyncio
+import contextlib
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+from django.http import Http404
+
+
+_query_slots = None
+_query_slots_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def query_slot(timeout=None):
+    """Место для запроса в отдельном потоке; TimeoutError, если ни одно не освободилось за ``timeout``"""
+    global _query_slots
+    with _query_slots_lock:
+        if _query_slots is None:
+            _query_slots = threading.BoundedSemaphore(settings.DB_CONCURRENT_QUERIES)
+    if not _query_slots.acquire(timeout=timeout):
+        raise TimeoutError
+    try:
+        yield
+    finally:
+        _query_slots.release()
+
+
+def _evaluate(query):
+    return list(query) if isinstance(query, QuerySet) else query()
+
+
+def _in_own_connection(query):
+    with query_slot():
+        try:
+            return _evaluate(query)
+        finally:
+            # Соединения потоков asgiref не закрываются сигналом окончания запроса;
+            # соединение возвращается в пул до того, как место займёт другой поток
+            connections.close_all()
+
+
+async def run_concurrently(**queries):
+    """Выполняет независимые запросы одновременно и возвращает их результаты под теми же именами
+
+    Значение - QuerySet (результат - список объектов) или функция без аргументов.
+    """
+    if settings.ASYNC_CONCURRENT_QUERIES:
+        calls = [sync_to_async(_in_own_connection, thread_sensitive=False)(query) for query in queries.values()]
+        results = await asyncio.gather(*calls)
+    else:
+        results = [await sync_to_async(_evaluate)(query) for query in queries.values()]
+    return dict(zip(queries, results))
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def aget_object_or_404(queryset, **lookup):
+    try:
+        return await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"Объект «{queryset.model._meta.verbose_name}» не найден")
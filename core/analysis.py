@@ -0,0 +1,206 @@
+"""
+Разбор текста для поискового индекса.
+
+``analyze()`` разбивает текст на слова, приводит их к нижнему регистру,
+заменяет «ё» на «е», убирает стоп-слова и оставляет основу слова. Русские
+слова обрабатываются алгоритмом Snowball для русского языка, английские -
+упрощённым стеммером Портера (множественное число, -ed, -ing, -ly).
+
+``trigrams()`` возвращает символьные триграммы основы для нечёткого поиска
+с опечатками, по тем же правилам, что и pg_trgm.
+"""
+import re
+from functools import lru_cache
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+CYRILLIC_RE = re.compile(r'[а-я]')
+MAX_STEM_LENGTH = 64
+
+STOP_WORDS = frozenset('''
+    и в во не что он на я с со как а то все она так его но да ты к у же вы за бы по только ее мне
+    было вот от меня еще нет о из ему когда даже ну ли если уже или ни быть был него до вас нибудь
+    уж вам ведь там потом себя ничего ей может они тут где есть надо ней для мы тебя их чем была
+    сам чтоб без будто чего раз тоже себе под будет ж тогда кто этот того потому этого какой ним
+    здесь этом один мой тем чтобы нее были куда всех можно при об другой хоть после над больше тот
+    через эти нас про всего них какая много эту моя свою этой перед том такой им более всегда всю
+    между это также который которые которая которых
+    a an and are as at be by for from has have in is it its of on or that the this to was were
+    will with
+'''.split())
+
+# Snowball для русского языка. Окончания сортируются по убыванию длины: выбирается самое длинное
+RU_VOWELS = 'аеиоуыэюя'
+
+
+def _longest_first(*endings):
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+RU_PERFECTIVE_GERUND = (
+    _longest_first('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв'),
+    _longest_first('вшись', 'вши', 'в'),  # только после «а» или «я»
+)
+RU_ADJECTIVE = _longest_first(
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое', 'ей', 'ий', 'ый', 'ой', 'ем', 'им',
+    'ым', 'ом', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+)
+RU_PARTICIPLE = (
+    _longest_first('ивш', 'ывш', 'ующ'),
+    _longest_first('ем', 'нн', 'вш', 'ющ', 'щ'),  # только после «а» или «я»
+)
+RU_REFLEXIVE = ('ся', 'сь')
+RU_VERB = (
+    _longest_first(
+        'ейте', 'уйте', 'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило', 'ыло', 'ено', 'ует', 'уют', 'ены',
+        'ить', 'ыть', 'ишь', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ят', 'ит', 'ыт', 'ую', 'ю',
+    ),
+    _longest_first('нно', 'ете', 'йте', 'ешь', 'ла', 'на', 'ли', 'ем', 'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'й', 'л', 'н'),
+)
+RU_NOUN = _longest_first(
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ев', 'ов', 'ие', 'ье', 'еи', 'ии', 'ей', 'ой', 'ий',
+    'ям', 'ем', 'ам', 'ом', 'ах', 'ях', 'ию', 'ью', 'ия', 'ья', 'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь', 'ю', 'я',
+)
+RU_DERIVATIONAL = ('ость', 'ост')
+RU_SUPERLATIVE = ('ейше', 'ейш')
+
+
+def _regions(word):
+    """Начала областей RV и R2 алгоритма Snowball"""
+    rv = r1 = r2 = len(word)
+    for i, char in enumerate(word):
+        if char in RU_VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i - 1] in RU_VOWELS and word[i] not in RU_VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i - 1] in RU_VOWELS and word[i] not in RU_VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _strip(word, start, endings, after_a=False):
+    """Удаляет самое длинное окончание, целиком лежащее не раньше ``start``"""
+    for ending in endings:
+        if word.endswith(ending) and len(word) - len(ending) >= start:
+            stem = word[:-len(ending)]
+            if after_a:
+                if len(stem) - 1 < start or stem[-1] not in 'ая':
+                    continue
+            return stem
+    return None
+
+
+def _strip_grouped(word, start, groups):
+    # Первая группа - окончания без условия, вторая - только после «а»/«я»
+    candidates = []
+    for endings, after_a in ((groups[0], False), (groups[1], True)):
+        stem = _strip(word, start, endings, after_a)
+        if stem is not None:
+            candidates.append(stem)
+    # Из двух групп выбирается более длинное окончание
+    return min(candidates, key=len) if candidates else None
+
+
+def stem_russian(word):
+    rv, r2 = _regions(word)
+
+    # Шаг 1
+    stem = _strip_grouped(word, rv, RU_PERFECTIVE_GERUND)
+    if stem is not None:
+        word = stem
+    else:
+        word = _strip(word, rv, RU_REFLEXIVE) or word
+        stem = _strip(word, rv, RU_ADJECTIVE)
+        if stem is not None:
+            word = _strip_grouped(stem, rv, RU_PARTICIPLE) or stem
+        else:
+            word = _strip_grouped(word, rv, RU_VERB) or _strip(word, rv, RU_NOUN) or word
+
+    # Шаг 2
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    word = _strip(word, r2, RU_DERIVATIONAL) or word
+
+    # Шаг 4
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    stem = _strip(word, rv, RU_SUPERLATIVE)
+    if stem is not None:
+        word = stem
+        if word.endswith('нн'):
+            word = word[:-1]
+        return word
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+def _has_vowel(word):
+    return any(char in 'aeiouy' for char in word)
+
+
+def stem_english(word):
+    if len(word) <= 3:
+        return word
+    if word.endswith("'s"):
+        word = word[:-2]
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')) and _has_vowel(word[:-2]):
+        word = word[:-1]
+
+    for suffix in ('ingly', 'edly', 'ing', 'ed', 'ly'):
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            if len(stem) >= 3 and _has_vowel(stem):
+                word = stem
+                # running -> run, но не pass -> pas
+                if len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'lsz':
+                    word = word[:-1]
+            break
+    return word
+
+
+def normalize(text):
+    return text.lower().replace('ё', 'е')
+
+
+def normalize_query(text):
+    """Запрос в нижнем регистре с одиночными пробелами - для журнала и статистики поиска"""
+    return ' '.join(text.lower().split())
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    if CYRILLIC_RE.search(word):
+        word = stem_russian(word)
+    elif word.isalpha():
+        word = stem_english(word)
+    return word[:MAX_STEM_LENGTH]
+
+
+def analyze(text):
+    """Основы слов текста в порядке появления, без стоп-слов"""
+    if not text:
+        return []
+    return [stem(word) for word in WORD_RE.findall(normalize(text)) if word not in STOP_WORDS]
+
+
+def trigrams(term):
+    """Множество триграмм слова с отступами, как в pg_trgm"""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Доля общих триграмм двух слов от 0 до 1"""
+    first, second = trigrams(a), trigrams(b)
+    return len(first & second) / len(first | second)
@@ -0,0 +1,139 @@
+"""
+Основа JSON API только для чтения.
+
+Представления API возвращают словари и списки из ``.values()`` без создания
+экземпляров моделей и без шаблонов. Если установлен ``orjson``, он используется
+для сериализации, иначе стандартный ``json``. Ответ кешируется по поколению
+данных (см. core/caching.py). ``ETag`` строится из поколения и адреса запроса,
+поэтому на ``If-None-Match`` клиент получает 304 без обращения к базе.
+"""
+import base64
+import hashlib
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views import View
+
+from . import caching
+from .replicas import ReplicaReadMixin
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Объект {type(obj).__name__} не сериализуется в JSON")
+
+
+def dumps(data):
+    """Сериализует данные в JSON (bytes)"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+class ApiError(Exception):
+    """Ошибка в параметрах запроса, возвращается клиенту с кодом ``status``"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_fields(request, available, default):
+    """Список полей из параметра ``fields=a,b,c`` с проверкой по ``available``"""
+    value = request.GET.get('fields')
+    if not value:
+        return list(default)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ApiError(f"Неизвестные поля: {', '.join(unknown)}. Доступны: {', '.join(available)}")
+    return fields
+
+
+def parse_limit(request):
+    value = request.GET.get('limit', settings.API_PAGE_SIZE)
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ApiError('Параметр limit должен быть числом')
+    if not 1 <= limit <= settings.API_MAX_PAGE_SIZE:
+        raise ApiError(f"Параметр limit должен быть от 1 до {settings.API_MAX_PAGE_SIZE}")
+    return limit
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(dumps(values)).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise ApiError('Некорректный параметр cursor')
+
+
+class ApiView(ReplicaReadMixin, View):
+    """Представление JSON API с кешированием по поколению ``cache_namespaces``
+
+    По умолчанию отдаёт ``{'results': [...]}`` - строки ``queryset`` с полями
+    ``fields``. Представления со своими параметрами переопределяют ``get_data``.
+    """
+    http_method_names = ['get', 'head', 'options']
+    cache_namespaces = ()
+    queryset = None
+    fields = ()
+
+    def get(self, request, *args, **kwargs):
+        # Параметры в ключе сортируются, чтобы порядок в адресе не плодил копии
+        query = '&'.join(sorted(request.GET.urlencode().split('&')))
+        signature = f"{caching.generation(*self.cache_namespaces)}:{request.path}?{query}"
+        digest = hashlib.md5(signature.encode('utf-8')).hexdigest()
+        etag = f'"{digest}"'
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        key = f"api:{digest}"
+        content = cache.get(key)
+        if content is None:
+            try:
+                content = dumps(self.get_data(request, *args, **kwargs))
+            except ApiError as error:
+                return json_response({'error': error.message}, status=error.status)
+            except Http404 as error:
+                return json_response({'error': str(error) or 'Не найдено'}, status=404)
+            cache.set(key, content, settings.API_CACHE_TIMEOUT)
+
+        response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.API_MAX_AGE)
+        return response
+
+    def get_queryset(self):
+        if self.queryset is None:
+            raise ImproperlyConfigured(
+                f"{type(self).__name__}: задайте queryset или переопределите get_queryset() либо get_data()"
+            )
+        # Новая копия на каждый запрос, как в ListView
+        return self.queryset.all()
+
+    def get_data(self, request, *args, **kwargs):
+        return {'results': list(self.get_queryset().values(*self.fields))}
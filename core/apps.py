@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.core import checks
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+
+class AdminConfig(SimpleAdminConfig):
+    """Админка с сайтом core.sites.CustomAdminSite; модули admin.py загружаются при первой надобности"""
+    default_site = 'core.sites.CustomAdminSite'
+
+    def ready(self):
+        from django.contrib.admin.checks import check_dependencies
+        from .sites import check_admin_app
+
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_admin_app, checks.Tags.admin)
@@ -0,0 +1,352 @@
+"""
+Измерение производительности основных страниц сайта.
+
+Два режима:
+
+* ``run_client_benchmark`` - последовательные запросы через тестовый клиент
+  Django с подсчётом SQL-запросов на каждый ответ;
+* ``run_http_load`` - параллельная нагрузка по HTTP на локальный сервер,
+  запущенный в этом же процессе;
+* ``run_compression_benchmark`` - размер ответов до и после минификации HTML
+  и сжатия gzip/brotli и время CPU на эти операции для одного ответа.
+
+Для каждого сценария считаются перцентили задержки p50/p95/p99 и пропускная
+способность. Результаты сохраняются в JSON для сравнения прогонов.
+"""
+import contextlib
+import json
+import platform
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import django
+from django.conf import settings
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.encoding import iri_to_uri
+
+from core import compression
+from core.dataset import DatasetGenerator
+from jobs.models import Category, JobVacancy
+from users.models import EmployerProfile, JobSeekerProfile
+
+
+@dataclass
+class Scenario:
+    """Один замеряемый адрес; ``user`` - пользователь, от имени которого идут запросы"""
+    name: str
+    path: str
+    user: object = None
+    weight: int = 1
+
+
+@dataclass
+class Measurement:
+    """Накопленные замеры одного сценария"""
+    latencies: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    statuses: dict = field(default_factory=dict)
+    sql: list = field(default_factory=list)
+
+    def add(self, latency, status, queries=None):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if queries is not None:
+            self.queries.append(queries)
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(measurement, elapsed):
+    """Сводная статистика сценария; задержки в миллисекундах"""
+    latencies = [latency * 1000 for latency in measurement.latencies]
+    summary = {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        'max_ms': round(max(latencies), 2) if latencies else 0.0,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'statuses': {str(status): count for status, count in sorted(measurement.statuses.items())},
+    }
+    if measurement.queries:
+        summary['queries_median'] = statistics.median(measurement.queries)
+        summary['queries_max'] = max(measurement.queries)
+    return summary
+
+
+def default_scenarios():
+    """Основные сценарии: публичные страницы, фильтры вакансий, поиск и кабинеты"""
+    vacancy = JobVacancy.objects.filter(status='open').order_by('pk').first()
+    category = Category.objects.order_by('pk').first()
+    seeker = (
+        JobSeekerProfile.objects.filter(applications__isnull=False)
+        .select_related('user').order_by('pk').first()
+    )
+    employer = (
+        EmployerProfile.objects.annotate(vacancy_count=Count('vacancies'))
+        .filter(vacancy_count__gt=0).select_related('user').order_by('-vacancy_count').first()
+    )
+
+    vacancy_list = reverse('jobs:vacancy_list')
+    scenarios = [
+        Scenario('home', reverse('core:home'), weight=3),
+        Scenario('vacancy_list', vacancy_list, weight=3),
+        Scenario('vacancy_list_keywords', f"{vacancy_list}?keywords=менеджер", weight=2),
+        Scenario('vacancy_list_remote_full_time', f"{vacancy_list}?employment_type=full_time&remote=on"),
+        Scenario('vacancy_list_experience_page', f"{vacancy_list}?experience=1-3&page=3"),
+        Scenario('search', f"{reverse('core:search')}?q=работа", weight=2),
+    ]
+    if category:
+        scenarios.append(Scenario('vacancy_list_category', f"{vacancy_list}?category={category.pk}"))
+    if vacancy:
+        scenarios.append(Scenario('vacancy_detail', vacancy.get_absolute_url(), weight=3))
+    if seeker:
+        scenarios += [
+            Scenario('dashboard_seeker', reverse('users:dashboard'), user=seeker.user),
+            Scenario('seeker_applications', reverse('jobs:job_seeker_applications'), user=seeker.user),
+        ]
+    if employer:
+        scenarios += [
+            Scenario('dashboard_employer', reverse('users:dashboard'), user=employer.user),
+            Scenario('employer_applications', reverse('jobs:employer_applications'), user=employer.user),
+            Scenario('employer_vacancies', reverse('jobs:employer_vacancies'), user=employer.user),
+        ]
+    return scenarios
+
+
+@contextlib.contextmanager
+def temporary_database(seed=42, vacancies=2000, seekers=500):
+    """Временная база со сгенерированным набором данных на время замеров"""
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        DatasetGenerator(seed=seed).generate(vacancies=vacancies, seekers=seekers)
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def _client_for(user, clients):
+    key = user.pk if user else None
+    if key not in clients:
+        client = Client()
+        if user:
+            client.force_login(user)
+        clients[key] = client
+    return clients[key]
+
+
+def run_client_benchmark(scenarios, iterations=50, warmup=3, capture_sql=False):
+    """Последовательно запрашивает каждый сценарий через тестовый клиент Django"""
+    clients = {}
+    results = {}
+    # Запросы в отдельных потоках (core/aio.py, core/search.py) идут через свои соединения
+    # и не попали бы в подсчёт, поэтому здесь страницы выполняют их по очереди в потоке запроса
+    with override_settings(ASYNC_CONCURRENT_QUERIES=False, SEARCH_PARALLEL=False):
+        for scenario in scenarios:
+            client = _client_for(scenario.user, clients)
+            for _ in range(warmup):
+                client.get(scenario.path)
+
+            measurement = Measurement()
+            started = time.perf_counter()
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as context:
+                    request_started = time.perf_counter()
+                    response = client.get(scenario.path)
+                    latency = time.perf_counter() - request_started
+                measurement.add(latency, response.status_code, len(context.captured_queries))
+                if capture_sql:
+                    measurement.sql.extend(query['sql'] for query in context.captured_queries)
+            results[scenario.name] = summarize(measurement, time.perf_counter() - started)
+            if capture_sql:
+                results[scenario.name]['sql'] = measurement.sql
+    return results
+
+
+def _cpu_ms(function, iterations):
+    started = time.process_time()
+    for _ in range(iterations):
+        function()
+    return round((time.process_time() - started) / iterations * 1000, 3)
+
+
+def run_compression_benchmark(scenarios, iterations=20):
+    """Байты ответа после каждого шага (минификация, gzip, brotli) и время CPU шага на один ответ"""
+    clients = {}
+    bodies = {}
+    # Исходные ответы без минификации и сжатия, шаги замеряются отдельно
+    with override_settings(HTML_MINIFY=False, COMPRESSION_ENABLED=False):
+        for scenario in scenarios:
+            response = _client_for(scenario.user, clients).get(scenario.path)
+            bodies[scenario.name] = (response.get('Content-Type', ''), response.content)
+
+    encodings = ['gzip'] + (['br'] if compression.brotli is not None else [])
+    results = {}
+    for name, (content_type, content) in bodies.items():
+        row = {'bytes': len(content)}
+        if content_type.startswith('text/html'):
+            html = content.decode('utf-8')
+            row['minify_cpu_ms'] = _cpu_ms(lambda: compression.minify_html(html), iterations)
+            content = compression.minify_html(html).encode('utf-8')
+            row['minified_bytes'] = len(content)
+        for encoding in encodings:
+            row[f'{encoding}_bytes'] = len(compression.compress(encoding, content))
+            row[f'{encoding}_cpu_ms'] = _cpu_ms(lambda: compression.compress(encoding, content), iterations)
+        results[name] = row
+    return results
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LiveServer:
+    """Локальный многопоточный WSGI-сервер проекта для HTTP-нагрузки"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        connections_override = None
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # База в памяти видна только через соединение основного потока
+            # (нужен сам объект соединения, а не прокси django.db.connection)
+            wrapper = connections[connection.alias]
+            wrapper.inc_thread_sharing()
+            connections_override = {wrapper.alias: wrapper}
+        self.httpd = ThreadedWSGIServer(
+            (host, port), _QuietRequestHandler, allow_reuse_address=False,
+            connections_override=connections_override,
+        )
+        self.httpd.set_app(get_internal_wsgi_application())
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+        for wrapper in (self.httpd.connections_override or {}).values():
+            wrapper.dec_thread_sharing()
+
+
+def _session_cookie(user, clients):
+    if user is None:
+        return None
+    client = _client_for(user, clients)
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def run_http_load(scenarios, total_requests=500, concurrency=8, base_url=None):
+    """Параллельно отправляет запросы по HTTP, распределяя их по весам сценариев"""
+    clients = {}
+    plan = [scenario for scenario in scenarios for _ in range(scenario.weight)]
+    cookies = {scenario.name: _session_cookie(scenario.user, clients) for scenario in scenarios}
+    measurements = {scenario.name: Measurement() for scenario in scenarios}
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def worker(base):
+        while True:
+            with lock:
+                number = next(counter, None)
+            if number is None:
+                return
+            scenario = plan[number % len(plan)]
+            request = urllib.request.Request(base + iri_to_uri(scenario.path))
+            if cookies[scenario.name]:
+                request.add_header('Cookie', cookies[scenario.name])
+            request_started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            except OSError:
+                status = 'error'
+            latency = time.perf_counter() - request_started
+            with lock:
+                measurements[scenario.name].add(latency, status)
+
+    def drive(base):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(worker, base) for _ in range(concurrency)]
+        for future in futures:
+            future.result()
+        return time.perf_counter() - started
+
+    if base_url:
+        elapsed = drive(base_url.rstrip('/'))
+    else:
+        with LiveServer() as server:
+            elapsed = drive(server.url)
+
+    results = {name: summarize(measurement, elapsed) for name, measurement in measurements.items()}
+    everything = Measurement()
+    for measurement in measurements.values():
+        everything.latencies.extend(measurement.latencies)
+        for status, count in measurement.statuses.items():
+            everything.statuses[status] = everything.statuses.get(status, 0) + count
+    results['_total'] = summarize(everything, elapsed)
+    results['_total']['concurrency'] = concurrency
+    return results
+
+
+def environment_info():
+    """Сведения об окружении прогона"""
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'session_engine': settings.SESSION_ENGINE,
+        'platform': platform.platform(),
+        'vacancies': JobVacancy.objects.count(),
+    }
+
+
+def compare(current, previous):
+    """Изменение p95 и числа запросов к БД по сравнению с предыдущим прогоном"""
+    rows = []
+    for section in ('client', 'http'):
+        for name, stats in current.get(section, {}).items():
+            before = previous.get(section, {}).get(name)
+            if not before or not before.get('p95_ms'):
+                continue
+            rows.append({
+                'section': section,
+                'scenario': name,
+                'p95_before_ms': before['p95_ms'],
+                'p95_after_ms': stats['p95_ms'],
+                'p95_change_pct': round((stats['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100, 1),
+                'queries_before': before.get('queries_median'),
+                'queries_after': stats.get('queries_median'),
+            })
+    return rows
+
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,77 @@
+"""
+Кеширование по поколениям содержимого.
+
+Для каждой группы данных (``VACANCIES``, ``NEWS``, ``ARTICLES``) в кеше хранится
+счётчик поколения. Ключи закешированных ответов включают текущее поколение,
+поэтому после изменения данных достаточно увеличить счётчик через ``bump()``:
+старые записи больше не читаются и со временем вытесняются из кеша.
+
+Счётчик увеличивается в обработчиках сигналов ``post_save``/``post_delete`` и
+явно после массовых операций (``update()``, ``bulk_create``), которые сигналов
+не отправляют. Чтобы поколение было общим для всех воркеров, в продакшене
+нужен общий кеш (см. ``CACHES`` в settings_production.py).
+"""
+import time
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils.functional import cached_property
+
+VACANCIES = 'vacancies'
+NEWS = 'news'
+ARTICLES = 'articles'
+
+GENERATION_KEY = 'generation:{}'
+
+
+def generation(*namespaces):
+    """Текущее поколение групп данных одной строкой, например ``"17.4"``"""
+    keys = [GENERATION_KEY.format(namespace) for namespace in namespaces]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            # Счётчик вытеснен из кеша или ещё не создан. Начинаем со времени,
+            # чтобы не совпасть с поколением, под которым уже лежат старые данные.
+            cache.add(key, time.time_ns(), timeout=None)
+            values[key] = cache.get(key)
+    return '.'.join(str(values[key]) for key in keys)
+
+
+def bump(*namespaces):
+    """Начинает новое поколение: закешированное по старому больше не используется"""
+    # После коммита: иначе параллельный запрос успеет закешировать старые данные под новым поколением
+    transaction.on_commit(lambda: _increment(namespaces))
+
+
+def _increment(namespaces):
+    for namespace in namespaces:
+        key = GENERATION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, который берёт общее число записей из кеша по ключу ``cache_key``
+
+    Подсчёт ``COUNT(*)`` по фильтрам с поиском по тексту - самая дорогая часть
+    страницы списка. Ключ должен включать поколение данных, тогда новое значение
+    считается сразу после изменений.
+    """
+
+    def __init__(self, *args, cache_key=None, timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return Paginator.count.func(self)
+        value = cache.get(self.cache_key)
+        if value is None:
+            value = Paginator.count.func(self)
+            cache.set(self.cache_key, value, self.timeout)
+        return value
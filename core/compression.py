@@ -0,0 +1,200 @@
+"""
+Минификация HTML и сжатие ответов.
+
+``HtmlMinifyMiddleware`` убирает из HTML-страниц отступы шаблонов, пробелы
+в конце строк, пустые строки и комментарии. Содержимое ``<pre>``,
+``<textarea>``, ``<script>`` и ``<style>`` не изменяется. Пробелы внутри
+строки тоже не трогаются: только пробельная последовательность с переводом
+строки заменяется одним переводом строки, поэтому отображение страницы
+остаётся прежним.
+
+``CompressionMiddleware`` сжимает текстовые ответы brotli, если установлен
+пакет Brotli и клиент его принимает, иначе gzip. Потоковые ответы
+(``StreamingHttpResponse``, в том числе асинхронные) сжимаются по мере
+отдачи. События SSE (``text/event-stream``) не сжимаются, чтобы компрессор не
+задерживал их в буфере. Обычные ответы в gzip получают случайную длину
+заголовка, как в ``GZipMiddleware`` (защита от BREACH). У brotli такого
+заполнения нет, поэтому страницы с CSRF-токеном (``CSRF_COOKIE_USED``), где
+рядом с секретом может оказаться текст из запроса, всегда сжимаются gzip.
+
+Если ответы сжимает прокси перед приложением, сжатие отключается настройкой
+``COMPRESSION_ENABLED`` или, для запросов через такой прокси, заголовком из
+``COMPRESSION_UPSTREAM_HEADER``.
+"""
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - Brotli необязателен
+    brotli = None
+
+PRESERVED = re.compile(r'<(pre|textarea|script|style)\b.*?</\1\s*>', re.S | re.I)
+# Условные комментарии <!--[if IE]> оставляем
+COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.S)
+LINE_BREAK = re.compile(r'[ \t]*\n\s*')
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/rss+xml',
+    'application/atom+xml',
+    'application/feed+json',
+    'image/svg+xml',
+)
+STREAMED_EVENTS = 'text/event-stream'
+GZIP_LEVEL = 6
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+def _collapse(text):
+    return LINE_BREAK.sub('\n', COMMENT.sub('', text))
+
+
+def minify_html(html):
+    """HTML без отступов, пустых строк и комментариев; pre, textarea, script и style без изменений"""
+    parts = []
+    position = 0
+    for match in PRESERVED.finditer(html):
+        parts.append(_collapse(html[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(_collapse(html[position:]))
+    return ''.join(parts)
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме отклонённых через q=0"""
+    encodings = set()
+    for item in header.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        quality = params.strip().lower()
+        if name and not (quality.startswith('q=') and _is_zero(quality[2:])):
+            encodings.add(name)
+    return encodings
+
+
+def _is_zero(value):
+    try:
+        return float(value) == 0
+    except ValueError:
+        return False
+
+
+def choose_encoding(request):
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    # Ответ с CSRF-токеном - только gzip со случайной длиной заголовка (BREACH)
+    if brotli is not None and 'br' in accepted and not request.META.get('CSRF_COOKIE_USED'):
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(encoding, content):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def _stream_compressor(encoding):
+    """Функции (сжать часть, завершить поток) для выбранной кодировки"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    # wbits=31 - формат gzip с заголовком и контрольной суммой
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def compress_stream(encoding, chunks):
+    process, finish = _stream_compressor(encoding)
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def compress_async_stream(encoding, chunks):
+    process, finish = _stream_compressor(encoding)
+    async for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def _content_type(response):
+    return response.get('Content-Type', '').split(';')[0].strip().lower()
+
+
+class HtmlMinifyMiddleware(MiddlewareMixin):
+    """Минифицирует HTML-страницы; потоковые и уже сжатые ответы пропускает"""
+
+    def process_response(self, request, response):
+        if (
+            not settings.HTML_MINIFY
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or _content_type(response) != 'text/html'
+        ):
+            return response
+        try:
+            html = response.content.decode(response.charset)
+        except UnicodeDecodeError:
+            return response
+        response.content = minify_html(html).encode(response.charset)
+        if response.has_header('Content-Length'):
+            response.headers['Content-Length'] = str(len(response.content))
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает текстовые ответы brotli или gzip по Accept-Encoding"""
+
+    def process_response(self, request, response):
+        if not settings.COMPRESSION_ENABLED or response.has_header('Content-Encoding'):
+            return response
+        upstream = settings.COMPRESSION_UPSTREAM_HEADER
+        if upstream and upstream in request.META:
+            return response
+        content_type = _content_type(response)
+        if content_type == STREAMED_EVENTS or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_LENGTH:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(encoding, response.streaming_content)
+            else:
+                response.streaming_content = compress_stream(encoding, response.streaming_content)
+            # Размер сжатого потока заранее неизвестен
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(encoding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # Сильный ETag после сжатия становится слабым (RFC 9110, 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,400 @@
+"""
+Генератор синтетических данных для нагрузочного тестирования.
+
+Все значения получаются из ``random.Random(seed)``, а даты отсчитываются от
+фиксированной ``DEFAULT_EPOCH``, поэтому один и тот же seed в любой день даёт
+один и тот же набор данных. Записи создаются через ``bulk_create``
+пачками по ``chunk_size``, без обращения к базе на каждую строку.
+"""
+import contextlib
+import datetime
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from jobs import funnel
+from jobs.models import Category, JobApplication, JobLocation, JobVacancy, Skill
+from users.models import EmployerProfile, JobSeekerProfile
+from . import caching, search_index
+from .models import Article, ArticleCategory, News
+
+FIRST_NAMES = [
+    'Александр', 'Алексей', 'Анна', 'Дмитрий', 'Екатерина', 'Елена', 'Иван', 'Ирина',
+    'Максим', 'Мария', 'Михаил', 'Наталья', 'Николай', 'Ольга', 'Павел', 'Сергей',
+    'Светлана', 'Татьяна', 'Юлия', 'Андрей', 'Виктория', 'Артём', 'Ксения', 'Роман',
+]
+LAST_NAMES = [
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов',
+    'Михайлов', 'Новиков', 'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев',
+    'Семёнов', 'Егоров', 'Павлов', 'Козлов', 'Степанов', 'Николаев',
+]
+COMPANY_PREFIXES = ['Тех', 'Гео', 'Агро', 'Мед', 'Фин', 'Строй', 'Транс', 'Энерго', 'Инфо', 'Торг', 'Сиб', 'Урал']
+# Даты создания записей - за год до этого момента
+DEFAULT_EPOCH = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+COMPANY_SUFFIXES = ['Сервис', 'Групп', 'Холдинг', 'Систем', 'Лайн', 'Про', 'Маркет', 'Тех', 'Софт', 'Логистик']
+
+CATEGORIES = {
+    'IT и разработка': ['Программист', 'Разработчик Python', 'Frontend-разработчик', 'Тестировщик', 'Системный администратор', 'Аналитик данных'],
+    'Маркетинг': ['Маркетолог', 'SMM-менеджер', 'Контент-менеджер', 'Специалист по рекламе', 'Бренд-менеджер'],
+    'Продажи': ['Менеджер по продажам', 'Торговый представитель', 'Продавец-консультант', 'Менеджер по работе с клиентами'],
+    'Финансы': ['Бухгалтер', 'Экономист', 'Финансовый аналитик', 'Кассир', 'Главный бухгалтер'],
+    'Администрирование': ['Офис-менеджер', 'Администратор', 'Секретарь', 'Помощник руководителя'],
+    'Образование': ['Учитель', 'Преподаватель английского языка', 'Воспитатель', 'Методист'],
+    'Медицина': ['Врач-терапевт', 'Медицинская сестра', 'Фармацевт', 'Стоматолог'],
+    'Производство': ['Инженер-технолог', 'Оператор станков', 'Мастер участка', 'Сварщик', 'Электромонтёр'],
+    'Транспорт и логистика': ['Водитель', 'Логист', 'Кладовщик', 'Курьер', 'Диспетчер'],
+}
+LEVELS = ['Младший', 'Старший', 'Ведущий', 'Главный']
+SKILLS = [
+    'Python', 'JavaScript', 'Java', 'SQL', 'Git', 'Docker', 'Django', 'React', '1С',
+    'MS Office', 'Excel', 'Продажи', 'Маркетинг', 'SEO', 'SMM', 'Ведение переговоров',
+    'Работа с клиентами', 'Бухгалтерия', 'Финансовый анализ', 'Управление проектами',
+    'Английский язык', 'Деловая переписка', 'Водительские права категории B', 'Охрана труда',
+]
+CITIES = [
+    ('Москва', 'Москва'), ('Санкт-Петербург', 'Ленинградская область'),
+    ('Екатеринбург', 'Свердловская область'), ('Новосибирск', 'Новосибирская область'),
+    ('Казань', 'Республика Татарстан'), ('Нижний Новгород', 'Нижегородская область'),
+    ('Самара', 'Самарская область'), ('Ростов-на-Дону', 'Ростовская область'),
+    ('Краснодар', 'Краснодарский край'), ('Владикавказ', 'Республика Северная Осетия — Алания'),
+]
+DUTIES = [
+    'работа с клиентами и партнёрами', 'подготовка отчётности', 'участие в планировании работ',
+    'контроль сроков и качества выполнения задач', 'ведение документации',
+    'взаимодействие с другими отделами', 'обучение новых сотрудников',
+    'анализ показателей и подготовка предложений', 'сопровождение текущих проектов',
+]
+REQUIREMENTS = [
+    'высшее или среднее специальное образование', 'опыт работы по специальности',
+    'ответственность и внимательность к деталям', 'умение работать в команде',
+    'грамотная устная и письменная речь', 'уверенное владение компьютером',
+    'готовность к обучению', 'знание профильного законодательства',
+]
+BENEFITS = [
+    'официальное трудоустройство по ТК РФ', 'ДМС после испытательного срока',
+    'гибкий график', 'оплачиваемое обучение', 'корпоративные мероприятия',
+    'компенсация питания', 'премии по результатам работы',
+]
+TOPICS = [
+    'рынок труда', 'составление резюме', 'собеседование', 'профессиональное обучение',
+    'удалённая работа', 'выбор профессии', 'повышение квалификации', 'трудовое законодательство',
+]
+ARTICLE_CATEGORIES = ['Карьера', 'Собеседования', 'Резюме', 'Рынок труда']
+
+
+@contextlib.contextmanager
+def manual_timestamps(*models):
+    """Временно отключает auto_now_add, чтобы bulk_create сохранил заданные даты создания"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _assign_pks(objects, lookup):
+    """Заполняет первичные ключи, если СУБД не вернула их из bulk_create"""
+    if objects and any(obj.pk is None for obj in objects):
+        model = type(objects[0])
+        pks = dict(model.objects.filter(
+            **{f"{lookup}__in": [getattr(obj, lookup) for obj in objects]}
+        ).values_list(lookup, 'pk'))
+        for obj in objects:
+            obj.pk = pks[getattr(obj, lookup)]
+    return objects
+
+
+def _chunks(total, size):
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+
+class DatasetGenerator:
+    """Создаёт воспроизводимый набор вакансий, профилей, заявок, статей и новостей"""
+
+    def __init__(self, seed=42, chunk_size=5000, password='password123', progress=None, epoch=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.password_hash = make_password(password)
+        self.progress = progress
+        self.now = epoch or DEFAULT_EPOCH
+        self.prefix = f"gen{seed}"
+
+    def generate(self, vacancies=1000, seekers=200, employers=None, applications_per_seeker=3,
+                 articles=100, news=200):
+        """Создаёт весь набор данных и возвращает количество созданных записей"""
+        employers = employers or max(1, vacancies // 50)
+        self.ensure_reference_data()
+        with manual_timestamps(User, EmployerProfile, JobSeekerProfile, JobVacancy,
+                               JobApplication, Article, News):
+            counts = {
+                'employers': self.create_employers(employers),
+                'seekers': self.create_seekers(seekers),
+            }
+            counts['vacancies'] = self.create_vacancies(vacancies)
+            counts['applications'] = self.create_applications(applications_per_seeker)
+            counts['articles'] = self.create_articles(articles)
+            counts['news'] = self.create_news(news)
+        self.build_search_index()
+        self.build_funnel()
+        caching.bump(caching.VACANCIES, caching.ARTICLES, caching.NEWS)
+        return counts
+
+    def _report(self, label, done, total, started):
+        if self.progress:
+            elapsed = time.monotonic() - started
+            self.progress(label, done, total, done / elapsed if elapsed else 0.0)
+
+    def _date(self, max_days=365):
+        return self.now - datetime.timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    def ensure_reference_data(self):
+        """Создаёт категории, навыки и местоположения, если их ещё нет"""
+        for index, name in enumerate(CATEGORIES):
+            Category.objects.get_or_create(name=name, defaults={'slug': f"{self.prefix}-category-{index}"})
+        for index, name in enumerate(SKILLS):
+            Skill.objects.get_or_create(name=name, defaults={'slug': f"{self.prefix}-skill-{index}"})
+        for city, region in CITIES:
+            JobLocation.objects.get_or_create(city=city, region=region, address=None)
+        for index, name in enumerate(ARTICLE_CATEGORIES):
+            ArticleCategory.objects.get_or_create(name=name, defaults={'slug': f"{self.prefix}-article-category-{index}"})
+
+        self.categories = dict(Category.objects.filter(name__in=CATEGORIES).values_list('name', 'pk'))
+        self.skill_ids = list(Skill.objects.filter(name__in=SKILLS).values_list('pk', flat=True))
+        self.location_ids = list(JobLocation.objects.filter(
+            city__in=[city for city, _ in CITIES], address__isnull=True
+        ).values_list('pk', flat=True))
+        self.article_category_ids = list(ArticleCategory.objects.filter(
+            name__in=ARTICLE_CATEGORIES
+        ).values_list('pk', flat=True))
+        self.author, _ = User.objects.get_or_create(
+            username=f"{self.prefix}-editor",
+            defaults={'password': self.password_hash, 'is_staff': True, 'first_name': 'Редактор'},
+        )
+
+    def _create_users(self, role, start, end):
+        """Создаёт пользователей пачкой и возвращает их id в порядке создания"""
+        users = []
+        for index in range(start, end):
+            first_name = self.rng.choice(FIRST_NAMES)
+            last_name = self.rng.choice(LAST_NAMES)
+            if first_name.endswith(('а', 'я')) and not last_name.endswith('а'):
+                last_name += 'а'
+            username = f"{self.prefix}-{role}-{index}"
+            users.append(User(
+                username=username,
+                email=f"{username}@example.com",
+                first_name=first_name,
+                last_name=last_name,
+                password=self.password_hash,
+                date_joined=self._date(),
+            ))
+        return [user.pk for user in _assign_pks(User.objects.bulk_create(users), 'username')]
+
+    def create_employers(self, count):
+        started = time.monotonic()
+        self.employer_ids = []
+        for start, end in _chunks(count, self.chunk_size):
+            with transaction.atomic():
+                user_ids = self._create_users('employer', start, end)
+                profiles = []
+                for offset, user_id in enumerate(user_ids):
+                    number = start + offset
+                    name = f"{self.rng.choice(COMPANY_PREFIXES)}{self.rng.choice(COMPANY_SUFFIXES)}"
+                    profiles.append(EmployerProfile(
+                        user_id=user_id,
+                        company_name=f"{name} {number}",
+                        company_description=f"Компания «{name}» работает на рынке с {self.rng.randint(1991, 2022)} года.",
+                        company_email=f"hr{number}@{self.prefix}.example.com",
+                        slug=f"{self.prefix}-employer-{number}",
+                        created_at=self._date(),
+                    ))
+                EmployerProfile.objects.bulk_create(profiles)
+            self._report('Работодатели', end, count, started)
+        # Порядок по pk: по умолчанию профили сортируются по created_at, в котором много совпадений,
+        # и rng.choice() выбирал бы из списка в разном порядке от запуска к запуску
+        self.employer_ids = list(EmployerProfile.objects.filter(
+            slug__startswith=f"{self.prefix}-employer-"
+        ).order_by('pk').values_list('pk', flat=True))
+        return count
+
+    def create_seekers(self, count):
+        started = time.monotonic()
+        for start, end in _chunks(count, self.chunk_size):
+            with transaction.atomic():
+                user_ids = self._create_users('seeker', start, end)
+                profiles = []
+                for offset, user_id in enumerate(user_ids):
+                    number = start + offset
+                    profiles.append(JobSeekerProfile(
+                        user_id=user_id,
+                        phone_number=f"+7 9{self.rng.randint(10, 99)} {self.rng.randint(100, 999)}-{self.rng.randint(10, 99)}-{self.rng.randint(10, 99)}",
+                        education=self.rng.choice(['Высшее', 'Среднее специальное', 'Неоконченное высшее']),
+                        skills=', '.join(self.rng.sample(SKILLS, 4)),
+                        experience=f"Опыт работы {self.rng.randint(0, 20)} лет",
+                        slug=f"{self.prefix}-seeker-{number}",
+                        created_at=self._date(),
+                    ))
+                JobSeekerProfile.objects.bulk_create(profiles)
+            self._report('Соискатели', end, count, started)
+        self.seeker_ids = list(JobSeekerProfile.objects.filter(
+            slug__startswith=f"{self.prefix}-seeker-"
+        ).order_by('pk').values_list('pk', flat=True))
+        return count
+
+    def _vacancy(self, number):
+        category = self.rng.choice(list(CATEGORIES))
+        position = self.rng.choice(CATEGORIES[category])
+        level = self.rng.randrange(len(LEVELS) + 2)
+        title = f"{LEVELS[level]} {position.lower()}" if level < len(LEVELS) else position
+        salary_min = self.rng.randrange(30, 200) * 1000
+        is_remote = self.rng.random() < 0.2
+        created_at = self._date()
+        return JobVacancy(
+            title=title,
+            slug=f"{self.prefix}-vacancy-{number}",
+            employer_id=self.rng.choice(self.employer_ids),
+            category_id=self.categories[category],
+            description=f"Компания ищет сотрудника на должность «{position}». "
+                        f"Основные задачи: {', '.join(self.rng.sample(DUTIES, 3))}.",
+            requirements='; '.join(self.rng.sample(REQUIREMENTS, 3)).capitalize() + '.',
+            responsibilities='; '.join(self.rng.sample(DUTIES, 4)).capitalize() + '.',
+            benefits='; '.join(self.rng.sample(BENEFITS, 3)).capitalize() + '.',
+            salary_min=salary_min,
+            salary_max=salary_min + self.rng.randrange(10, 100) * 1000,
+            location_id=None if is_remote else self.rng.choice(self.location_ids),
+            is_remote=is_remote,
+            status=self.rng.choices(['open', 'closed', 'archived'], weights=[80, 15, 5])[0],
+            employment_type=self.rng.choice(JobVacancy.EMPLOYMENT_TYPE_CHOICES)[0],
+            experience_required=self.rng.choice(JobVacancy.EXPERIENCE_CHOICES)[0],
+            created_at=created_at,
+        )
+
+    def create_vacancies(self, count):
+        started = time.monotonic()
+        through = JobVacancy.skills.through
+        self.vacancy_ids = []
+        for start, end in _chunks(count, self.chunk_size):
+            with transaction.atomic():
+                vacancies = _assign_pks(JobVacancy.objects.bulk_create(
+                    [self._vacancy(number) for number in range(start, end)]
+                ), 'slug')
+                through.objects.bulk_create([
+                    through(jobvacancy_id=vacancy.pk, skill_id=skill_id)
+                    for vacancy in vacancies
+                    for skill_id in self.rng.sample(self.skill_ids, self.rng.randint(2, 5))
+                ])
+            self.vacancy_ids.extend(vacancy.pk for vacancy in vacancies)
+            self._report('Вакансии', end, count, started)
+        return count
+
+    def create_applications(self, per_seeker):
+        if not self.vacancy_ids or not per_seeker:
+            return 0
+        started = time.monotonic()
+        statuses = [status for status, _ in JobApplication.STATUS_CHOICES]
+        created = 0
+        total = len(self.seeker_ids)
+        batch = []
+        for index, seeker_id in enumerate(self.seeker_ids, start=1):
+            amount = min(self.rng.randint(0, per_seeker * 2), len(self.vacancy_ids))
+            for vacancy_id in self.rng.sample(self.vacancy_ids, amount):
+                created_at = self._date(180)
+                batch.append(JobApplication(
+                    job_seeker_id=seeker_id,
+                    vacancy_id=vacancy_id,
+                    cover_letter='Здравствуйте! Прошу рассмотреть мою кандидатуру на эту вакансию.',
+                    status=self.rng.choices(statuses, weights=[40, 25, 15, 15, 5])[0],
+                    created_at=created_at,
+                ))
+            if len(batch) >= self.chunk_size or index == total:
+                JobApplication.objects.bulk_create(batch, ignore_conflicts=True)
+                created += len(batch)
+                batch = []
+                self._report('Заявки (соискатели)', index, total, started)
+        return created
+
+    def _paragraphs(self, topic, count):
+        sentences = [
+            f"Тема «{topic}» остаётся одной из самых обсуждаемых среди соискателей и работодателей.",
+            f"Специалисты службы занятости подготовили советы, которые помогут разобраться в вопросе «{topic}».",
+            'По данным региональных центров занятости, спрос на квалифицированных специалистов продолжает расти.',
+            'Работодатели всё чаще обращают внимание на гибкие навыки и готовность кандидата к обучению.',
+            'Служба занятости проводит бесплатные консультации и обучающие программы для граждан.',
+            'Подробную информацию можно получить в ближайшем центре занятости или на нашем сайте.',
+        ]
+        return '\n\n'.join(' '.join(self.rng.sample(sentences, 3)) for _ in range(count))
+
+    def create_articles(self, count):
+        started = time.monotonic()
+        for start, end in _chunks(count, self.chunk_size):
+            articles = []
+            for number in range(start, end):
+                topic = self.rng.choice(TOPICS)
+                created_at = self._date()
+                articles.append(Article(
+                    title=f"{topic.capitalize()}: что нужно знать в {created_at.year} году",
+                    slug=f"{self.prefix}-article-{number}",
+                    category_id=self.rng.choice(self.article_category_ids),
+                    content=self._paragraphs(topic, 4),
+                    author=self.author,
+                    created_at=created_at,
+                    views=self.rng.randrange(5000),
+                ))
+            Article.objects.bulk_create(articles)
+            self._report('Статьи', end, count, started)
+        return count
+
+    def build_search_index(self):
+        """Индексирует созданные записи для поиска: bulk_create не отправляет post_save"""
+        for label, queryset in (
+            ('Поисковый индекс вакансий', JobVacancy.objects.filter(slug__startswith=self.prefix)),
+            ('Поисковый индекс статей', Article.objects.filter(slug__startswith=self.prefix)),
+            ('Поисковый индекс новостей', News.objects.filter(slug__startswith=self.prefix)),
+        ):
+            started = time.monotonic()
+            total = queryset.count()
+
+            def progress(done):
+                self._report(label, done, total, started)
+
+            search_index.index_queryset(queryset, batch_size=self.chunk_size, progress=progress)
+
+    def build_funnel(self):
+        """События и счётчики воронки заявок (jobs/funnel.py): bulk_create не отправляет post_save"""
+        started = time.monotonic()
+        applications = JobApplication.objects.filter(job_seeker__slug__startswith=f"{self.prefix}-seeker-")
+        funnel.seed_events(applications, batch_size=self.chunk_size)
+        funnel.rebuild(self.employer_ids)
+        self._report('Воронка заявок', 1, 1, started)
+
+    def create_news(self, count):
+        started = time.monotonic()
+        for start, end in _chunks(count, self.chunk_size):
+            news = []
+            for number in range(start, end):
+                topic = self.rng.choice(TOPICS)
+                city, _ = self.rng.choice(CITIES)
+                created_at = self._date()
+                news.append(News(
+                    title=f"{city}: новости по теме «{topic}»",
+                    slug=f"{self.prefix}-news-{number}",
+                    content=self._paragraphs(topic, 2),
+                    author=self.author,
+                    created_at=created_at,
+                    views=self.rng.randrange(3000),
+                ))
+            News.objects.bulk_create(news)
+            self._report('Новости', end, count, started)
+        return count
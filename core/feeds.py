@@ -0,0 +1,156 @@
+"""
+Ленты RSS, Atom и JSON Feed.
+
+Лента отрисовывается один раз на поколение содержимого (см. core/caching.py)
+и дальше отдаётся из кеша. Ответ содержит ``ETag`` и ``Last-Modified``, так что
+агрегаторы, которые опрашивают ленты каждые несколько минут, получают 304.
+"""
+import copy
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed, SyndicationFeed
+from django.utils.html import strip_tags
+from django.utils.http import parse_http_date_safe
+from django.utils.text import Truncator
+
+from . import caching
+from .models import Article, News
+
+
+class JSONFeed(SyndicationFeed):
+    """Генератор ленты в формате JSON Feed 1.1"""
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def write(self, outfile, encoding):
+        feed = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+            'language': self.feed['language'],
+            'items': [self.item(item) for item in self.items],
+        }
+        outfile.write(json.dumps(feed, ensure_ascii=False, cls=DjangoJSONEncoder))
+
+    def item(self, item):
+        data = {
+            'id': item['unique_id'] or item['link'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_text': item['description'],
+        }
+        if item['pubdate']:
+            data['date_published'] = item['pubdate'].isoformat()
+        if item['updateddate']:
+            data['date_modified'] = item['updateddate'].isoformat()
+        if item['author_name']:
+            data['authors'] = [{'name': item['author_name']}]
+        if item['categories']:
+            data['tags'] = list(item['categories'])
+        return data
+
+
+FEED_TYPES = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+    'json': JSONFeed,
+}
+
+
+class FeedFormatConverter:
+    """Формат ленты в адресе: rss, atom или json"""
+    regex = '|'.join(FEED_TYPES)
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
+
+
+class CachedFeed(Feed):
+    """Лента, которая отрисовывается один раз на поколение данных ``cache_namespaces``"""
+    cache_namespaces = ()
+
+    def __call__(self, request, *args, feed_format='rss', **kwargs):
+        key = 'feed:{}:{}:{}'.format(
+            caching.generation(*self.cache_namespaces), feed_format, request.path,
+        )
+        cached = cache.get(key)
+        if cached is None:
+            # Экземпляр ленты общий для всех запросов, формат меняем у копии
+            feed = copy.copy(self)
+            feed.feed_type = FEED_TYPES[feed_format]
+            response = Feed.__call__(feed, request, *args, **kwargs)
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': '"{}"'.format(hashlib.md5(response.content).hexdigest()),
+                'last_modified': response.get('Last-Modified'),
+            }
+            cache.set(key, cached, settings.FEED_CACHE_TIMEOUT)
+
+        response = HttpResponse(cached['content'], content_type=cached['content_type'])
+        response['ETag'] = cached['etag']
+        if cached['last_modified']:
+            response['Last-Modified'] = cached['last_modified']
+        patch_cache_control(response, public=True, max_age=settings.FEED_MAX_AGE)
+        return get_conditional_response(
+            request,
+            etag=cached['etag'],
+            last_modified=parse_http_date_safe(cached['last_modified'] or ''),
+            response=response,
+        )
+
+    def item_description(self, item):
+        return Truncator(strip_tags(item.content)).words(60)
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class NewsFeed(CachedFeed):
+    """Последние новости"""
+    title = 'Новости службы занятости'
+    description = 'Новости службы занятости населения'
+    cache_namespaces = (caching.NEWS,)
+
+    def link(self):
+        return reverse('core:news_list')
+
+    def items(self):
+        return News.objects.filter(is_published=True).select_related('author')[:settings.FEED_ITEMS]
+
+
+class ArticleFeed(CachedFeed):
+    """Последние статьи о рынке труда"""
+    title = 'Статьи службы занятости'
+    description = 'Статьи о рынке труда и поиске работы'
+    cache_namespaces = (caching.ARTICLES,)
+
+    def link(self):
+        return reverse('core:article_list')
+
+    def items(self):
+        return (
+            Article.objects.filter(is_published=True)
+            .select_related('author', 'category')[:settings.FEED_ITEMS]
+        )
+
+    def item_categories(self, item):
+        return [item.category.name]
@@ -0,0 +1,123 @@
+"""
+Анализ планов выполнения SQL-запросов основных страниц.
+
+Запросы собираются во время прохода по сценариям ``core.benchmark``,
+группируются по форме (текст запроса с плейсхолдерами) и для каждой формы
+выполняется ``EXPLAIN`` с исходными параметрами. В отчёт попадают полные
+просмотры больших таблиц и сортировки во временных структурах - признаки
+недостающего индекса.
+"""
+import re
+from dataclasses import dataclass, field
+
+from django.db import connection
+
+from .benchmark import _client_for
+
+# Несколько плейсхолдеров подряд (IN (%s, %s, ...)) считаются одной формой
+PLACEHOLDER_LIST_RE = re.compile(r'%s(?:\s*,\s*%s)+')
+
+# SQLite: «SCAN table» без индекса и «USE TEMP B-TREE FOR ORDER BY»
+SQLITE_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+SQLITE_TEMP_SORT_RE = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT|RIGHT PART OF ORDER BY)')
+# PostgreSQL: «Seq Scan on table» и узлы Sort
+POSTGRES_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+POSTGRES_SORT_RE = re.compile(r'->\s+(?:Incremental )?Sort\b|^(?:Incremental )?Sort\b')
+
+
+@dataclass
+class QueryShape:
+    """Форма запроса со всеми вызвавшими её сценариями"""
+    sql: str
+    params: tuple
+    count: int = 0
+    scenarios: set = field(default_factory=set)
+    plan: list = field(default_factory=list)
+    full_scans: list = field(default_factory=list)
+    temp_sorts: list = field(default_factory=list)
+
+    @property
+    def has_problems(self):
+        return bool(self.full_scans or self.temp_sorts)
+
+
+def shape_of(sql):
+    return PLACEHOLDER_LIST_RE.sub('%s, ...', sql)
+
+
+def capture_shapes(scenarios):
+    """Выполняет каждый сценарий один раз и собирает формы SELECT-запросов"""
+    shapes = {}
+    current = {}
+
+    def wrapper(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            key = shape_of(sql)
+            if key not in shapes:
+                shapes[key] = QueryShape(sql=sql, params=tuple(params or ()))
+            shapes[key].count += 1
+            shapes[key].scenarios.add(current['name'])
+        return execute(sql, params, many, context)
+
+    clients = {}
+    with connection.execute_wrapper(wrapper):
+        for scenario in scenarios:
+            client = _client_for(scenario.user, clients)
+            current['name'] = scenario.name
+            client.get(scenario.path)
+    return list(shapes.values())
+
+
+def explain(sql, params):
+    """Строки плана выполнения запроса"""
+    prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f"{prefix} {sql}", params)
+        rows = cursor.fetchall()
+    if connection.vendor == 'sqlite':
+        # id, parent, notused, detail
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def analyze_plan(plan):
+    """Таблицы, просматриваемые целиком, и сортировки во временных структурах"""
+    full_scans, temp_sorts = [], []
+    for line in plan:
+        line = line.strip()
+        if connection.vendor == 'sqlite':
+            match = SQLITE_SCAN_RE.match(line)
+            if match:
+                full_scans.append(match.group(1))
+            match = SQLITE_TEMP_SORT_RE.search(line)
+            if match:
+                temp_sorts.append(match.group(1))
+        else:
+            full_scans += POSTGRES_SCAN_RE.findall(line)
+            if POSTGRES_SORT_RE.search(line):
+                temp_sorts.append(line)
+    return full_scans, temp_sorts
+
+
+def table_sizes(tables):
+    sizes = {}
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+            sizes[table] = cursor.fetchone()[0]
+    return sizes
+
+
+def advise(scenarios, min_rows=1000):
+    """Формы запросов с планами; полные просмотры таблиц меньше ``min_rows`` строк не учитываются"""
+    shapes = capture_shapes(scenarios)
+    for shape in shapes:
+        shape.plan = explain(shape.sql, shape.params)
+        shape.full_scans, shape.temp_sorts = analyze_plan(shape.plan)
+
+    sizes = table_sizes({table for shape in shapes for table in shape.full_scans})
+    for shape in shapes:
+        shape.full_scans = [table for table in shape.full_scans if sizes.get(table, 0) >= min_rows]
+
+    shapes.sort(key=lambda shape: (not shape.has_problems, -shape.count))
+    return shapes
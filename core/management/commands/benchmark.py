@@ -0,0 +1,124 @@
+import contextlib
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет задержки (p50/p95/p99), пропускную способность и число SQL-запросов '
+        'основных страниц на сгенерированном наборе данных'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--use-existing-db', action='store_true',
+            help='Замерять на текущей базе вместо временной базы со сгенерированными данными',
+        )
+        parser.add_argument('--vacancies', type=int, default=2000, help='Вакансий во временной базе')
+        parser.add_argument('--seekers', type=int, default=500, help='Соискателей во временной базе')
+        parser.add_argument('--seed', type=int, default=42, help='Seed генератора данных')
+        parser.add_argument('--iterations', type=int, default=30, help='Запросов на сценарий через тестовый клиент')
+        parser.add_argument('--requests', type=int, default=500, help='Всего HTTP-запросов при нагрузке')
+        parser.add_argument('--concurrency', type=int, default=8, help='Параллельных HTTP-клиентов')
+        parser.add_argument('--skip-http', action='store_true', help='Не запускать HTTP-нагрузку')
+        parser.add_argument(
+            '--compression', action='store_true',
+            help='Замерить экономию байтов и время CPU минификации HTML и сжатия ответов',
+        )
+        parser.add_argument('--base-url', help='Адрес уже запущенного сервера для HTTP-нагрузки')
+        parser.add_argument('--only', nargs='*', help='Замерять только перечисленные сценарии')
+        parser.add_argument(
+            '--session-backend', choices=['db', 'cached_db', 'signed_cookies'],
+            help='Движок сессий на время замеров вместо SESSION_BACKEND',
+        )
+        parser.add_argument('--output', help='Файл для сохранения результатов в JSON')
+        parser.add_argument('--compare', help='JSON предыдущего прогона для сравнения')
+
+    def handle(self, *args, **options):
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver', '127.0.0.1', 'localhost']}
+        if options['session_backend']:
+            overrides['SESSION_ENGINE'] = f"django.contrib.sessions.backends.{options['session_backend']}"
+        with override_settings(**overrides), self.database(options):
+            results = self.run(options)
+
+        if options['output']:
+            benchmark.save_results(results, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Результаты сохранены в {options['output']}"))
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                previous = json.load(f)
+            self.stdout.write('\nСравнение с предыдущим прогоном (p95):')
+            for row in benchmark.compare(results, previous):
+                line = (
+                    f"  {row['section']:<6} {row['scenario']:<32} {row['p95_before_ms']:>9.2f} -> "
+                    f"{row['p95_after_ms']:>9.2f} мс ({row['p95_change_pct']:+.1f}%)"
+                )
+                if row['queries_after'] is not None:
+                    line += f", запросов к БД: {row['queries_before']} -> {row['queries_after']}"
+                self.stdout.write(line)
+
+    def database(self, options):
+        """Временная база со сгенерированными данными либо текущая база"""
+        if options['use_existing_db']:
+            return contextlib.nullcontext()
+        self.stdout.write('Создаём временную базу данных...')
+        return benchmark.temporary_database(options['seed'], options['vacancies'], options['seekers'])
+
+    def run(self, options):
+        scenarios = benchmark.default_scenarios()
+        if options['only']:
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['only']]
+
+        results = {'environment': benchmark.environment_info()}
+
+        self.stdout.write(f"\nТестовый клиент, {options['iterations']} запросов на сценарий:")
+        results['client'] = benchmark.run_client_benchmark(scenarios, iterations=options['iterations'])
+        self.print_table(results['client'])
+
+        if not options['skip_http']:
+            self.stdout.write(
+                f"\nHTTP-нагрузка: {options['requests']} запросов, {options['concurrency']} параллельных клиентов:"
+            )
+            results['http'] = benchmark.run_http_load(
+                scenarios,
+                total_requests=options['requests'],
+                concurrency=options['concurrency'],
+                base_url=options['base_url'],
+            )
+            self.print_table(results['http'])
+
+        if options['compression']:
+            self.stdout.write('\nМинификация и сжатие, байт ответа и мс CPU на ответ:')
+            results['compression'] = benchmark.run_compression_benchmark(scenarios, iterations=options['iterations'])
+            self.print_compression(results['compression'])
+        return results
+
+    def print_table(self, results):
+        self.stdout.write(
+            f"  {'сценарий':<32} {'p50':>8} {'p95':>8} {'p99':>8} {'запр/с':>8} {'SQL':>5}  статусы"
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f"  {name:<32} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+                f"{stats['throughput_rps']:>8.1f} {stats.get('queries_median', '-'):>5}  {stats['statuses']}"
+            )
+
+    def print_compression(self, results):
+        self.stdout.write(
+            f"  {'сценарий':<32} {'исходный':>9} {'минифиц.':>9} {'gzip':>8} {'br':>8} "
+            f"{'экономия':>9} {'мс мин.':>8} {'мс gzip':>8} {'мс br':>8}"
+        )
+        for name, row in results.items():
+            smallest = min(row.get('br_bytes', row['gzip_bytes']), row['gzip_bytes'])
+            saved = 100 - smallest / row['bytes'] * 100 if row['bytes'] else 0.0
+            self.stdout.write(
+                f"  {name:<32} {row['bytes']:>9} {row.get('minified_bytes', '-'):>9} {row['gzip_bytes']:>8} "
+                f"{row.get('br_bytes', '-'):>8} {saved:>8.1f}% {row.get('minify_cpu_ms', '-'):>8} "
+                f"{row['gzip_cpu_ms']:>8} {row.get('br_cpu_ms', '-'):>8}"
+            )
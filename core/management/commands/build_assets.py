@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core import staticfiles
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает статические файлы с хешами в именах, сжатыми копиями gzip/brotli '
+        'и минифицированными CSS/JS, затем проверяет ссылки шаблонов на них'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check-only', action='store_true',
+            help='Только проверить шаблоны по уже собранному манифесту',
+        )
+        parser.add_argument('--clear', action='store_true', help='Удалить прежние файлы из STATIC_ROOT')
+
+    def handle(self, *args, **options):
+        if not options['check_only']:
+            call_command(
+                'collectstatic', interactive=False, clear=options['clear'],
+                verbosity=max(options['verbosity'] - 1, 0),
+            )
+            self.report()
+
+        manifest, _ = staticfiles_storage.load_manifest()
+        if not manifest:
+            raise CommandError('Манифест статики не найден: сначала выполните build_assets без --check-only')
+        problems = staticfiles.check_references(manifest)
+        for problem in problems:
+            self.stderr.write(str(problem))
+        if problems:
+            raise CommandError(f"Ссылок на статику с ошибками: {len(problems)}")
+        self.stdout.write(self.style.SUCCESS(f"Файлов в манифесте: {len(manifest)}, ссылки шаблонов в порядке"))
+
+    def report(self):
+        root = Path(settings.STATIC_ROOT)
+        for suffix in ('.gz', '.br'):
+            compressed = list(root.rglob(f'*{suffix}'))
+            size = sum(path.stat().st_size for path in compressed)
+            self.stdout.write(f"Сжатых копий {suffix}: {len(compressed)}, {size / 1024:.0f} КиБ")
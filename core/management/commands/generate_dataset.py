@@ -0,0 +1,58 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dataset import DatasetGenerator
+from users.models import EmployerProfile
+
+
+class Command(BaseCommand):
+    help = 'Создаёт воспроизводимый синтетический набор данных для нагрузочного тестирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vacancies', type=int, default=1000, help='Количество вакансий')
+        parser.add_argument('--seekers', type=int, default=200, help='Количество соискателей')
+        parser.add_argument('--employers', type=int, help='Количество работодателей (по умолчанию - вакансии / 50)')
+        parser.add_argument(
+            '--applications-per-seeker', type=int, default=3,
+            help='Среднее количество заявок одного соискателя',
+        )
+        parser.add_argument('--articles', type=int, default=100, help='Количество статей')
+        parser.add_argument('--news', type=int, default=200, help='Количество новостей')
+        parser.add_argument('--seed', type=int, default=42, help='Начальное значение генератора случайных чисел')
+        parser.add_argument(
+            '--epoch', type=datetime.date.fromisoformat,
+            help='Дата, от которой отсчитываются даты записей, ГГГГ-ММ-ДД (по умолчанию 2026-01-01)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Количество записей в одной пачке')
+        parser.add_argument('--password', default='password123', help='Пароль всех созданных пользователей')
+
+    def handle(self, *args, **options):
+        generator = DatasetGenerator(
+            seed=options['seed'],
+            chunk_size=options['chunk_size'],
+            password=options['password'],
+            progress=self.progress,
+            epoch=options['epoch'] and datetime.datetime.combine(
+                options['epoch'], datetime.time(), tzinfo=datetime.timezone.utc,
+            ),
+        )
+        if EmployerProfile.objects.filter(slug__startswith=f"{generator.prefix}-").exists():
+            raise CommandError(
+                f"Набор данных с seed={options['seed']} уже создан. Используйте другой --seed."
+            )
+
+        counts = generator.generate(
+            vacancies=options['vacancies'],
+            seekers=options['seekers'],
+            employers=options['employers'],
+            applications_per_seeker=options['applications_per_seeker'],
+            articles=options['articles'],
+            news=options['news'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Создано: ' + ', '.join(f"{name} - {count}" for name, count in counts.items())
+        ))
+
+    def progress(self, label, done, total, rate):
+        self.stdout.write(f"  {label}: {done}/{total} ({rate:.0f} записей/с)")
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sitemaps import SitemapGenerator
+
+
+class Command(BaseCommand):
+    help = 'Обновляет файлы карты сайта, в которых изменились данные'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Перезаписать все файлы')
+        parser.add_argument('--base-url', help='Адрес сайта вместо SITE_URL')
+        parser.add_argument('--root', help='Каталог для файлов вместо SITEMAP_ROOT')
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно с интервалом --interval')
+        parser.add_argument('--interval', type=int, default=3600, help='Интервал между обновлениями в секундах')
+
+    def handle(self, *args, **options):
+        generator = SitemapGenerator(root=options['root'], base_url=options['base_url'])
+        while True:
+            with generator.lock():
+                stats = generator.generate(force=options['force'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Файлов карты сайта: {stats['shards']} (обновлено: {stats['written']}, "
+                f"без изменений: {stats['skipped']}, удалено: {stats['removed']}), "
+                f"записано адресов: {stats['urls']} за {stats['elapsed']:.2f} с"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,62 @@
+import contextlib
+import textwrap
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from core import benchmark
+from core.index_advisor import advise
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает SQL-запросы основных страниц, выполняет EXPLAIN для каждой формы запроса '
+        'и показывает полные просмотры таблиц и сортировки без индекса'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--use-existing-db', action='store_true',
+            help='Анализировать текущую базу вместо временной базы со сгенерированными данными',
+        )
+        parser.add_argument('--vacancies', type=int, default=5000, help='Вакансий во временной базе')
+        parser.add_argument('--seekers', type=int, default=1000, help='Соискателей во временной базе')
+        parser.add_argument('--seed', type=int, default=42, help='Seed генератора данных')
+        parser.add_argument(
+            '--min-rows', type=int, default=1000,
+            help='Не сообщать о полном просмотре таблиц, в которых меньше строк',
+        )
+        parser.add_argument('--all', action='store_true', help='Показать планы всех запросов, а не только проблемных')
+
+    def handle(self, *args, **options):
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        # Запросы собираются в текущем потоке, поэтому поиск и запросы асинхронных
+        # страниц (core/aio.py) выполняются последовательно
+        overrides = {'ALLOWED_HOSTS': hosts, 'SEARCH_PARALLEL': False, 'ASYNC_CONCURRENT_QUERIES': False}
+        with override_settings(**overrides), self.database(options):
+            shapes = advise(benchmark.default_scenarios(), min_rows=options['min_rows'])
+
+        problems = [shape for shape in shapes if shape.has_problems]
+        for shape in shapes if options['all'] else problems:
+            style = self.style.WARNING if shape.has_problems else self.style.SUCCESS
+            self.stdout.write(style(
+                f"\n{shape.count} раз(а), сценарии: {', '.join(sorted(shape.scenarios))}"
+            ))
+            self.stdout.write(textwrap.indent(textwrap.fill(shape.sql, 120), '    '))
+            for line in shape.plan:
+                self.stdout.write(f"      {line}")
+            if shape.full_scans:
+                self.stdout.write(self.style.WARNING(f"    полный просмотр: {', '.join(shape.full_scans)}"))
+            if shape.temp_sorts:
+                self.stdout.write(self.style.WARNING(f"    сортировка без индекса: {', '.join(shape.temp_sorts)}"))
+
+        self.stdout.write(
+            f"\nФорм запросов: {len(shapes)}, с полным просмотром или сортировкой без индекса: {len(problems)}"
+        )
+
+    def database(self, options):
+        if options['use_existing_db']:
+            return contextlib.nullcontext()
+        self.stdout.write('Создаём временную базу данных...')
+        return benchmark.temporary_database(options['seed'], options['vacancies'], options['seekers'])
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import sessions
+
+
+class Command(BaseCommand):
+    help = 'Удаляет истёкшие сессии из таблицы django_session пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.SESSION_PURGE_BATCH_SIZE,
+            help='Сессий в одном DELETE',
+        )
+
+    def handle(self, *args, **options):
+        if not sessions.stored_in_database():
+            self.stdout.write(
+                f"Сессии хранятся не в базе ({settings.SESSION_ENGINE}); "
+                "удаляются только оставшиеся от прежнего движка"
+            )
+        deleted = sessions.purge_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Удалено истёкших сессий: {deleted}"))
@@ -0,0 +1,42 @@
+import time
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+
+from core import search_index
+from core.models import SearchEntry
+
+
+class Command(BaseCommand):
+    help = 'Строит поисковый индекс вакансий, статей и новостей заново'
+
+    def add_arguments(self, parser):
+        labels = list(search_index.INDEXED_FIELDS)
+        parser.add_argument('--model', choices=labels, nargs='*', help='Переиндексировать только указанные модели')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Объектов в одной транзакции')
+        parser.add_argument(
+            '--prune', action='store_true', help='Удалить из словаря основы, которых больше нет в текстах',
+        )
+
+    def handle(self, *args, **options):
+        for model in search_index.indexed_models():
+            if options['model'] and model._meta.label not in options['model']:
+                continue
+            started = time.monotonic()
+            total = model.objects.count()
+            # Записи удалённых объектов тоже должны исчезнуть
+            SearchEntry.objects.filter(content_type=ContentType.objects.get_for_model(model)).delete()
+
+            def progress(done):
+                self.stdout.write(f"\r{model._meta.verbose_name_plural}: {done}/{total}", ending='')
+
+            done = search_index.index_queryset(
+                model.objects.all(), batch_size=options['batch_size'], progress=progress,
+            )
+            self.stdout.write('')
+            self.stdout.write(self.style.SUCCESS(
+                f"{model._meta.verbose_name_plural}: проиндексировано {done} за {time.monotonic() - started:.1f} с"
+            ))
+
+        if options['prune']:
+            self.stdout.write(f"Удалено неиспользуемых основ: {search_index.prune_terms()}")
@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import search_log
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает популярные поисковые запросы и заранее заполняет кеш их результатов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.SEARCH_POPULAR_DAYS,
+            help='За сколько последних дней учитывать журнал',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=settings.SEARCH_POPULAR_LIMIT,
+            help='Сколько популярных запросов сохранить',
+        )
+        parser.add_argument(
+            '--warm', type=int, default=settings.SEARCH_POPULAR_WARM,
+            help='Для скольких самых частых запросов заполнить кеш (0 - не заполнять)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        popular = search_log.refresh_popular(days=options['days'], limit=options['limit'])
+        self.stdout.write(f"Популярных запросов: {len(popular)}")
+
+        warmed = 0
+        for item in popular[:options['warm']]:
+            search_log.warm(item)
+            warmed += 1
+        self.stdout.write(f"Кеш заполнен для запросов: {warmed}")
+
+        purged = search_log.purge()
+        self.stdout.write(self.style.SUCCESS(
+            f"Удалено старых записей журнала: {purged}; готово за {time.monotonic() - started:.1f} с"
+        ))
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import search_log
+
+
+class Command(BaseCommand):
+    help = 'Показывает поисковые запросы без результатов и медленные запросы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SEARCH_POPULAR_DAYS, help='Период отчёта в днях')
+        parser.add_argument(
+            '--slow-ms', type=int, default=settings.SEARCH_LOG_SLOW_MS,
+            help='Запрос медленный, если хотя бы раз отвечал дольше этого времени',
+        )
+        parser.add_argument('--limit', type=int, default=30, help='Строк в каждом разделе')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Запросы без результатов за {options['days']} дн."))
+        for row in search_log.zero_result_queries(since, options['limit']):
+            self.stdout.write(f"{row['searches']:>7}  {self.describe(row)}")
+
+        self.stdout.write('')
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Запросы дольше {options['slow_ms']} мс"))
+        self.stdout.write(f"{'макс, мс':>9} {'сред, мс':>9} {'раз':>7}  запрос")
+        for row in search_log.slow_queries(since, options['slow_ms'], options['limit']):
+            self.stdout.write(
+                f"{row['max_elapsed']:>9} {round(row['avg_elapsed']):>9} {row['searches']:>7}  {self.describe(row)}"
+            )
+
+    def describe(self, row):
+        parts = [f"[{row['source']}]", row['query'] or '-']
+        if row['filters']:
+            parts.append(f"({row['filters']})")
+        return ' '.join(parts)
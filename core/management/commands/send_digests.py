@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from core.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Отправляет накопившиеся уведомления получателям в виде дайджестов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.NOTIFICATION_BATCH_SIZE,
+            help='Количество получателей в одной пачке писем',
+        )
+        parser.add_argument(
+            '--backend', default=None,
+            help='Почтовый backend вместо EMAIL_BACKEND (например, django.core.mail.backends.filebased.EmailBackend)',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, отправляя дайджесты с интервалом NOTIFICATION_DIGEST_INTERVAL',
+        )
+        parser.add_argument(
+            '--interval', type=int, default=settings.NOTIFICATION_DIGEST_INTERVAL,
+            help='Интервал между рассылками в секундах для режима --loop',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            connection = get_connection(options['backend'], fail_silently=False)
+            stats = send_digests(connection=connection, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Отправлено писем: {stats['messages']} "
+                f"(уведомлений: {stats['notifications']}, получателей: {stats['recipients']}) "
+                f"за {stats['elapsed']:.2f} с, {stats['throughput']:.1f} писем/с; "
+                f"в очереди осталось: {stats['queue_depth']}"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+BENCH_ALIAS = 'sqlite_benchmark'
+
+# Профили сравнения: стандартный SQLite Django и продакшен-профиль из settings_production
+PROFILES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {},
+    },
+    'production': {
+        'ENGINE': 'employment_project.backends.sqlite3',
+        'CONN_MAX_AGE': None,
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': settings.SQLITE_PRODUCTION_PRAGMAS,
+        },
+    },
+}
+
+
+def use_profile(profile, path):
+    """Регистрирует соединение BENCH_ALIAS с настройками профиля"""
+    configured = connections.configure_settings({
+        DEFAULT_DB_ALIAS: dict(connections.settings[DEFAULT_DB_ALIAS]),
+        BENCH_ALIAS: {**PROFILES[profile], 'NAME': path},
+    })
+    connections.settings[BENCH_ALIAS] = configured[BENCH_ALIAS]
+    # Соединение предыдущего профиля создано с другими настройками
+    if BENCH_ALIAS in connections:
+        connections[BENCH_ALIAS].close()
+        del connections[BENCH_ALIAS]
+
+
+def prepare(path, rows):
+    connection = connections[BENCH_ALIAS]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TABLE bench_vacancy (id INTEGER PRIMARY KEY, title TEXT, status TEXT, '
+            'views INTEGER NOT NULL DEFAULT 0, created_at REAL)'
+        )
+        cursor.execute('CREATE INDEX bench_vacancy_status ON bench_vacancy (status, created_at)')
+        cursor.executemany(
+            'INSERT INTO bench_vacancy (title, status, created_at) VALUES (%s, %s, %s)',
+            [(f"Вакансия {number}", 'open' if number % 4 else 'closed', number) for number in range(rows)],
+        )
+    connection.close()
+
+
+def read_request(cursor, rows):
+    """Страница списка и карточка вакансии"""
+    cursor.execute(
+        "SELECT id, title FROM bench_vacancy WHERE status = %s ORDER BY created_at DESC LIMIT 10 OFFSET %s",
+        ['open', random.randrange(0, 500)],
+    )
+    cursor.fetchall()
+    cursor.execute('SELECT * FROM bench_vacancy WHERE id = %s', [random.randrange(1, rows)])
+    cursor.fetchone()
+
+
+def write_request(cursor, rows):
+    """Чтение и запись в одной транзакции, как при сохранении формы"""
+    with transaction.atomic(using=BENCH_ALIAS):
+        cursor.execute('SELECT views FROM bench_vacancy WHERE id = %s', [random.randrange(1, rows)])
+        views = cursor.fetchone()[0]
+        cursor.execute(
+            'UPDATE bench_vacancy SET views = %s WHERE id = %s', [views + 1, random.randrange(1, rows)]
+        )
+        cursor.execute(
+            'INSERT INTO bench_vacancy (title, status, created_at) VALUES (%s, %s, %s)',
+            ['Новая вакансия', 'open', time.time()],
+        )
+
+
+def worker(profile, path, rows, duration, write_ratio, seed, results):
+    """Один воркер: запросы подряд в течение ``duration`` секунд"""
+    random.seed(seed)
+    use_profile(profile, path)
+    connection = connections[BENCH_ALIAS]
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        is_write = random.random() < write_ratio
+        try:
+            with connection.cursor() as cursor:
+                if is_write:
+                    write_request(cursor, rows)
+                else:
+                    read_request(cursor, rows)
+            counts['writes' if is_write else 'reads'] += 1
+        except OperationalError:
+            counts['errors'] += 1
+        # Как после каждого запроса Django: закрыть соединение, если истёк CONN_MAX_AGE
+        connection.close_if_unusable_or_obsolete()
+    connection.close()
+    results.put(counts)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность стандартного SQLite и продакшен-профиля '
+        '(WAL, PRAGMA, BEGIN IMMEDIATE, постоянные соединения) при параллельных процессах'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Количество параллельных процессов')
+        parser.add_argument('--duration', type=float, default=10, help='Длительность замера профиля в секундах')
+        parser.add_argument('--writes', type=float, default=0.2, help='Доля запросов на запись')
+        parser.add_argument('--rows', type=int, default=20000, help='Строк в тестовой таблице')
+        parser.add_argument('--profile', choices=PROFILES, nargs='*', help='Замерять только указанные профили')
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context('fork')
+        summary = {}
+        for profile in options['profile'] or PROFILES:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                use_profile(profile, path)
+                prepare(path, options['rows'])
+
+                results = context.Queue()
+                processes = [
+                    context.Process(target=worker, args=(
+                        profile, path, options['rows'], options['duration'], options['writes'], number, results,
+                    ))
+                    for number in range(options['workers'])
+                ]
+                for process in processes:
+                    process.start()
+                counts = [results.get() for _ in processes]
+                for process in processes:
+                    process.join()
+
+            total = {key: sum(count[key] for count in counts) for key in ('reads', 'writes', 'errors')}
+            summary[profile] = {
+                'reads_per_second': total['reads'] / options['duration'],
+                'writes_per_second': total['writes'] / options['duration'],
+                'errors': total['errors'],
+            }
+            self.stdout.write(
+                f"{profile:<12} чтений/с: {summary[profile]['reads_per_second']:>9.1f}   "
+                f"записей/с: {summary[profile]['writes_per_second']:>8.1f}   "
+                f"ошибок «database is locked»: {total['errors']}"
+            )
+
+        if {'default', 'production'} <= summary.keys():
+            before, after = summary['default'], summary['production']
+            for key, label in (('reads_per_second', 'чтения'), ('writes_per_second', 'записи')):
+                if before[key]:
+                    self.stdout.write(f"Ускорение {label}: x{after[key] / before[key]:.2f}")
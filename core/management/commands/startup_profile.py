@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в отдельном процессе с -X importtime: там ещё ничего не импортировано
+PROFILED_STARTUP = """
+import json, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - started
+from core.warmup import warm_up
+steps = [(step.name, step.seconds, step.count) for step in warm_up()]
+print(json.dumps({'setup': setup, 'steps': steps}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет холодный старт процесса: время импорта модулей, django.setup() '
+        'и шагов подготовки воркера (core/warmup.py)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Сколько самых долгих модулей показать')
+        parser.add_argument(
+            '--sort', choices=('cumulative', 'self'), default='cumulative',
+            help='cumulative - вместе с вложенными импортами, self - только сам модуль',
+        )
+        parser.add_argument(
+            '--packages', action='store_true',
+            help='Суммировать время по пакетам верхнего уровня (django, jobs, ...)',
+        )
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROFILED_STARTUP],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Процесс запуска завершился с ошибкой:\n{result.stderr[-2000:]}")
+
+        imports = parse_importtime(result.stderr)
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+
+        self.stdout.write(f"Модулей импортировано: {len(imports)}")
+        self.stdout.write(f"django.setup() вместе с импортами: {timings['setup'] * 1000:.0f} мс")
+        for name, seconds, count in timings['steps']:
+            self.stdout.write(f"  подготовка, {name:<16} {seconds * 1000:>7.0f} мс  ({count})")
+
+        key = 0 if options['sort'] == 'self' else 1
+        if options['packages']:
+            # Время пакета - сумма собственного времени его модулей
+            totals = defaultdict(int)
+            for module, (own, _) in imports.items():
+                totals[module.split('.')[0]] += own
+            rows = [(name, totals[name], None) for name in sorted(totals, key=totals.get, reverse=True)]
+        else:
+            rows = sorted(
+                ((module, own, cumulative) for module, (own, cumulative) in imports.items()),
+                key=lambda row: row[1 + key], reverse=True,
+            )
+
+        self.stdout.write(f"\n  {'модуль':<48} {'свой, мс':>9} {'всего, мс':>10}")
+        for module, own, cumulative in rows[:options['limit']]:
+            total = '-' if cumulative is None else f"{cumulative / 1000:.1f}"
+            self.stdout.write(f"  {module:<48} {own / 1000:>9.1f} {total:>10}")
+
+
+def parse_importtime(output):
+    """Строки ``-X importtime`` в словарь {модуль: (свои мкс, мкс с вложенными)}"""
+    imports = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        own, cumulative, module = line[len('import time:'):].split('|')
+        imports[module.strip()] = (int(own), int(cumulative))
+    return imports
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.20 on 2026-10-19 15:44
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('site', 'Поиск по сайту'), ('vacancies', 'Список вакансий')], max_length=20, verbose_name='Источник')),
+                ('query', models.CharField(blank=True, max_length=255, verbose_name='Запрос')),
+                ('filters', models.CharField(blank=True, max_length=255, verbose_name='Фильтры')),
+                ('searches', models.PositiveIntegerField(verbose_name='Запросов')),
+                ('zero_results', models.PositiveIntegerField(verbose_name='Без результатов')),
+                ('results', models.PositiveIntegerField(verbose_name='Найдено в среднем')),
+                ('avg_elapsed_ms', models.PositiveIntegerField(verbose_name='Среднее время, мс')),
+                ('max_elapsed_ms', models.PositiveIntegerField(verbose_name='Максимальное время, мс')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата пересчёта')),
+            ],
+            options={
+                'verbose_name': 'Популярный запрос',
+                'verbose_name_plural': 'Популярные запросы',
+                'ordering': ['-searches'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('site', 'Поиск по сайту'), ('vacancies', 'Список вакансий')], max_length=20, verbose_name='Источник')),
+                ('query', models.CharField(blank=True, max_length=255, verbose_name='Запрос')),
+                ('filters', models.CharField(blank=True, max_length=255, verbose_name='Фильтры')),
+                ('results', models.PositiveIntegerField(verbose_name='Найдено')),
+                ('elapsed_ms', models.PositiveIntegerField(verbose_name='Время ответа, мс')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата запроса')),
+            ],
+            options={
+                'verbose_name': 'Поисковый запрос',
+                'verbose_name_plural': 'Журнал поиска',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='core_searchquery_created')],
+            },
+        ),
+    ]
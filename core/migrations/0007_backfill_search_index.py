@@ -0,0 +1,75 @@
+from django.db import migrations
+
+from core.analysis import trigrams
+from core.search_index import CHUNK_SIZE, INDEXED_FIELDS, _chunked, document_stems
+
+
+def index_documents(apps, db, content_type, documents):
+    """Записывает основы пачки объектов; словарь дополняется недостающими основами"""
+    SearchEntry = apps.get_model('core', 'SearchEntry')
+    SearchTerm = apps.get_model('core', 'SearchTerm')
+    SearchTrigram = apps.get_model('core', 'SearchTrigram')
+
+    missing = set().union(*documents.values())
+    for chunk in _chunked(missing):
+        missing.difference_update(
+            SearchTerm.objects.using(db).filter(stem__in=chunk).values_list('stem', flat=True)
+        )
+    SearchTerm.objects.using(db).bulk_create(
+        [SearchTerm(stem=stem, trigram_count=len(trigrams(stem))) for stem in missing],
+        batch_size=CHUNK_SIZE, ignore_conflicts=True,
+    )
+    for chunk in _chunked(missing):
+        SearchTrigram.objects.using(db).bulk_create(
+            [
+                SearchTrigram(term_id=term_id, trigram=trigram)
+                for term_id, stem in SearchTerm.objects.using(db).filter(stem__in=chunk).values_list('pk', 'stem')
+                for trigram in trigrams(stem)
+            ],
+            batch_size=CHUNK_SIZE, ignore_conflicts=True,
+        )
+    SearchEntry.objects.using(db).bulk_create(
+        [
+            SearchEntry(content_type=content_type, object_id=pk, stem=stem, weight=weight)
+            for pk, stems in documents.items()
+            for stem, weight in stems.items()
+        ],
+        batch_size=CHUNK_SIZE,
+    )
+
+
+def backfill_search_index(apps, schema_editor):
+    """Индексирует объекты, созданные до появления индекса: сигналы сохранения их не видели"""
+    db = schema_editor.connection.alias
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    SearchEntry = apps.get_model('core', 'SearchEntry')
+    for label, fields in INDEXED_FIELDS.items():
+        model = apps.get_model(label)
+        content_type, _ = ContentType.objects.using(db).get_or_create(
+            app_label=model._meta.app_label, model=model._meta.model_name,
+        )
+        # Индекс уже построен командой rebuild_search_index
+        if SearchEntry.objects.using(db).filter(content_type=content_type).exists():
+            continue
+        documents = {}
+        rows = model.objects.using(db).order_by('pk').values('pk', *fields)
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            documents[row['pk']] = document_stems(row, fields)
+            if len(documents) == CHUNK_SIZE:
+                index_documents(apps, db, content_type, documents)
+                documents = {}
+        if documents:
+            index_documents(apps, db, content_type, documents)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0006_search_log'),
+        ('jobs', '0004_application_funnel'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.utils.text import slugify
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 
 class ArticleCategory(models.Model):
     """Модель категории статей"""
@@ -66,6 +68,9 @@ class Article(models.Model):
         verbose_name = 'Статья'
         verbose_name_plural = 'Статьи'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], condition=models.Q(is_published=True), name='core_article_published'),
+        ]
 
     def __str__(self):
         return self.title
@@ -95,6 +100,9 @@ class News(models.Model):
         verbose_name = 'Новость'
         verbose_name_plural = 'Новости'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], condition=models.Q(is_published=True), name='core_news_published'),
+        ]
 
     def __str__(self):
         return self.title
@@ -177,3 +185,133 @@ class FAQ(models.Model):
 
     def __str__(self):
         return self.question
+
+
+class Notification(models.Model):
+    """Модель уведомления в очереди на отправку"""
+    EVENT_CHOICES = (
+        ('new_application', 'Новая заявка на вакансию'),
+        ('application_status', 'Изменение статуса заявки'),
+        ('contact_reply', 'Ответ на обращение'),
+    )
+
+    recipient = models.EmailField(verbose_name='Получатель')
+    event_type = models.CharField(max_length=30, choices=EVENT_CHOICES, verbose_name='Тип события')
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки')
+
+    class Meta:
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        ordering = ['-created_at']
+        indexes = [
+            # Очередь неотправленных уведомлений, сгруппированная по получателю
+            models.Index(
+                fields=['recipient', 'created_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='core_notification_pending',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} для {self.recipient}"
+
+
+class SearchTerm(models.Model):
+    """Основа слова из поискового индекса (см. core/search_index.py)"""
+    stem = models.CharField(max_length=64, unique=True, verbose_name='Основа')
+    trigram_count = models.PositiveSmallIntegerField(verbose_name='Количество триграмм')
+
+    class Meta:
+        verbose_name = 'Поисковый термин'
+        verbose_name_plural = 'Поисковые термины'
+
+    def __str__(self):
+        return self.stem
+
+
+class SearchTrigram(models.Model):
+    """Триграмма основы для нечёткого поиска с опечатками"""
+    trigram = models.CharField(max_length=3, verbose_name='Триграмма')
+    term = models.ForeignKey(SearchTerm, on_delete=models.CASCADE, related_name='trigrams', verbose_name='Термин')
+
+    class Meta:
+        verbose_name = 'Триграмма'
+        verbose_name_plural = 'Триграммы'
+        constraints = [
+            models.UniqueConstraint(fields=['trigram', 'term'], name='core_searchtrigram_unique'),
+        ]
+
+    def __str__(self):
+        return self.trigram
+
+
+class SearchEntry(models.Model):
+    """Основа слова в тексте объекта с весом (заголовок весит больше текста)"""
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, verbose_name='Тип объекта')
+    object_id = models.BigIntegerField(verbose_name='ID объекта')
+    stem = models.CharField(max_length=64, verbose_name='Основа')
+    weight = models.PositiveSmallIntegerField(verbose_name='Вес')
+
+    class Meta:
+        verbose_name = 'Запись поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        indexes = [
+            # Поиск объектов по основе слова
+            models.Index(fields=['stem', 'content_type', 'object_id'], name='core_searchentry_stem'),
+            # Переиндексация и вес объекта при ранжировании
+            models.Index(fields=['content_type', 'object_id', 'stem'], name='core_searchentry_object'),
+        ]
+
+    def __str__(self):
+        return self.stem
+
+
+class SearchQuery(models.Model):
+    """Запись журнала поисковых запросов (см. core/search_log.py)"""
+    SOURCE_CHOICES = (
+        ('site', 'Поиск по сайту'),
+        ('vacancies', 'Список вакансий'),
+    )
+
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, verbose_name='Источник')
+    query = models.CharField(max_length=255, blank=True, verbose_name='Запрос')
+    filters = models.CharField(max_length=255, blank=True, verbose_name='Фильтры')
+    results = models.PositiveIntegerField(verbose_name='Найдено')
+    elapsed_ms = models.PositiveIntegerField(verbose_name='Время ответа, мс')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Дата запроса')
+
+    class Meta:
+        verbose_name = 'Поисковый запрос'
+        verbose_name_plural = 'Журнал поиска'
+        ordering = ['-created_at']
+        indexes = [
+            # Агрегация за период и удаление старых записей
+            models.Index(fields=['created_at'], name='core_searchquery_created'),
+        ]
+
+    def __str__(self):
+        return self.query or self.filters
+
+
+class PopularQuery(models.Model):
+    """Частый поисковый запрос за период, пересчитывается командой refresh_popular_queries"""
+    source = models.CharField(max_length=20, choices=SearchQuery.SOURCE_CHOICES, verbose_name='Источник')
+    query = models.CharField(max_length=255, blank=True, verbose_name='Запрос')
+    filters = models.CharField(max_length=255, blank=True, verbose_name='Фильтры')
+    searches = models.PositiveIntegerField(verbose_name='Запросов')
+    zero_results = models.PositiveIntegerField(verbose_name='Без результатов')
+    results = models.PositiveIntegerField(verbose_name='Найдено в среднем')
+    avg_elapsed_ms = models.PositiveIntegerField(verbose_name='Среднее время, мс')
+    max_elapsed_ms = models.PositiveIntegerField(verbose_name='Максимальное время, мс')
+    updated_at = models.DateTimeField(verbose_name='Дата пересчёта')
+
+    class Meta:
+        verbose_name = 'Популярный запрос'
+        verbose_name_plural = 'Популярные запросы'
+        ordering = ['-searches']
+
+    def __str__(self):
+        return self.query or self.filters
@@ -0,0 +1,113 @@
+"""
+Очередь уведомлений и рассылка дайджестов по электронной почте.
+
+События (новая заявка, смена статуса заявки, ответ на обращение) не отправляются
+в момент запроса, а складываются в таблицу Notification. Команда
+``send_digests`` периодически объединяет накопившиеся события по получателю в
+одно письмо и отправляет письма пачками через одно открытое соединение с
+почтовым сервером.
+"""
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import Notification
+
+
+def enqueue(recipient, event_type, subject, body):
+    """Добавляет одно уведомление в очередь"""
+    if not recipient:
+        return None
+    return Notification.objects.create(
+        recipient=recipient,
+        event_type=event_type,
+        subject=subject,
+        body=body,
+    )
+
+
+def enqueue_many(items):
+    """Добавляет в очередь несколько уведомлений одним запросом
+
+    ``items`` - итерируемый объект кортежей (recipient, event_type, subject, body).
+    """
+    notifications = [
+        Notification(recipient=recipient, event_type=event_type, subject=subject, body=body)
+        for recipient, event_type, subject, body in items
+        if recipient
+    ]
+    return Notification.objects.bulk_create(notifications)
+
+
+def pending_count():
+    """Возвращает глубину очереди - количество неотправленных уведомлений"""
+    return Notification.objects.filter(sent_at__isnull=True).count()
+
+
+def build_digest(recipient, notifications):
+    """Собирает одно письмо-дайджест из нескольких уведомлений получателя"""
+    if len(notifications) == 1:
+        subject = notifications[0].subject
+    else:
+        subject = f"{settings.NOTIFICATION_DIGEST_SUBJECT}: новых событий - {len(notifications)}"
+
+    parts = []
+    for notification in notifications:
+        created_at = timezone.localtime(notification.created_at).strftime('%d.%m.%Y %H:%M')
+        parts.append(f"[{created_at}] {notification.subject}\n\n{notification.body}")
+
+    return EmailMessage(
+        subject=subject,
+        body='\n\n---\n\n'.join(parts),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient],
+    )
+
+
+def send_digests(connection=None, batch_size=None):
+    """Отправляет все накопившиеся уведомления в виде дайджестов
+
+    Получатели обрабатываются пачками по ``batch_size``: для каждой пачки
+    одним запросом выбираются её уведомления, письма отправляются через общее
+    соединение, после чего уведомления помечаются отправленными. Возвращает
+    словарь со статистикой отправки.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    connection = connection or get_connection(fail_silently=False)
+    started = time.monotonic()
+    stats = {'recipients': 0, 'notifications': 0, 'messages': 0}
+
+    recipients = list(
+        Notification.objects.filter(sent_at__isnull=True)
+        .order_by('recipient')
+        .values_list('recipient', flat=True)
+        .distinct()
+    )
+
+    # Одно соединение на весь прогон вместо отдельного подключения на каждое письмо
+    with connection:
+        for start in range(0, len(recipients), batch_size):
+            batch = recipients[start:start + batch_size]
+            grouped = {}
+            for notification in Notification.objects.filter(
+                sent_at__isnull=True, recipient__in=batch
+            ).order_by('recipient', 'created_at'):
+                grouped.setdefault(notification.recipient, []).append(notification)
+
+            messages = [build_digest(recipient, items) for recipient, items in grouped.items()]
+            sent = connection.send_messages(messages) or 0
+
+            ids = [notification.pk for items in grouped.values() for notification in items]
+            Notification.objects.filter(pk__in=ids).update(sent_at=timezone.now())
+
+            stats['recipients'] += len(grouped)
+            stats['notifications'] += len(ids)
+            stats['messages'] += sent
+
+    elapsed = time.monotonic() - started
+    stats['elapsed'] = elapsed
+    stats['throughput'] = stats['messages'] / elapsed if elapsed else 0.0
+    stats['queue_depth'] = pending_count()
+    return stats
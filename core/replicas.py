@@ -0,0 +1,162 @@
+"""
+Чтение публичных страниц с реплик базы данных.
+
+Реплики подключаются переменной окружения ``DATABASE_REPLICA_URLS`` (см.
+settings.py) и попадают в ``settings.DATABASE_REPLICAS``. Запросы идут на
+реплику только внутри представлений с ``ReplicaReadMixin``. Всё остальное,
+включая любую запись, работает с основной базой.
+
+* После POST-запроса ``ReplicaPinMiddleware`` ставит cookie, и в течение
+  ``REPLICA_PIN_SECONDS`` все запросы пользователя читают основную базу, чтобы
+  он сразу видел свои изменения, даже если реплика отстаёт.
+* Доступность реплик проверяется не чаще раза в
+  ``REPLICA_HEALTH_CHECK_INTERVAL`` секунд. Если реплика недоступна или упала
+  во время запроса, запрос выполняется на основной базе.
+"""
+import contextlib
+import contextvars
+import itertools
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.deprecation import MiddlewareMixin
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# Реплика, выбранная для текущего запроса; None - основная база
+_read_alias = contextvars.ContextVar('replica_read_alias', default=None)
+# alias -> (доступна ли, время последней проверки)
+_health = {}
+_counter = itertools.count()
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def check_replica(alias):
+    """Выполняет SELECT 1 на реплике и запоминает результат"""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        healthy = True
+    except DatabaseError:
+        connections[alias].close()
+        healthy = False
+    _health[alias] = (healthy, time.monotonic())
+    return healthy
+
+
+def is_healthy(alias):
+    healthy, checked_at = _health.get(alias, (None, None))
+    if checked_at is None or time.monotonic() - checked_at >= settings.REPLICA_HEALTH_CHECK_INTERVAL:
+        return check_replica(alias)
+    return healthy
+
+
+def choose_replica():
+    """Следующая доступная реплика по кругу или None"""
+    healthy = [alias for alias in replicas() if is_healthy(alias)]
+    if not healthy:
+        return None
+    return healthy[next(_counter) % len(healthy)]
+
+
+@contextlib.contextmanager
+def read_from_replica():
+    """Направляет чтение внутри блока на одну из доступных реплик"""
+    alias = choose_replica()
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+def is_pinned(request):
+    """Пользователь недавно что-то изменил и должен читать основную базу"""
+    try:
+        return float(request.COOKIES.get(settings.REPLICA_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaRouter:
+    """Чтение с выбранной реплики, запись и миграции - только в основную базу"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """Выполняет GET-запросы представления на реплике; подходит и для асинхронных представлений"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._dispatch_async(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') or not replicas() or is_pinned(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        with read_from_replica() as alias:
+            if alias is None:
+                return super().dispatch(request, *args, **kwargs)
+            try:
+                response = super().dispatch(request, *args, **kwargs)
+                # Шаблон рендерится после выхода из dispatch, а его запросы тоже должны идти на реплику
+                if hasattr(response, 'render') and not response.is_rendered:
+                    response.render()
+                return response
+            except DatabaseError:
+                if check_replica(alias):
+                    raise
+        # Реплика отказала во время запроса - повторяем на основной базе
+        return super().dispatch(request, *args, **kwargs)
+
+    async def _dispatch_async(self, request, *args, **kwargs):
+        dispatch = super().dispatch
+        if request.method not in ('GET', 'HEAD') or not replicas() or is_pinned(request):
+            return await dispatch(request, *args, **kwargs)
+
+        # Проверка доступности реплики обращается к базе, поэтому выполняется в потоке
+        alias = await sync_to_async(choose_replica)()
+        if alias is not None:
+            # Потоки sync_to_async получают копию контекста вместе с выбранной репликой
+            token = _read_alias.set(alias)
+            try:
+                response = await dispatch(request, *args, **kwargs)
+                if hasattr(response, 'render') and not response.is_rendered:
+                    await sync_to_async(response.render)()
+                return response
+            except DatabaseError:
+                if await sync_to_async(check_replica)(alias):
+                    raise
+            finally:
+                _read_alias.reset(token)
+        return await dispatch(request, *args, **kwargs)
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """После изменяющего запроса читает основную базу в течение REPLICA_PIN_SECONDS"""
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and replicas():
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, str(time.time() + seconds),
+                max_age=seconds, httponly=True, samesite='Lax',
+            )
+        return response
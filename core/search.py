@@ -0,0 +1,356 @@
+"""
+Поиск по сайту сразу по нескольким источникам.
+
+Запрос один раз разбирается на основы слов, и они сопоставляются со словарём
+поискового индекса (core/search_index.py), с исправлением опечаток. Затем
+каждый источник (вакансии, статьи, новости) выполняет один запрос в отдельном
+потоке. Этот запрос возвращает лучшие записи по релевантности и общее число
+совпадений через оконную функцию ``COUNT(*) OVER ()``. Поэтому время поиска
+определяется самым медленным источником, а не суммой всех запросов. Если в
+запросе нет значимых слов (одни стоп-слова или знаки) или ни одного из них нет
+в словаре (например, «C++»), используется поиск подстроки.
+
+Если источник не успевает за ``timeout``, его запрос прерывается на стороне
+базы (``statement_timeout`` в PostgreSQL, progress handler в SQLite), а
+страница показывает результаты остальных источников.
+
+Асинхронные ``asearch()`` и ``acached_search()`` запускают те же запросы
+источников в потоках, но ждут их в цикле событий, не занимая поток.
+
+``cached_search()`` сохраняет в кеш только первичные ключи и оценки найденных
+записей. Повторный запрос загружает записи по ключам, без поиска.
+"""
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, router
+from django.db.models import Case, Count, IntegerField, Q, Value, When, Window
+
+from jobs.models import JobVacancy
+from . import caching, search_index
+from .aio import query_slot
+from .analysis import normalize_query
+from .models import Article, News
+
+logger = logging.getLogger('core.search')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Общий для процесса пул потоков поиска"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=settings.SEARCH_WORKERS, thread_name_prefix='search',
+            )
+    return _executor
+
+
+def _forget_executor():
+    # Потоки пула не переживают fork: воркер gunicorn после preload_app создаёт свой пул
+    global _executor
+    _executor = None
+
+
+os.register_at_fork(after_in_child=_forget_executor)
+
+
+@contextlib.contextmanager
+def statement_deadline(connection, seconds):
+    """Прерывает запросы соединения, которые выполняются дольше ``seconds``"""
+    connection.ensure_connection()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET statement_timeout = %s', [int(seconds * 1000)])
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET statement_timeout')
+    elif connection.vendor == 'sqlite':
+        deadline = time.monotonic() + seconds
+        # Ненулевой результат обработчика прерывает запрос с OperationalError
+        connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+        try:
+            yield
+        finally:
+            connection.connection.set_progress_handler(None, 0)
+    else:
+        yield
+
+
+@dataclass
+class SearchHit:
+    """Одна найденная запись"""
+    source: 'SearchSource'
+    object: object
+    score: float
+
+    @property
+    def url(self):
+        return self.object.get_absolute_url()
+
+
+@dataclass
+class SourceResult:
+    hits: list
+    total: int
+
+
+@dataclass
+class SearchSource:
+    """Источник поиска: совпадение в заголовке весит больше, чем в тексте"""
+    name: str
+    label: str
+    queryset: Callable
+    title_field: str
+    text_fields: tuple
+    quota: int
+    weight: float = 1.0
+    timeout: float = None
+
+    def relevance(self, query):
+        title = self.title_field
+        score = Case(
+            When(**{f"{title}__iexact": query}, then=Value(10)),
+            When(**{f"{title}__istartswith": query}, then=Value(6)),
+            When(**{f"{title}__icontains": query}, then=Value(4)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        for text_field in self.text_fields:
+            score = score + Case(
+                When(**{f"{text_field}__icontains": query}, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        return score
+
+    def search(self, query, terms=None):
+        """Лучшие ``quota`` записей и общее число совпадений одним запросом
+
+        ``terms`` - слова запроса из ``search_index.resolve()``; без них ищется подстрока.
+        """
+        queryset = self.queryset()
+        if terms:
+            if not all(term.stems for term in terms):
+                # Слова нет ни в словаре, ни среди похожих - совпадений быть не может
+                return SourceResult(hits=[], total=0)
+            ids, score = search_index.matching(queryset.model, terms)
+            queryset = queryset.filter(pk__in=ids).annotate(search_score=score)
+        else:
+            condition = Q(**{f"{self.title_field}__icontains": query})
+            for text_field in self.text_fields:
+                condition |= Q(**{f"{text_field}__icontains": query})
+            queryset = queryset.filter(condition).annotate(search_score=self.relevance(query))
+        queryset = (
+            queryset.annotate(search_total=Window(Count('pk')))
+            .order_by('-search_score', '-created_at')[:self.quota]
+        )
+        objects = list(queryset)
+        return SourceResult(
+            hits=[SearchHit(self, obj, obj.search_score * self.weight) for obj in objects],
+            total=objects[0].search_total if objects else 0,
+        )
+
+
+def default_sources():
+    return [
+        SearchSource(
+            'vacancies', 'Вакансии',
+            lambda: JobVacancy.objects.filter(status='open').select_related('employer', 'location'),
+            'title', ('description', 'requirements'), quota=10, weight=1.2,
+        ),
+        SearchSource(
+            'articles', 'Статьи',
+            lambda: Article.objects.filter(is_published=True).select_related('category'),
+            'title', ('content',), quota=5,
+        ),
+        SearchSource(
+            'news', 'Новости',
+            lambda: News.objects.filter(is_published=True),
+            'title', ('content',), quota=5,
+        ),
+    ]
+
+
+@dataclass
+class SearchResults:
+    query: str
+    terms: list = field(default_factory=list)
+    hits: list = field(default_factory=list)
+    by_source: dict = field(default_factory=dict)
+    counts: dict = field(default_factory=dict)
+    failed: list = field(default_factory=list)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def corrections(self):
+        """Слова запроса, которые не найдены и заменены похожими"""
+        return [term for term in self.terms if not term.exact and term.stems]
+
+
+class FederatedSearch:
+    """Параллельный поиск по источникам с общим списком по релевантности"""
+
+    def __init__(self, sources=None, timeout=None, parallel=None):
+        self.sources = sources if sources is not None else default_sources()
+        self.timeout = timeout or settings.SEARCH_TIMEOUT
+        self.parallel = settings.SEARCH_PARALLEL if parallel is None else parallel
+
+    def search(self, query):
+        terms = search_index.resolve(query)
+        if self.parallel:
+            outcomes = self._run_parallel(query, terms)
+        else:
+            outcomes = [(source, self._run_source(source, query, terms)) for source in self.sources]
+        return self._merge(query, terms, outcomes)
+
+    async def asearch(self, query):
+        """``search()`` для асинхронных представлений: цикл событий не ждёт источники"""
+        terms = await sync_to_async(search_index.resolve)(query)
+        outcomes = await asyncio.gather(*(self._arun_source(source, query, terms) for source in self.sources))
+        return self._merge(query, terms, zip(self.sources, outcomes))
+
+    def _merge(self, query, terms, outcomes):
+        results = SearchResults(query, terms=terms)
+        for source, outcome in outcomes:
+            if outcome is None:
+                results.failed.append(source)
+                results.by_source[source.name] = []
+                continue
+            results.by_source[source.name] = [hit.object for hit in outcome.hits]
+            results.counts[source.name] = outcome.total
+            results.hits.extend(outcome.hits)
+        results.hits.sort(key=lambda hit: (hit.score, hit.object.created_at), reverse=True)
+        return results
+
+    def cache_key(self, query):
+        # Запрос приводится к виду из журнала поиска: прогрев по PopularQuery попадает в тот же ключ
+        sources = ','.join(source.name for source in self.sources)
+        digest = hashlib.md5(f"{sources}:{normalize_query(query)}".encode()).hexdigest()
+        return f"search:{caching.generation(caching.VACANCIES, caching.ARTICLES, caching.NEWS)}:{digest}"
+
+    def cached_search(self, query):
+        """``search()`` с кешем результатов до следующего изменения данных"""
+        # Под одним ключом все варианты регистра и пробелов - ищется общий для них запрос
+        query = normalize_query(query)
+        key = self.cache_key(query)
+        snapshot = cache.get(key)
+        if snapshot is not None:
+            return self._restore(query, snapshot)
+        results = self.search(query)
+        if not results.failed:
+            cache.set(key, self._snapshot(results), settings.SEARCH_CACHE_TIMEOUT)
+        return results
+
+    async def acached_search(self, query):
+        query = normalize_query(query)
+        key = await sync_to_async(self.cache_key)(query)
+        snapshot = await cache.aget(key)
+        if snapshot is not None:
+            return await sync_to_async(self._restore)(query, snapshot)
+        results = await self.asearch(query)
+        if not results.failed:
+            await cache.aset(key, self._snapshot(results), settings.SEARCH_CACHE_TIMEOUT)
+        return results
+
+    def warm(self, query):
+        """Выполняет поиск и сохраняет результаты, если их ещё нет в кеше"""
+        if cache.get(self.cache_key(query)) is None:
+            self.cached_search(query)
+
+    def _snapshot(self, results):
+        scores = {(hit.source.name, hit.object.pk): hit.score for hit in results.hits}
+        return {
+            'terms': results.terms,
+            'counts': results.counts,
+            'hits': {
+                name: [(obj.pk, scores[name, obj.pk]) for obj in objects]
+                for name, objects in results.by_source.items()
+            },
+        }
+
+    def _restore(self, query, snapshot):
+        results = SearchResults(query, terms=snapshot['terms'], counts=snapshot['counts'])
+        for source in self.sources:
+            stored = snapshot['hits'].get(source.name, [])
+            objects = source.queryset().in_bulk([pk for pk, _ in stored]) if stored else {}
+            hits = [SearchHit(source, objects[pk], score) for pk, score in stored if pk in objects]
+            results.by_source[source.name] = [hit.object for hit in hits]
+            results.hits.extend(hits)
+        results.hits.sort(key=lambda hit: (hit.score, hit.object.created_at), reverse=True)
+        return results
+
+    def _timeout(self, source):
+        return source.timeout or self.timeout
+
+    def _run_source(self, source, query, terms):
+        connection = connections[router.db_for_read(source.queryset().model)]
+        try:
+            with statement_deadline(connection, self._timeout(source)):
+                return source.search(query, terms)
+        except DatabaseError as error:
+            logger.warning('Источник поиска %s: %s', source.name, error)
+            return None
+
+    def _run_in_thread(self, source, query, terms):
+        try:
+            # Потоки поиска делят с run_concurrently места DB_CONCURRENT_QUERIES (core/aio.py)
+            with query_slot(self._timeout(source)):
+                return self._run_source(source, query, terms)
+        except TimeoutError:
+            logger.warning('Источник поиска %s не дождался соединения за %s с', source.name, self._timeout(source))
+            return None
+        finally:
+            # Соединения этого потока не закрываются сигналом окончания запроса
+            connections.close_all()
+
+    async def _arun_source(self, source, query, terms):
+        if not self.parallel:
+            return await sync_to_async(self._run_source)(source, query, terms)
+        try:
+            return await asyncio.wait_for(
+                sync_to_async(self._run_in_thread, thread_sensitive=False)(source, query, terms),
+                self._timeout(source),
+            )
+        except asyncio.TimeoutError:
+            logger.warning('Источник поиска %s не ответил за %s с', source.name, self._timeout(source))
+            return None
+
+    def _run_parallel(self, query, terms):
+        executor = get_executor()
+        started = time.monotonic()
+        futures = [
+            # Копия контекста переносит в поток выбранную реплику (core/replicas.py)
+            (source, executor.submit(contextvars.copy_context().run, self._run_in_thread, source, query, terms))
+            for source in self.sources
+        ]
+        outcomes = []
+        for source, future in futures:
+            remaining = started + self._timeout(source) - time.monotonic()
+            try:
+                outcomes.append((source, future.result(timeout=max(remaining, 0))))
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                logger.warning('Источник поиска %s не ответил за %s с', source.name, self._timeout(source))
+                outcomes.append((source, None))
+        return outcomes
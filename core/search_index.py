@@ -0,0 +1,219 @@
+"""
+Поисковый индекс вакансий, статей и новостей.
+
+При сохранении объекта текст его полей разбирается на основы слов
+(core/analysis.py), и они записываются в ``SearchEntry`` с весом: заголовок
+весит больше остального текста. Новые основы попадают в словарь
+``SearchTerm``, а их триграммы - в ``SearchTrigram``.
+
+При поиске запрос разбирается тем же способом. Каждая основа ищется в словаре.
+Если её там нет (опечатка), подбираются похожие основы по общим триграммам.
+Объект находится, если содержит каждое слово запроса или похожее на него.
+Все шаги - выборки по индексам, без LIKE по тексту.
+
+Массовые операции (``bulk_create``) сигналов не отправляют. Для них
+используется ``index_objects()``/``index_queryset()`` или команда
+``rebuild_search_index``.
+"""
+import math
+from collections import Counter
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+
+from .analysis import analyze, trigrams
+from .models import SearchEntry, SearchTerm, SearchTrigram
+
+# Индексируемые поля и их вес
+INDEXED_FIELDS = {
+    'jobs.JobVacancy': {'title': 3, 'description': 1, 'requirements': 1, 'responsibilities': 1},
+    'core.Article': {'title': 3, 'content': 1},
+    'core.News': {'title': 3, 'content': 1},
+}
+MAX_WEIGHT = 1000
+# Ограничение числа параметров в одном запросе (SQLITE_MAX_VARIABLE_NUMBER в старых версиях)
+CHUNK_SIZE = 500
+
+
+def indexed_models():
+    return [apps.get_model(label) for label in INDEXED_FIELDS]
+
+
+def _chunked(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def document_stems(row, fields):
+    """Основы слов объекта с суммарным весом по всем полям"""
+    weights = Counter()
+    for name, weight in fields.items():
+        for stem in analyze(row.get(name) or ''):
+            weights[stem] += weight
+    return {stem: min(weight, MAX_WEIGHT) for stem, weight in weights.items()}
+
+
+def ensure_terms(stems):
+    """Добавляет в словарь недостающие основы вместе с их триграммами"""
+    missing = set(stems)
+    for chunk in _chunked(missing):
+        missing.difference_update(SearchTerm.objects.filter(stem__in=chunk).values_list('stem', flat=True))
+    if not missing:
+        return
+    SearchTerm.objects.bulk_create(
+        [SearchTerm(stem=stem, trigram_count=len(trigrams(stem))) for stem in missing],
+        batch_size=CHUNK_SIZE, ignore_conflicts=True,
+    )
+    for chunk in _chunked(missing):
+        SearchTrigram.objects.bulk_create(
+            [
+                SearchTrigram(term_id=term_id, trigram=trigram)
+                for term_id, stem in SearchTerm.objects.filter(stem__in=chunk).values_list('pk', 'stem')
+                for trigram in trigrams(stem)
+            ],
+            batch_size=CHUNK_SIZE, ignore_conflicts=True,
+        )
+
+
+def index_rows(model, rows):
+    """Переиндексирует объекты по строкам ``.values('pk', *поля)``"""
+    fields = INDEXED_FIELDS[model._meta.label]
+    content_type = ContentType.objects.get_for_model(model)
+    documents = {row['pk']: document_stems(row, fields) for row in rows}
+    if not documents:
+        return
+    with transaction.atomic():
+        ensure_terms(set().union(*documents.values()))
+        for chunk in _chunked(documents):
+            SearchEntry.objects.filter(content_type=content_type, object_id__in=chunk).delete()
+        SearchEntry.objects.bulk_create(
+            [
+                SearchEntry(content_type=content_type, object_id=pk, stem=stem, weight=weight)
+                for pk, stems in documents.items()
+                for stem, weight in stems.items()
+            ],
+            batch_size=CHUNK_SIZE,
+        )
+
+
+def index_objects(model, objects):
+    fields = INDEXED_FIELDS[model._meta.label]
+    index_rows(model, [
+        {'pk': obj.pk, **{name: getattr(obj, name) for name in fields}} for obj in objects
+    ])
+
+
+def index_queryset(queryset, batch_size=500, progress=None):
+    """Переиндексирует все объекты выборки пачками по первичному ключу"""
+    model = queryset.model
+    fields = INDEXED_FIELDS[model._meta.label]
+    done = 0
+    last_pk = None
+    while True:
+        batch = queryset.order_by('pk')
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        rows = list(batch.values('pk', *fields)[:batch_size])
+        if not rows:
+            return done
+        index_rows(model, rows)
+        done += len(rows)
+        last_pk = rows[-1]['pk']
+        if progress:
+            progress(done)
+
+
+def remove_objects(model, pks):
+    content_type = ContentType.objects.get_for_model(model)
+    for chunk in _chunked(pks):
+        SearchEntry.objects.filter(content_type=content_type, object_id__in=chunk).delete()
+
+
+def prune_terms():
+    """Удаляет из словаря основы, которых больше нет ни в одном объекте"""
+    return SearchTerm.objects.exclude(stem__in=SearchEntry.objects.values('stem')).delete()[0]
+
+
+@dataclass
+class QueryTerm:
+    """Слово запроса и основы из словаря, которые ему соответствуют"""
+    stem: str
+    stems: tuple
+    exact: bool
+
+
+def fuzzy_candidates(stem):
+    """Основы словаря, похожие на ``stem`` по доле общих триграмм"""
+    threshold = settings.SEARCH_FUZZY_THRESHOLD
+    grams = trigrams(stem)
+    # При сходстве не ниже порога общих триграмм не меньше threshold * |grams|,
+    # а длина подходящего слова отличается не более чем в 1 / threshold раз
+    rows = (
+        SearchTrigram.objects.filter(
+            trigram__in=grams,
+            term__trigram_count__gte=math.floor(len(grams) * threshold),
+            term__trigram_count__lte=math.ceil(len(grams) / threshold),
+        )
+        .values('term__stem', 'term__trigram_count')
+        .annotate(shared=Count('pk'))
+        .filter(shared__gte=max(1, math.ceil(len(grams) * threshold)))
+        .order_by('-shared')[:50]
+    )
+    scored = []
+    for row in rows:
+        score = row['shared'] / (len(grams) + row['term__trigram_count'] - row['shared'])
+        if score >= threshold:
+            scored.append((score, row['term__stem']))
+    scored.sort(reverse=True)
+    return tuple(term for _, term in scored[:settings.SEARCH_FUZZY_CANDIDATES])
+
+
+def resolve(query):
+    """Слова запроса с найденными в словаре основами
+
+    Пустой список, если значимых слов нет или ни одно не нашлось даже среди похожих
+    (например, «C++» даёт основу «c»): тогда вызывающий ищет подстроку.
+    """
+    stems = list(dict.fromkeys(analyze(query)))
+    known = set(SearchTerm.objects.filter(stem__in=stems).values_list('stem', flat=True))
+    terms = [
+        QueryTerm(stem, (stem,), True) if stem in known else QueryTerm(stem, fuzzy_candidates(stem), False)
+        for stem in stems
+    ]
+    if not any(term.stems for term in terms):
+        return []
+    return terms
+
+
+def matching(model, terms):
+    """Подзапрос id объектов, содержащих все слова, и выражение их релевантности"""
+    entries = SearchEntry.objects.filter(content_type=ContentType.objects.get_for_model(model))
+    all_stems = {stem for term in terms for stem in term.stems}
+    exact_stems = {term.stem for term in terms if term.exact}
+
+    matched = entries.filter(stem__in=all_stems)
+    if len(terms) > 1:
+        # Объект должен содержать каждое слово запроса (или похожее на него)
+        term_number = Case(*[When(stem__in=term.stems, then=Value(number)) for number, term in enumerate(terms)])
+        matched = (
+            matched.values('object_id')
+            .annotate(matched_terms=Count(term_number, distinct=True))
+            .filter(matched_terms=len(terms))
+        )
+    ids = matched.values('object_id')
+
+    # Точное совпадение слова весит вдвое больше похожего
+    score = Subquery(
+        entries.filter(object_id=OuterRef('pk'), stem__in=all_stems)
+        .values('object_id')
+        .annotate(total=Sum(Case(
+            When(stem__in=exact_stems, then=F('weight') * 2), default=F('weight'), output_field=IntegerField(),
+        )))
+        .values('total')
+    )
+    return ids, score
@@ -0,0 +1,233 @@
+"""
+Журнал поисковых запросов и подготовка популярных запросов.
+
+Представления поиска (``SearchView`` и ``JobVacancyListView``) сообщают запрос,
+фильтры, число найденных записей и время ответа через ``SearchLogMixin``.
+Записи не пишутся в базу в момент запроса. Они копятся в буфере процесса, а
+фоновый поток сохраняет их одним ``bulk_create``, когда набирается
+``SEARCH_LOG_BATCH_SIZE`` записей или проходит ``SEARCH_LOG_FLUSH_INTERVAL``
+секунд. Если база недоступна, пачка теряется: журнал - статистика, а не
+данные пользователей.
+
+Команда ``refresh_popular_queries`` периодически пересчитывает таблицу
+``PopularQuery`` и заранее заполняет кеш результатов самых частых запросов.
+Команда ``search_report`` показывает запросы без результатов и медленные запросы.
+"""
+import atexit
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Avg, Count, Max, Q
+from django.http import QueryDict
+from django.utils import timezone
+
+from jobs.forms import JobSearchForm
+from jobs.models import JobVacancy
+from . import caching
+from .analysis import normalize_query
+from .models import PopularQuery, SearchQuery
+from .search import FederatedSearch
+
+logger = logging.getLogger('core.search')
+
+
+class SearchLogBuffer:
+    """Буфер записей журнала с фоновым сохранением пачками"""
+
+    def __init__(self, batch_size, interval, max_size):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_size = max_size
+        self._entries = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, entry):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Процесс создан через fork: поток родителя сюда не переходит
+                self._pid = os.getpid()
+                self._entries = []
+                self._thread = None
+            if len(self._entries) >= self.max_size:
+                # База не принимает записи дольше обычного - старые отбрасываем
+                del self._entries[:self.batch_size]
+            self._entries.append(entry)
+            full = len(self._entries) >= self.batch_size
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='search-log', daemon=True)
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Сохраняет накопленные записи; возвращает их количество"""
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if not entries:
+            return 0
+        try:
+            SearchQuery.objects.bulk_create(entries, batch_size=self.batch_size)
+        except DatabaseError as error:
+            logger.warning('Журнал поиска: не сохранено записей %s: %s', len(entries), error)
+            return 0
+        return len(entries)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # Соединение потока не закрывается сигналом окончания запроса
+                connections.close_all()
+
+
+buffer = SearchLogBuffer(
+    settings.SEARCH_LOG_BATCH_SIZE,
+    settings.SEARCH_LOG_FLUSH_INTERVAL,
+    settings.SEARCH_LOG_BATCH_SIZE * 10,
+)
+atexit.register(buffer.flush)
+
+
+def record(source, query, filters, results, elapsed):
+    """Добавляет запрос в журнал; ``elapsed`` - время ответа в секундах"""
+    if not settings.SEARCH_LOG_ENABLED:
+        return
+    buffer.add(SearchQuery(
+        source=source,
+        query=normalize_query(query)[:255],
+        filters=filters[:255],
+        results=results,
+        elapsed_ms=round(elapsed * 1000),
+        created_at=timezone.now(),
+    ))
+
+
+class SearchLogMixin:
+    """Записывает поиск представления в журнал после отрисовки ответа
+
+    Представление сохраняет в ``self.logged_search`` кортеж
+    (запрос, фильтры, найдено), если запрос нужно записать. Подходит
+    и для асинхронных представлений.
+    """
+    search_log_source = None
+
+    def dispatch(self, request, *args, **kwargs):
+        started = time.monotonic()
+        self.logged_search = None
+        response = super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self._log_async(response, started)
+        return self._log(response, started)
+
+    async def _log_async(self, response, started):
+        return self._log(await response, started)
+
+    def _log(self, response, started):
+        if self.logged_search is not None and hasattr(response, 'add_post_render_callback'):
+            query, filters, results = self.logged_search
+            response.add_post_render_callback(
+                lambda response: record(
+                    self.search_log_source, query, filters, results, time.monotonic() - started,
+                )
+            )
+        return response
+
+
+def vacancy_count_key(keywords, filters):
+    """Ключ кеша числа вакансий для фильтров списка; ключевые слова - как в журнале поиска"""
+    digest = hashlib.md5(f"{normalize_query(keywords)}?{filters}".encode()).hexdigest()
+    return f"vacancy_count:{caching.generation(caching.VACANCIES)}:{digest}"
+
+
+def warm(popular):
+    """Заполняет кеш результатов для популярного запроса"""
+    if popular.source == 'site':
+        FederatedSearch().warm(popular.query)
+    elif popular.source == 'vacancies':
+        data = QueryDict(popular.filters, mutable=True)
+        data['keywords'] = popular.query
+        form = JobSearchForm(data)
+        if form.is_valid():
+            # Тот же пагинатор, что и в списке вакансий: он сохраняет число записей в кеш
+            paginator = caching.CachedCountPaginator(
+                form.filter(JobVacancy.objects.filter(status='open')), 1,
+                cache_key=vacancy_count_key(*form.search_params()), timeout=settings.SEARCH_CACHE_TIMEOUT,
+            )
+            return paginator.count
+
+
+def aggregate(since, queryset=None):
+    """Запросы журнала с ``since``, сгруппированные по тексту и фильтрам"""
+    queryset = SearchQuery.objects.all() if queryset is None else queryset
+    return (
+        queryset.filter(created_at__gte=since)
+        .values('source', 'query', 'filters')
+        .annotate(
+            searches=Count('pk'),
+            zero_results=Count('pk', filter=Q(results=0)),
+            avg_results=Avg('results'),
+            avg_elapsed=Avg('elapsed_ms'),
+            max_elapsed=Max('elapsed_ms'),
+        )
+    )
+
+
+def refresh_popular(days=None, limit=None):
+    """Пересчитывает ``PopularQuery`` по журналу за ``days`` дней"""
+    days = days or settings.SEARCH_POPULAR_DAYS
+    limit = limit or settings.SEARCH_POPULAR_LIMIT
+    now = timezone.now()
+    rows = aggregate(now - timedelta(days=days)).order_by('-searches', '-max_elapsed')[:limit]
+    popular = [
+        PopularQuery(
+            source=row['source'],
+            query=row['query'],
+            filters=row['filters'],
+            searches=row['searches'],
+            zero_results=row['zero_results'],
+            results=round(row['avg_results']),
+            avg_elapsed_ms=round(row['avg_elapsed']),
+            max_elapsed_ms=row['max_elapsed'],
+            updated_at=now,
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        PopularQuery.objects.all().delete()
+        PopularQuery.objects.bulk_create(popular)
+    return popular
+
+
+def purge(days=None):
+    """Удаляет записи журнала старше ``SEARCH_LOG_RETENTION_DAYS``"""
+    days = days or settings.SEARCH_LOG_RETENTION_DAYS
+    return SearchQuery.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()[0]
+
+
+def zero_result_queries(since, limit=50):
+    """Частые запросы, которые ничего не нашли"""
+    return (
+        aggregate(since, SearchQuery.objects.filter(results=0))
+        .order_by('-searches')[:limit]
+    )
+
+
+def slow_queries(since, threshold_ms, limit=50):
+    """Запросы, хотя бы раз отвечавшие дольше ``threshold_ms``, от самых медленных"""
+    return (
+        aggregate(since)
+        .filter(max_elapsed__gte=threshold_ms)
+        .order_by('-max_elapsed')[:limit]
+    )
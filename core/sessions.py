@@ -0,0 +1,45 @@
+"""
+Хранение сессий.
+
+Движок выбирается настройкой ``SESSION_BACKEND`` (переменная окружения
+с тем же именем):
+
+* ``db`` - каждая сессия читается из таблицы ``django_session`` в каждом
+  запросе авторизованного пользователя;
+* ``cached_db`` (по умолчанию) - сессия читается из общего кеша, в базу идёт
+  только запись (вход, выход, изменение данных сессии) и чтение при промахе кеша;
+* ``signed_cookies`` - сессия хранится в подписанной cookie, база не нужна
+  совсем, но выход не отзывает украденную cookie до истечения её срока.
+
+Сообщения ``django.contrib.messages`` хранятся в cookie (``MESSAGE_STORAGE``)
+и сессию не затрагивают.
+
+Истёкшие сессии остаются в таблице, пока их не удалит команда
+``purge_sessions``. Она удаляет их пачками по первичному ключу, чтобы не
+блокировать таблицу надолго.
+"""
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+DATABASE_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+def stored_in_database():
+    return settings.SESSION_ENGINE in DATABASE_ENGINES
+
+
+def purge_expired(batch_size=None, now=None):
+    """Удаляет истёкшие сессии пачками; возвращает число удалённых"""
+    batch_size = batch_size or settings.SESSION_PURGE_BATCH_SIZE
+    now = now or timezone.now()
+    expired = Session.objects.filter(expire_date__lt=now)
+    deleted = 0
+    while True:
+        keys = list(expired.values_list('session_key', flat=True)[:batch_size])
+        if not keys:
+            return deleted
+        deleted += Session.objects.filter(session_key__in=keys).delete()[0]
@@ -0,0 +1,31 @@
+"""Обработчики сигналов моделей основного приложения"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import caching, search_index
+from .models import Article, News
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def news_changed(sender, **kwargs):
+    caching.bump(caching.NEWS)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def article_changed(sender, **kwargs):
+    caching.bump(caching.ARTICLES)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_save, sender=Article)
+def index_for_search(sender, instance, **kwargs):
+    """Обновляет основы слов объекта в поисковом индексе"""
+    search_index.index_objects(sender, [instance])
+
+
+@receiver(post_delete, sender=News)
+@receiver(post_delete, sender=Article)
+def remove_from_search(sender, instance, **kwargs):
+    search_index.remove_objects(sender, [instance.pk])
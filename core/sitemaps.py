@@ -0,0 +1,275 @@
+"""
+Карта сайта в виде статических файлов.
+
+``generate_sitemaps`` записывает в ``SITEMAP_ROOT`` индекс ``sitemap.xml`` и
+сжатые файлы ``<раздел>-<номер>.xml.gz``. Каждый файл содержит строки с
+первичным ключом из своего диапазона длиной ``SITEMAP_SHARD_SIZE``, поэтому
+состав файла не меняется при добавлении строк в другие диапазоны.
+
+Для каждого диапазона одним GROUP BY считаются число строк и последнее
+``updated_at``. Перезаписываются только файлы, у которых эта подпись
+изменилась по сравнению с ``manifest.json``. Готовые файлы может отдавать
+как Django (``SitemapFileView``), так и веб-сервер напрямую.
+
+Там, где команду нельзя запустить рядом с веб-процессом (сборка Railway без
+доступа к базе, отдельный контейнер cron), ``ensure_generated()`` создаёт файлы
+при первом запросе к карте сайта. Существующие файлы запросы не обновляют -
+это дело ``generate_sitemaps`` (cron или ``--loop``). Генерация из команды и
+из запросов разных воркеров идёт под блокировкой файла ``.generate.lock``.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Category, JobVacancy
+from users.models import EmployerProfile
+from .models import Article, News, Page
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировка только между потоками процесса
+    fcntl = None
+
+INDEX_FILENAME = 'sitemap.xml'
+MANIFEST_FILENAME = 'manifest.json'
+LOCK_FILENAME = '.generate.lock'
+_generate_lock = threading.Lock()
+SLUG_PLACEHOLDER = 'sitemap-slug-placeholder'
+
+# Разделы сайта без собственных моделей
+STATIC_URL_NAMES = (
+    'core:home', 'jobs:vacancy_list', 'core:article_list', 'core:news_list',
+    'core:contact', 'core:faq', 'users:register', 'users:login',
+)
+
+
+@dataclass
+class Section:
+    """Раздел карты сайта: строки модели с адресами вида ``url_name`` + slug"""
+    name: str
+    queryset: object
+    url_name: str
+    lastmod_field: str = 'updated_at'
+    changefreq: str = 'weekly'
+    priority: str = '0.5'
+
+    def buckets(self, size):
+        """Подпись каждого диапазона первичных ключей: число строк и последнее изменение"""
+        rows = (
+            self.queryset.order_by()
+            .annotate(bucket=(F('pk') - 1) / size)
+            .values('bucket')
+            .annotate(count=Count('pk'), **({'lastmod': Max(self.lastmod_field)} if self.lastmod_field else {}))
+        )
+        if self.lastmod_field:
+            return {
+                row['bucket']: f"{row['count']}:{row['lastmod'].isoformat() if row['lastmod'] else ''}"
+                for row in rows
+            }
+        # Без даты изменения подписью служит хеш адресов - такие таблицы небольшие
+        signatures = {}
+        for row in rows:
+            digest = hashlib.md5()
+            for _, slug, _ in self.rows(row['bucket'], size):
+                digest.update(slug.encode())
+            signatures[row['bucket']] = f"{row['count']}:{digest.hexdigest()}"
+        return signatures
+
+    def rows(self, bucket, size):
+        fields = ['pk', 'slug'] + ([self.lastmod_field] if self.lastmod_field else [])
+        queryset = self.queryset.filter(pk__gt=bucket * size, pk__lte=(bucket + 1) * size).order_by('pk')
+        for row in queryset.values_list(*fields).iterator(chunk_size=5000):
+            yield row[0], row[1], row[2] if self.lastmod_field else None
+
+    def urls(self, bucket, size, base_url):
+        # reverse() на каждую строку медленный, поэтому строим адрес один раз и подставляем slug
+        template = base_url + reverse(self.url_name, kwargs={'slug': SLUG_PLACEHOLDER})
+        for _, slug, lastmod in self.rows(bucket, size):
+            yield template.replace(SLUG_PLACEHOLDER, slug), lastmod
+
+
+def sections():
+    return [
+        Section('vacancies', JobVacancy.objects.filter(status='open'), 'jobs:vacancy_detail',
+                changefreq='daily', priority='0.9'),
+        Section('articles', Article.objects.filter(is_published=True), 'core:article_detail', priority='0.7'),
+        Section('news', News.objects.filter(is_published=True), 'core:news_detail', priority='0.7'),
+        Section('pages', Page.objects.filter(is_published=True), 'core:page', changefreq='monthly'),
+        Section('categories', Category.objects.all(), 'jobs:category', lastmod_field=None,
+                changefreq='daily', priority='0.8'),
+        Section('employers', EmployerProfile.objects.exclude(slug=''), 'users:employer_profile',
+                priority='0.6'),
+    ]
+
+
+def _url_element(loc, lastmod=None, changefreq=None, priority=None):
+    parts = [f"<url><loc>{escape(loc)}</loc>"]
+    if lastmod:
+        parts.append(f"<lastmod>{lastmod.date().isoformat()}</lastmod>")
+    if changefreq:
+        parts.append(f"<changefreq>{changefreq}</changefreq>")
+    if priority:
+        parts.append(f"<priority>{priority}</priority>")
+    parts.append('</url>\n')
+    return ''.join(parts)
+
+
+def _write_atomic(path, chunks, compress):
+    # Имя с pid: файлы могут одновременно обновлять несколько воркеров
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    # mtime=0 - одинаковое содержимое даёт одинаковый файл
+    opener = (lambda: gzip.GzipFile(tmp_path, 'wb', mtime=0)) if compress else (lambda: open(tmp_path, 'wb'))
+    with opener() as f:
+        for chunk in chunks:
+            f.write(chunk.encode('utf-8'))
+    os.replace(tmp_path, path)
+
+
+def _urlset(elements):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    yield from elements
+    yield '</urlset>\n'
+
+
+class SitemapGenerator:
+    def __init__(self, root=None, base_url=None, shard_size=None):
+        self.root = root or settings.SITEMAP_ROOT
+        self.base_url = (base_url or settings.SITE_URL).rstrip('/')
+        self.shard_size = shard_size or settings.SITEMAP_SHARD_SIZE
+
+    def path(self, filename):
+        return os.path.join(self.root, filename)
+
+    def load_manifest(self):
+        try:
+            with open(self.path(MANIFEST_FILENAME), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Другой адрес сайта или размер файла - все файлы устарели
+        if manifest.get('base_url') != self.base_url or manifest.get('shard_size') != self.shard_size:
+            return {}
+        return manifest
+
+    @contextmanager
+    def lock(self):
+        """Блокировка генерации для всех процессов, пишущих в ``root``"""
+        with _generate_lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.path(LOCK_FILENAME), 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def generate(self, force=False):
+        """Обновляет изменившиеся файлы и индекс; возвращает статистику
+
+        Вызывающий держит ``lock()``, если генерация может идти параллельно.
+        """
+        started = time.monotonic()
+        os.makedirs(self.root, exist_ok=True)
+        previous = {} if force else self.load_manifest().get('shards', {})
+        shards = {}
+        stats = {'written': 0, 'skipped': 0, 'removed': 0, 'urls': 0}
+
+        static_signature = hashlib.md5(' '.join(
+            self.base_url + reverse(name) for name in STATIC_URL_NAMES
+        ).encode()).hexdigest()
+        self._update_shard('sections-0.xml.gz', static_signature, previous, shards, stats, self._static_elements)
+
+        for section in sections():
+            for bucket, signature in sorted(section.buckets(self.shard_size).items()):
+                filename = f"{section.name}-{bucket}.xml.gz"
+                self._update_shard(
+                    filename, signature, previous, shards, stats,
+                    lambda section=section, bucket=bucket: self._section_elements(section, bucket),
+                )
+
+        for filename in previous.keys() - shards.keys():
+            try:
+                os.remove(self.path(filename))
+            except FileNotFoundError:
+                pass
+            stats['removed'] += 1
+
+        self._write_index(shards)
+        manifest = {'base_url': self.base_url, 'shard_size': self.shard_size, 'shards': shards}
+        _write_atomic(self.path(MANIFEST_FILENAME), [json.dumps(manifest, ensure_ascii=False, indent=1)], False)
+        stats['shards'] = len(shards)
+        stats['elapsed'] = time.monotonic() - started
+        return stats
+
+    def _update_shard(self, filename, signature, previous, shards, stats, elements):
+        old = previous.get(filename)
+        if old and old['signature'] == signature and os.path.exists(self.path(filename)):
+            shards[filename] = old
+            stats['skipped'] += 1
+            return
+        counter = {'urls': 0}
+
+        def counted():
+            for element in elements():
+                counter['urls'] += 1
+                yield element
+
+        _write_atomic(self.path(filename), _urlset(counted()), True)
+        shards[filename] = {
+            'signature': signature,
+            'urls': counter['urls'],
+            'generated_at': timezone.now().isoformat(),
+        }
+        stats['written'] += 1
+        stats['urls'] += counter['urls']
+
+    def _static_elements(self):
+        for name in STATIC_URL_NAMES:
+            yield _url_element(self.base_url + reverse(name), changefreq='daily', priority='0.8')
+
+    def _section_elements(self, section, bucket):
+        for loc, lastmod in section.urls(bucket, self.shard_size, self.base_url):
+            yield _url_element(loc, lastmod, section.changefreq, section.priority)
+
+    def _write_index(self, shards):
+        location = self.base_url + reverse('sitemap_file', kwargs={'path': ''})
+
+        def entries():
+            yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+            yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            for filename, shard in sorted(shards.items()):
+                yield (
+                    f"<sitemap><loc>{escape(location + filename)}</loc>"
+                    f"<lastmod>{shard['generated_at'][:10]}</lastmod></sitemap>\n"
+                )
+            yield '</sitemapindex>\n'
+
+        _write_atomic(self.path(INDEX_FILENAME), entries(), False)
+
+
+def ensure_generated():
+    """Создаёт файлы карты сайта, если индекса ещё нет; True - файлы создавались"""
+    generator = SitemapGenerator()
+    index = generator.path(INDEX_FILENAME)
+    if os.path.exists(index):
+        return False
+    with generator.lock():
+        # Пока ждали блокировку, файлы мог создать другой воркер
+        if os.path.exists(index):
+            return False
+        generator.generate()
+    return True
@@ -0,0 +1,72 @@
+"""
+Сайт административной панели.
+
+``CustomAdminSite`` подключается как ``admin.site`` через ``core.apps.AdminConfig``
+(``default_site``), поэтому модули ``admin.py`` регистрируют модели обычным
+``admin.site.register``.
+
+Модули ``admin.py`` со всеми их импортами загружаются не при запуске Django, а при
+первом обращении к URL админки или при проверках manage.py check. Команды manage.py, которым
+админка не нужна, запускаются быстрее; веб-процесс загружает её вместе с URL
+(см. core/warmup.py).
+"""
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin import checks
+from django.core.exceptions import PermissionDenied
+
+
+def check_admin_app(app_configs, **kwargs):
+    """Проверки админки Django после загрузки admin.py: без неё регистраций ещё нет"""
+    admin.site.discover()
+    return checks.check_admin_app(app_configs, **kwargs)
+
+
+class CustomAdminSite(admin.AdminSite):
+    site_header = settings.ADMIN_SITE_HEADER
+    site_title = settings.ADMIN_SITE_TITLE
+    index_title = settings.ADMIN_INDEX_TITLE
+
+    _discovered = False
+
+    def discover(self):
+        """Загружает модули admin.py приложений, если они ещё не загружены"""
+        if not self._discovered:
+            self._discovered = True
+            admin.autodiscover()
+
+    def get_urls(self):
+        self.discover()
+        return super().get_urls()
+
+    def get_app_list(self, request, app_label=None):
+        """
+        Возвращаем список приложений, включая модели и URL для админки
+        """
+        app_dict = self._build_app_dict(request, app_label)
+        return sorted(app_dict.values(), key=lambda x: x['name'].lower())
+
+    def index(self, request, extra_context=None):
+        if not request.user.is_staff:
+            raise PermissionDenied
+
+        from django.contrib.auth.models import User
+        from jobs.models import JobVacancy
+        from users.models import EmployerProfile, JobSeekerProfile
+        from .models import Article, ContactMessage, News
+
+        # Статистика для главной страницы админки
+        article_count = Article.objects.count()
+        news_count = News.objects.count()
+        context = {
+            'vacancy_count': JobVacancy.objects.count(),
+            'user_count': User.objects.count(),
+            'employer_count': EmployerProfile.objects.count(),
+            'jobseeker_count': JobSeekerProfile.objects.count(),
+            'article_count': article_count,
+            'news_count': news_count,
+            'content_count': article_count + news_count,
+            'message_count': ContactMessage.objects.count(),
+            **(extra_context or {}),
+        }
+        return super().index(request, context)
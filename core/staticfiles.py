@@ -0,0 +1,134 @@
+"""
+Сборка статических файлов.
+
+``StaticFilesStorage`` используется во всех окружениях: collectstatic
+(команда ``build_assets``) записывает копии с хешем содержимого в имени,
+``staticfiles.json`` с соответствием имён и сжатые варианты ``.gz`` и ``.br``
+(brotli - если установлен пакет Brotli). WhiteNoise отдаёт хешированные файлы
+с ``Cache-Control: max-age=315360000, public, immutable`` и выбирает сжатый
+вариант по ``Accept-Encoding``.
+
+Собственные CSS и JS из ``STATIC_MINIFY_PATHS`` перед хешированием
+минифицируются: удаляются комментарии, отступы и пустые строки. JS
+обрабатывается построчно и осторожно - строки кода не склеиваются, чтобы не
+зависеть от автоматической расстановки точек с запятой.
+
+Пока ``build_assets`` не выполнялась и манифеста нет (например, в тестах, где
+``DEBUG = False``), ``{% static %}`` даёт исходные имена файлов без хеша.
+
+``check_references`` проверяет, что шаблоны проекта ссылаются через
+``{% static %}`` только на файлы из манифеста и не указывают путь к статике
+напрямую (такой путь не получает хеш и кешируется браузером без версии).
+"""
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.template.utils import get_app_template_dirs
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACE_AROUND = re.compile(r'\s*([{};,>])\s*')
+CSS_SPACE_AFTER_COLON = re.compile(r':\s+')
+JS_BLOCK_COMMENT = re.compile(r'^\s*/\*.*?\*/[ \t]*$', re.S | re.M)
+JS_LINE_COMMENT = re.compile(r'^\s*//.*$', re.M)
+
+STATIC_TAG = re.compile(r"""{%\s*static\s+(['"])(?P<path>[^'"]+)\1""")
+TEMPLATE_SUFFIXES = ('.html', '.txt', '.xml')
+
+
+def minify_css(text):
+    text = CSS_COMMENT.sub('', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = CSS_SPACE_AROUND.sub(r'\1', text)
+    # Пробел перед двоеточием не трогаем: в селекторе «a :hover» он значим
+    text = CSS_SPACE_AFTER_COLON.sub(':', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    text = JS_LINE_COMMENT.sub('', JS_BLOCK_COMMENT.sub('', text))
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def should_minify(name):
+    if not settings.STATIC_MINIFY or Path(name).suffix not in MINIFIERS:
+        return False
+    if name.endswith(('.min.css', '.min.js')):
+        return False
+    return name.replace('\\', '/').startswith(tuple(settings.STATIC_MINIFY_PATHS))
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Хешированные имена, сжатые копии и минификация собственных CSS/JS"""
+
+    # Файл, которого нет в манифесте, хешируется при обращении, а не роняет страницу
+    manifest_strict = False
+
+    def stored_name(self, name):
+        # Манифест не собран (тесты, деплой без build_assets) - ссылки без хеша
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def _save(self, name, content):
+        if should_minify(name):
+            minify = MINIFIERS[Path(name).suffix]
+            # chunks() читает файл с начала: после подсчёта хеша он прочитан до конца
+            text = b''.join(content.chunks()).decode('utf-8')
+            content = ContentFile(minify(text).encode('utf-8'))
+        return super()._save(name, content)
+
+
+@dataclass
+class Problem:
+    template: Path
+    line: int
+    message: str
+
+    def __str__(self):
+        return f"{self.template}:{self.line}: {self.message}"
+
+
+def project_template_dirs():
+    """Каталоги шаблонов проекта (без шаблонов сторонних приложений)"""
+    base = Path(settings.BASE_DIR).resolve()
+    dirs = [Path(path) for engine in settings.TEMPLATES for path in engine.get('DIRS', [])]
+    dirs += [Path(path) for path in get_app_template_dirs('templates')]
+    dirs = sorted({path.resolve() for path in dirs if path.is_dir() and path.resolve().is_relative_to(base)})
+    # Вложенный каталог (templates/admin внутри templates) уже просматривается вместе с родительским
+    return [path for path in dirs if not any(path != other and path.is_relative_to(other) for other in dirs)]
+
+
+def check_references(manifest=None):
+    """Ссылки шаблонов на статику, которых нет в манифесте или которые указаны без {% static %}"""
+    if manifest is None:
+        manifest, _ = staticfiles_storage.load_manifest()
+    static_prefix = '/' + settings.STATIC_URL.strip('/') + '/'
+    hardcoded = re.compile(r"""(?:src|href)\s*=\s*["']""" + re.escape(static_prefix) + r"""(?P<path>[^"'?#]+)""")
+
+    problems = []
+    for directory in project_template_dirs():
+        for template in sorted(directory.rglob('*')):
+            if template.suffix not in TEMPLATE_SUFFIXES:
+                continue
+            text = template.read_text(encoding='utf-8')
+            for match in STATIC_TAG.finditer(text):
+                if match['path'] not in manifest:
+                    problems.append(Problem(
+                        template, text.count('\n', 0, match.start()) + 1,
+                        f"файла {match['path']} нет в манифесте статики",
+                    ))
+            for match in hardcoded.finditer(text):
+                problems.append(Problem(
+                    template, text.count('\n', 0, match.start()) + 1,
+                    f"путь {static_prefix}{match['path']} указан без {{% static %}} и не получит хеш",
+                ))
+    return problems
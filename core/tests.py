@@ -1,3 +1,355 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.views import View
+
+from employment_project.backends.postgresql.pool import ConnectionPool
+
+from . import compression, replicas, search_index, sitemaps, warmup
+from .analysis import analyze, similarity, stem
+from .models import FAQ, News, Notification
+from .notifications import enqueue, enqueue_many, pending_count
+from .search import FederatedSearch, default_sources
+from .search_log import vacancy_count_key
+
+
+class SendDigestsTests(TestCase):
+    """Очередь уведомлений и команда send_digests"""
+
+    def setUp(self):
+        enqueue('seeker@example.com', 'application_status', 'Статус заявки изменён', 'Вас пригласили')
+        enqueue_many([
+            ('seeker@example.com', 'application_status', 'Заявка просмотрена', 'Работодатель открыл заявку'),
+            ('employer@example.com', 'new_application', 'Новая заявка', 'Отклик на вакансию'),
+            ('', 'new_application', 'Без получателя', 'Не попадает в очередь'),
+        ])
+
+    def send(self, *args):
+        call_command('send_digests', *args, stdout=StringIO())
+
+    def test_one_digest_per_recipient(self):
+        self.send()
+
+        self.assertEqual(len(mail.outbox), 2)
+        digests = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(digests['employer@example.com'].subject, 'Новая заявка')
+        seeker = digests['seeker@example.com']
+        self.assertIn('новых событий - 2', seeker.subject)
+        self.assertIn('Вас пригласили', seeker.body)
+        self.assertIn('Работодатель открыл заявку', seeker.body)
+
+    def test_sent_notifications_are_marked(self):
+        self.send('--batch-size', '1')
+
+        self.assertEqual(pending_count(), 0)
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(Notification.objects.count(), 3)
+
+        # Повторный прогон ничего не отправляет
+        self.send()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(EMAIL_FILE_PATH=directory):
+            self.send('--backend', 'django.core.mail.backends.filebased.EmailBackend')
+            written = ''.join(path.read_text(encoding='utf-8') for path in Path(directory).iterdir())
+
+        self.assertEqual(mail.outbox, [])
+        self.assertIn('To: seeker@example.com', written)
+        self.assertIn('To: employer@example.com', written)
+        self.assertEqual(pending_count(), 0)
+
+
+class FAQQuestionsView(replicas.ReplicaReadMixin, View):
+    def get(self, request):
+        return HttpResponse(', '.join(FAQ.objects.values_list('question', flat=True)))
+
+    def post(self, request):
+        FAQ.objects.create(question='Новый вопрос', answer='-')
+        return HttpResponse('ok')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTests(TestCase):
+    """Чтение с реплики и закрепление за основной базой; реплика - отдельный файл SQLite"""
+    # replica1 добавляется в setUpClass, до проверки списка баз классом TestCase
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings['replica1'] = connections.configure_settings({
+            'default': connections.settings['default'],
+            'replica1': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': str(Path(cls.replica_dir.name) / 'replica.sqlite3'),
+            },
+        })['replica1']
+        # Миграции на реплики не применяются (ReplicaRouter.allow_migrate), таблица создаётся вручную
+        with connections['replica1'].schema_editor() as editor:
+            editor.create_model(FAQ)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica1'].close()
+        del connections['replica1']
+        del connections.settings['replica1']
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        replicas._health.clear()
+        FAQ.objects.create(question='Из основной базы', answer='-')
+        FAQ.objects.using('replica1').create(question='С реплики', answer='-')
+        self.factory = RequestFactory()
+        self.view = replicas.ReplicaPinMiddleware(FAQQuestionsView.as_view())
+
+    def get(self, **cookies):
+        request = self.factory.get('/faq/')
+        request.COOKIES.update(cookies)
+        return self.view(request).content.decode()
+
+    def test_router_outside_views_uses_default(self):
+        self.assertEqual(list(FAQ.objects.values_list('question', flat=True)), ['Из основной базы'])
+
+    def test_reads_inside_block_go_to_replica_and_writes_to_default(self):
+        with replicas.read_from_replica() as alias:
+            self.assertEqual(alias, 'replica1')
+            self.assertEqual(list(FAQ.objects.values_list('question', flat=True)), ['С реплики'])
+            FAQ.objects.create(question='Запись', answer='-')
+        self.assertTrue(FAQ.objects.using('default').filter(question='Запись').exists())
+        self.assertFalse(FAQ.objects.using('replica1').filter(question='Запись').exists())
+
+    def test_view_reads_from_replica(self):
+        self.assertEqual(self.get(), 'С реплики')
+
+    def test_post_pins_reads_to_default(self):
+        response = self.view(self.factory.post('/faq/'))
+        pin = response.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(pin['max-age'], settings.REPLICA_PIN_SECONDS)
+        self.assertEqual(FAQ.objects.using('default').count(), 2)
+
+        # Пока cookie действует, пользователь видит свою запись из основной базы
+        self.assertEqual(self.get(**{settings.REPLICA_PIN_COOKIE: pin.value}), 'Из основной базы, Новый вопрос')
+        # После истечения срока чтение снова идёт с реплики
+        self.assertEqual(self.get(**{settings.REPLICA_PIN_COOKIE: str(time.time() - 1)}), 'С реплики')
+
+    def test_unhealthy_replica_falls_back_to_default(self):
+        replicas._health['replica1'] = (False, time.monotonic())
+        self.assertEqual(self.get(), 'Из основной базы')
+
+
+class SearchCacheKeyTests(SimpleTestCase):
+    """Ключи кеша поиска совпадают с ключами прогрева по популярным запросам (запрос из журнала нормализован)"""
+
+    def test_site_search_key_ignores_case_and_spaces(self):
+        search = FederatedSearch(sources=[])
+        self.assertEqual(search.cache_key('  Менеджер   ПРОДАЖ '), search.cache_key('менеджер продаж'))
+
+    def test_vacancy_count_key_ignores_case_and_spaces(self):
+        self.assertEqual(
+            vacancy_count_key('Менеджер  продаж', 'remote=on'), vacancy_count_key('менеджер продаж', 'remote=on'),
+        )
+
+
+class AnalyzerTests(SimpleTestCase):
+    """Разбор текста на основы: запрос и документ должны давать одни и те же основы"""
+
+    def test_word_forms_share_stem(self):
+        self.assertEqual(analyze('программист'), analyze('программиста'))
+        self.assertEqual(analyze('Программисты'), analyze('программистов'))
+
+    def test_yo_is_folded(self):
+        self.assertEqual(analyze('Ёлка зелёная'), analyze('елка зеленая'))
+
+    def test_stop_words_only(self):
+        self.assertEqual(analyze('и в на'), [])
+        self.assertEqual(analyze('The and of'), [])
+
+    def test_typo_is_similar_to_stem(self):
+        self.assertNotEqual(stem('програмист'), stem('программист'))
+        self.assertGreaterEqual(
+            similarity(stem('програмист'), stem('программист')), settings.SEARCH_FUZZY_THRESHOLD,
+        )
+
+
+class SearchIndexTests(TestCase):
+    """Поиск по индексу: словоформы, опечатки и запасной поиск подстроки"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('editor')
+        # Сигнал сохранения индексирует новость
+        cls.news = News.objects.create(
+            title='Программист', slug='developer', content='Разработка веб-сервисов', author=author,
+        )
+        # bulk_create сигналов не отправляет: новости нет в индексе, как записей до его появления
+        [cls.unindexed] = News.objects.bulk_create([
+            News(title='Вакансии C++', slug='cpp', content='Разработка на C++ и Qt', author=author),
+        ])
+
+    def search(self, query):
+        news = [source for source in default_sources() if source.name == 'news']
+        return FederatedSearch(sources=news, parallel=False).search(query)
+
+    def test_word_form(self):
+        terms = search_index.resolve('программиста')
+        self.assertEqual([(term.stems, term.exact) for term in terms], [((stem('программист'),), True)])
+        self.assertEqual(self.search('программиста').by_source['news'], [self.news])
+
+    def test_typo(self):
+        [term] = search_index.resolve('програмист')
+        self.assertFalse(term.exact)
+        self.assertIn(stem('программист'), term.stems)
+        self.assertEqual(self.search('програмист').by_source['news'], [self.news])
+
+    def test_unknown_words_fall_back_to_substring(self):
+        # От «C++» остаётся основа «c», которой нет в словаре
+        self.assertEqual(search_index.resolve('C++'), [])
+        self.assertEqual(self.search('C++').by_source['news'], [self.unindexed])
+
+    def test_stop_words_fall_back_to_substring(self):
+        self.assertEqual(search_index.resolve('на'), [])
+        self.assertEqual(self.search('на').by_source['news'], [self.unindexed])
+
+    def test_missing_word_finds_nothing(self):
+        self.assertEqual(self.search('программист бухгалтер').by_source['news'], [])
+
+
+class EnsureSitemapTests(TestCase):
+    """Запрос создаёт карту сайта, только если её ещё нет; обновление - дело generate_sitemaps"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name) / 'sitemaps'
+        settings_override = override_settings(SITEMAP_ROOT=str(self.root))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_generates_missing_index_once(self):
+        self.assertTrue(sitemaps.ensure_generated())
+        self.assertTrue((self.root / sitemaps.INDEX_FILENAME).is_file())
+        with mock.patch.object(sitemaps.SitemapGenerator, 'generate') as generate:
+            self.assertFalse(sitemaps.ensure_generated())
+        generate.assert_not_called()
+
+    def test_view_serves_existing_index_without_regenerating(self):
+        self.root.mkdir()
+        (self.root / sitemaps.INDEX_FILENAME).write_text('<sitemapindex/>')
+        with mock.patch.object(sitemaps.SitemapGenerator, 'generate') as generate:
+            response = self.client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'<sitemapindex/>')
+        generate.assert_not_called()
+
+
+class WarmUpConnectionsTests(SimpleTestCase):
+    """После подготовки главного процесса в пулах не остаётся открытых соединений"""
+
+    def test_idle_pool_connections_are_closed(self):
+        pool = ConnectionPool(min_size=1, max_size=2)
+        connection = pool.getconn(lambda: mock.Mock(closed=False))
+        pool.putconn(connection)
+        self.assertEqual(pool.snapshot()['idle'], 1)
+
+        with mock.patch.object(warmup.connections, 'close_all') as close_all, \
+                mock.patch.object(warmup.connections, 'all', return_value=[mock.Mock(pool=pool), object()]):
+            warmup.close_connections()
+
+        close_all.assert_called_once_with()
+        connection.close.assert_called_once_with()
+        self.assertEqual(pool.snapshot()['idle'], 0)
+        self.assertEqual(pool.snapshot()['size'], 0)
+
+
+class MinifyHtmlTests(SimpleTestCase):
+    """Минификация убирает отступы и комментарии, не меняя отображения"""
+
+    def test_indentation_and_comments_are_removed(self):
+        html = '<div>\n    <p>Текст  с   пробелами</p>   \n\n  <!-- служебный комментарий -->\n</div>\n'
+        self.assertEqual(compression.minify_html(html), '<div>\n<p>Текст  с   пробелами</p>\n</div>\n')
+
+    def test_preformatted_blocks_are_preserved(self):
+        blocks = [
+            '<pre>\n    отступ\n\n    сохраняется <!-- и комментарий -->\n</pre>',
+            '<textarea name="text">\n  строка\n\n  ещё строка</textarea>',
+            '<script>\n    // <!-- не HTML\n    var a = 1;\n</script>',
+            '<STYLE type="text/css">\n  p {\n    margin: 0;\n  }\n</STYLE>',
+        ]
+        for block in blocks:
+            with self.subTest(block=block[:10]):
+                self.assertIn(block, compression.minify_html(f"<div>\n    {block}\n</div>"))
+
+    def test_conditional_comments_are_kept(self):
+        html = '<head>\n  <!--[if lt IE 9]><script src="html5shiv.js"></script><![endif]-->\n</head>'
+        self.assertIn('<!--[if lt IE 9]>', compression.minify_html(html))
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Выбор кодировки, потоковые ответы и SSE"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, **meta):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip, br', **meta)
+        return compression.CompressionMiddleware(lambda request: response)(request)
+
+    def test_brotli_is_not_used_for_pages_with_csrf_token(self):
+        with mock.patch.object(compression, 'brotli', object()):
+            self.assertEqual(compression.choose_encoding(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip, br')), 'br')
+            request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip, br', CSRF_COOKIE_USED=True)
+            self.assertEqual(compression.choose_encoding(request), 'gzip')
+
+    @override_settings(COMPRESSION_ENABLED=True)
+    def test_page_with_csrf_token_gets_padded_gzip(self):
+        body = '<p>Результаты поиска</p>\n' * 100
+        with mock.patch.object(compression, 'brotli', object()):
+            response = self.process(HttpResponse(body), CSRF_COOKIE_USED=True)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), body)
+
+    @override_settings(COMPRESSION_ENABLED=True)
+    def test_streaming_response_is_compressed_in_chunks(self):
+        chunks = [f"строка {number}\n".encode() for number in range(200)]
+        with mock.patch.object(compression, 'brotli', None):
+            response = self.process(StreamingHttpResponse(iter(chunks), content_type='text/csv'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+    @override_settings(COMPRESSION_ENABLED=True)
+    def test_async_streaming_response_is_compressed(self):
+        async def chunks():
+            for number in range(200):
+                yield f"строка {number}\n".encode()
+
+        async def collect(stream):
+            return b''.join([chunk async for chunk in stream])
+
+        with mock.patch.object(compression, 'brotli', None):
+            response = self.process(StreamingHttpResponse(chunks(), content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        content = asyncio.run(collect(response.streaming_content))
+        self.assertEqual(gzip.decompress(content).decode().count('строка'), 200)
+
+    @override_settings(COMPRESSION_ENABLED=True)
+    def test_server_sent_events_pass_through(self):
+        events = [b'event: ping\ndata: {}\n\n'] * 100
+        response = self.process(StreamingHttpResponse(iter(events), content_type='text/event-stream'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(list(response.streaming_content), events)
@@ -1,5 +1,7 @@
-from django.urls import path
-from . import views
+from django.urls import path, register_converter
+from . import feeds, views
+
+register_converter(feeds.FeedFormatConverter, 'feed')
 
 app_name = 'core'
 
@@ -11,10 +13,12 @@ urlpatterns = [
     path('articles/', views.ArticleListView.as_view(), name='article_list'),
     path('articles/category/<slug:slug>/', views.ArticleListView.as_view(), name='article_category'),
     path('articles/tag/<slug:tag_slug>/', views.ArticleListView.as_view(), name='article_tag'),
+    path('articles/feed/<feed:feed_format>/', feeds.ArticleFeed(), name='article_feed'),
     path('articles/<slug:slug>/', views.ArticleDetailView.as_view(), name='article_detail'),
     
     # Новости
     path('news/', views.NewsListView.as_view(), name='news_list'),
+    path('news/feed/<feed:feed_format>/', feeds.NewsFeed(), name='news_feed'),
     path('news/<slug:slug>/', views.NewsDetailView.as_view(), name='news_detail'),
     
     # Статические страницы
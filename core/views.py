@@ -1,29 +1,46 @@
+import os
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
 from django.shortcuts import render, get_object_or_404, redirect
+from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
-from django.db.models import Q
+from django.db.models import Q, F
 from django.core.paginator import Paginator
-from django.http import HttpResponseRedirect
+from django.http import FileResponse, Http404, HttpResponseNotModified, HttpResponseRedirect
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
 from django.contrib import messages
-from .models import Article, ArticleCategory, News, Page, ContactMessage, FAQ, Tag
+from .aio import aget_object_or_404, alist, run_concurrently
+from .models import Article, ArticleCategory, News, Page, ContactMessage, FAQ, Tag, PopularQuery
 from .forms import ContactForm
+from .replicas import ReplicaReadMixin
+from .search import FederatedSearch
+from .search_log import SearchLogMixin
+from .sitemaps import INDEX_FILENAME, ensure_generated
 from jobs.models import JobVacancy, Category as JobCategory
 
-class HomeView(TemplateView):
+class HomeView(ReplicaReadMixin, TemplateView):
     """Представление главной страницы"""
     template_name = 'core/home.html'
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['latest_news'] = News.objects.filter(is_published=True)[:5]
-        context['latest_articles'] = Article.objects.filter(is_published=True)[:3]
-        context['latest_vacancies'] = JobVacancy.objects.filter(status='open')[:6]
-        context['job_categories'] = JobCategory.objects.all()[:8]
-        return context
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        # Четыре независимых списка загружаются одновременно (см. core/aio.py)
+        context.update(await run_concurrently(
+            latest_news=News.objects.filter(is_published=True)[:5],
+            latest_articles=Article.objects.filter(is_published=True).select_related('category')[:3],
+            latest_vacancies=JobVacancy.objects.filter(status='open').select_related('employer', 'location')[:6],
+            job_categories=JobCategory.objects.all()[:8],
+        ))
+        return self.render_to_response(context)
 
 
-class ArticleListView(ListView):
+class ArticleListView(ReplicaReadMixin, ListView):
     """Представление списка статей"""
     model = Article
     template_name = 'core/article_list.html'
@@ -72,33 +89,39 @@ class ArticleListView(ListView):
         return context
 
 
-class ArticleDetailView(DetailView):
+async def can_view(request, obj):
+    """Неопубликованные материалы видят только сотрудники"""
+    return obj.is_published or await sync_to_async(lambda: request.user.is_staff)()
+
+
+class ArticleDetailView(ReplicaReadMixin, DetailView):
     """Представление отдельной статьи"""
     model = Article
     template_name = 'core/article_detail.html'
     context_object_name = 'article'
     
-    def get_object(self):
-        article = super().get_object()
-        if article.is_published or self.request.user.is_staff:
-            # Увеличиваем счетчик просмотров
-            article.views += 1
-            article.save()
-            return article
-        return get_object_or_404(Article, slug=self.kwargs['slug'], is_published=True)
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        article = self.object
-        # Добавляем связанные статьи из той же категории
-        context['related_articles'] = Article.objects.filter(
-            category=article.category, 
-            is_published=True
-        ).exclude(id=article.id)[:3]
-        return context
+    async def get(self, request, *args, **kwargs):
+        article = await aget_object_or_404(
+            Article.objects.select_related('author', 'category').prefetch_related('tags'), slug=kwargs['slug'],
+        )
+        if not await can_view(request, article):
+            raise Http404('Статья не опубликована')
+        self.object = article
+        # Счётчик просмотров увеличивается в основной базе, не перезаписывая остальные поля,
+        # одновременно с загрузкой связанных статей из той же категории
+        loaded = await run_concurrently(
+            views=lambda: Article.objects.filter(pk=article.pk).update(views=F('views') + 1),
+            related_articles=Article.objects.filter(
+                category_id=article.category_id,
+                is_published=True
+            ).exclude(id=article.id)[:3],
+        )
+        article.views += 1
+        context = self.get_context_data(object=article, related_articles=loaded['related_articles'])
+        return self.render_to_response(context)
 
 
-class NewsListView(ListView):
+class NewsListView(ReplicaReadMixin, ListView):
     """Представление списка новостей"""
     model = News
     template_name = 'core/news_list.html'
@@ -118,32 +141,30 @@ class NewsListView(ListView):
         return queryset
 
 
-class NewsDetailView(DetailView):
+class NewsDetailView(ReplicaReadMixin, DetailView):
     """Представление отдельной новости"""
     model = News
     template_name = 'core/news_detail.html'
     context_object_name = 'news'
     
-    def get_object(self):
-        news = super().get_object()
-        if news.is_published or self.request.user.is_staff:
-            # Увеличиваем счетчик просмотров
-            news.views += 1
-            news.save()
-            return news
-        return get_object_or_404(News, slug=self.kwargs['slug'], is_published=True)
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        news_item = self.object
-        # Показываем похожие новости вместо просто последних новостей
-        context['similar_news'] = News.objects.filter(
-            is_published=True
-        ).exclude(id=news_item.id).order_by('-created_at')[:4]
-        return context
+    async def get(self, request, *args, **kwargs):
+        news = await aget_object_or_404(News.objects.all(), slug=kwargs['slug'])
+        if not await can_view(request, news):
+            raise Http404('Новость не опубликована')
+        self.object = news
+        # Счётчик просмотров и похожие новости вместо просто последних - одновременно
+        loaded = await run_concurrently(
+            views=lambda: News.objects.filter(pk=news.pk).update(views=F('views') + 1),
+            similar_news=News.objects.filter(
+                is_published=True
+            ).exclude(id=news.id).order_by('-created_at')[:4],
+        )
+        news.views += 1
+        context = self.get_context_data(object=news, similar_news=loaded['similar_news'])
+        return self.render_to_response(context)
 
 
-class PageDetailView(DetailView):
+class PageDetailView(ReplicaReadMixin, DetailView):
     """Представление статической страницы"""
     model = Page
     template_name = 'core/page.html'
@@ -173,7 +194,7 @@ class ContactSuccessView(TemplateView):
     template_name = 'core/contact_success.html'
 
 
-class FAQView(ListView):
+class FAQView(ReplicaReadMixin, ListView):
     """Представление FAQ"""
     model = FAQ
     template_name = 'core/faq.html'
@@ -198,46 +219,62 @@ class FAQView(ListView):
         return context
 
 
-class SearchView(TemplateView):
+class SearchView(SearchLogMixin, ReplicaReadMixin, TemplateView):
     """Представление для поиска"""
     template_name = 'core/search_results.html'
+    search_log_source = 'site'
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        q = self.request.GET.get('q', '')
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        q = ' '.join(request.GET.get('q', '').split())
         
         if q:
-            # Поиск по вакансиям
-            vacancies = JobVacancy.objects.filter(
-                Q(title__icontains=q) | 
-                Q(description__icontains=q) |
-                Q(requirements__icontains=q),
-                status='open'
-            )
-            
-            # Поиск по статьям
-            articles = Article.objects.filter(
-                Q(title__icontains=q) | 
-                Q(content__icontains=q),
-                is_published=True
-            )
-            
-            # Поиск по новостям
-            news = News.objects.filter(
-                Q(title__icontains=q) | 
-                Q(content__icontains=q),
-                is_published=True
-            )
-            
-            context['vacancies'] = vacancies[:5]
-            context['articles'] = articles[:5]
-            context['news'] = news[:5]
+            # Вакансии, статьи и новости ищутся одновременно (см. core/search.py)
+            results = await FederatedSearch().acached_search(q)
+            context['results'] = results
+            context['vacancies'] = results.by_source['vacancies']
+            context['articles'] = results.by_source['articles']
+            context['news'] = results.by_source['news']
+            context['counts'] = results.counts
             context['query'] = q
-            context['total_results'] = vacancies.count() + articles.count() + news.count()
+            context['total_results'] = results.total
+            self.logged_search = (q, '', results.total)
         else:
             context['total_results'] = 0
+            # Пересчитываются командой refresh_popular_queries
+            context['popular_queries'] = await alist(PopularQuery.objects.filter(
+                source='site', results__gt=0,
+            ).exclude(query='')[:10])
         
-        return context
+        return self.render_to_response(context)
+
+
+class SitemapFileView(View):
+    """Отдаёт файлы карты сайта, подготовленные командой generate_sitemaps
+    
+    Если команда ещё не запускалась в этом окружении, файлы создаются
+    при запросе (см. core/sitemaps.py).
+    """
+    
+    def get(self, request, path=INDEX_FILENAME):
+        if not (path.endswith('.xml') or path.endswith('.xml.gz')):
+            raise Http404
+        try:
+            full_path = safe_join(settings.SITEMAP_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404
+        if path == INDEX_FILENAME or not os.path.isfile(full_path):
+            ensure_generated()
+        if not os.path.isfile(full_path):
+            raise Http404
+        
+        modified = os.stat(full_path).st_mtime
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), modified):
+            return HttpResponseNotModified()
+        content_type = 'application/gzip' if path.endswith('.gz') else 'application/xml'
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Last-Modified'] = http_date(modified)
+        return response
 
 
 def handler404(request, exception=None):
@@ -0,0 +1,118 @@
+"""
+Подготовка процесса к первым запросам.
+
+Без подготовки первый запрос каждого воркера сам загружает переводы, строит
+URL-резолверы (вместе с админкой, см. core/sites.py), компилирует шаблоны и
+заполняет кеш типов содержимого - это сотни миллисекунд на холодном старте.
+
+``warm_up()`` делает всё это заранее. gunicorn.conf.py вызывает её в главном
+процессе после загрузки приложения (``preload_app``), до запуска воркеров:
+воркеры получают готовые резолверы и шаблоны при fork. Если ``preload_app``
+выключен, подготовка выполняется в каждом воркере до приёма запросов.
+Соединения с базой, открытые при подготовке, закрываются, чтобы не достаться
+воркерам общими; с пулом PostgreSQL закрываются и соединения, вернувшиеся в пул.
+"""
+import logging
+import time
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import get_template
+from django.urls import URLResolver, get_resolver
+from django.utils import translation
+
+from . import caching
+from .search_index import INDEXED_FIELDS
+from .staticfiles import TEMPLATE_SUFFIXES, project_template_dirs
+
+logger = logging.getLogger('core.warmup')
+
+
+@dataclass
+class Step:
+    name: str
+    seconds: float
+    count: int
+
+
+def load_translations():
+    """Загружает каталоги переводов языка сайта"""
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.gettext('')
+    return 1
+
+
+def populate_urls():
+    """Строит URL-резолверы, включая вложенные; возвращает число маршрутов"""
+    return _populate(get_resolver())
+
+
+def _populate(resolver):
+    # Словари reverse строятся при первом обращении отдельно для каждого языка
+    resolver.reverse_dict
+    count = 0
+    for pattern in resolver.url_patterns:
+        count += _populate(pattern) if isinstance(pattern, URLResolver) else 1
+    return count
+
+
+def compile_templates():
+    """Компилирует шаблоны проекта в кеш загрузчика; возвращает их число"""
+    compiled = 0
+    for directory in project_template_dirs():
+        for path in sorted(directory.rglob('*')):
+            if path.suffix not in TEMPLATE_SUFFIXES:
+                continue
+            name = path.relative_to(directory).as_posix()
+            try:
+                get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+                logger.warning('Шаблон %s не скомпилирован: %s', name, exc)
+            else:
+                compiled += 1
+    return compiled
+
+
+def prime_caches():
+    """Заполняет кеш типов содержимого процесса и счётчики поколений общего кеша"""
+    models = [apps.get_model(label) for label in INDEXED_FIELDS]
+    ContentType.objects.get_for_models(*models)
+    caching.generation(caching.VACANCIES, caching.NEWS, caching.ARTICLES)
+    return len(models)
+
+
+STEPS = (
+    ('переводы', load_translations),
+    ('URL', populate_urls),
+    ('шаблоны', compile_templates),
+    ('справочные кеши', prime_caches),
+)
+
+
+def warm_up():
+    """Выполняет все шаги подготовки и возвращает их время"""
+    steps = []
+    try:
+        for name, step in STEPS:
+            started = time.perf_counter()
+            count = step()
+            steps.append(Step(name, time.perf_counter() - started, count))
+    finally:
+        translation.deactivate()
+        close_connections()
+    return steps
+
+
+def close_connections():
+    """Закрывает соединения процесса, включая свободные соединения пулов"""
+    connections.close_all()
+    # close() с пулом (employment_project/backends/postgresql) только возвращает соединение в пул,
+    # и после fork его сокет достался бы всем воркерам
+    for connection in connections.all(initialized_only=True):
+        pool = getattr(connection, 'pool', None)
+        if pool is not None:
+            pool.close_all()
@@ -0,0 +1,41 @@
+"""
+PostgreSQL с пулом соединений в каждом процессе.
+
+Параметры пула задаются ключом ``OPTIONS['pool']`` (см. settings_production.py):
+``min_size``, ``max_size``, ``timeout``, ``max_idle``, ``max_lifetime``,
+``check_interval``, ``slow_wait``, ``stats_interval``. ``CONN_MAX_AGE`` должен
+быть 0: Django «закрывает» соединение в конце запроса, а на деле оно
+возвращается в пул.
+"""
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Настройки пула не передаются в psycopg2.connect()
+        params.pop('pool', None)
+        return params
+
+    @property
+    def pool(self):
+        # NAME меняется при создании тестовой базы, поэтому входит в ключ пула
+        settings_dict = self.settings_dict
+        key = (self.alias, settings_dict['NAME'], settings_dict['HOST'], settings_dict['PORT'], settings_dict['USER'])
+        return get_pool(key, name=self.alias, **settings_dict['OPTIONS'].get('pool', {}))
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        # Базовый класс выставляет уровень изоляции только при создании соединения
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
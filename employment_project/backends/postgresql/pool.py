@@ -0,0 +1,248 @@
+"""
+Пул соединений PostgreSQL внутри одного процесса (воркера gunicorn).
+
+Соединение берётся из пула при ``connect()`` Django и возвращается в него
+при ``close()``, то есть в конце каждого запроса. Перед выдачей соединение,
+простоявшее дольше ``check_interval`` секунд, проверяется запросом
+``SELECT 1``. Если все ``max_size`` соединений заняты, запрос ждёт
+освобождения не дольше ``timeout`` секунд. Время ожидания попадает в
+статистику пула и в журнал ``employment_project.db_pool``.
+"""
+import collections
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from psycopg2 import OperationalError, extensions
+
+logger = logging.getLogger('employment_project.db_pool')
+
+
+class PoolTimeout(OperationalError):
+    """Свободное соединение не появилось за отведённое время
+
+    Наследуется от OperationalError, чтобы Django выдавал её как django.db.OperationalError.
+    """
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    created: int = 0
+    discarded: int = 0
+    failed_checks: int = 0
+    timeouts: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    waits: collections.deque = field(default_factory=lambda: collections.deque(maxlen=1000))
+
+    def record_wait(self, wait):
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.waits.append(wait)
+
+
+@dataclass
+class _Entry:
+    connection: object
+    created_at: float
+    returned_at: float = 0.0
+
+
+class ConnectionPool:
+    def __init__(self, min_size=1, max_size=10, timeout=10.0, max_idle=300.0,
+                 max_lifetime=3600.0, check_interval=30.0, slow_wait=0.1, stats_interval=300.0, name='default'):
+        if min_size > max_size:
+            raise ValueError('min_size не может быть больше max_size')
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+        self.slow_wait = slow_wait
+        self.stats_interval = stats_interval
+        self.name = name
+        self.stats = PoolStats()
+        self._idle = collections.deque()
+        self._in_use = {}
+        self._size = 0
+        self._condition = threading.Condition()
+        self._stats_logged_at = time.monotonic()
+
+    def getconn(self, factory):
+        """Свободное проверенное соединение из пула или новое от ``factory``, если пул не заполнен"""
+        started = time.monotonic()
+        while True:
+            entry = self._acquire(started)
+            if entry is None:
+                entry = self._create(factory)
+            elif not self._is_healthy(entry):
+                self._discard(entry)
+                continue
+            break
+
+        wait = time.monotonic() - started
+        with self._condition:
+            self._in_use[id(entry.connection)] = entry
+            self.stats.record_wait(wait)
+        if wait >= self.slow_wait:
+            logger.warning('Пул %s: ожидание соединения %.3f с (занято %d из %d)',
+                           self.name, wait, len(self._in_use), self.max_size)
+        return entry.connection
+
+    def putconn(self, connection):
+        """Возвращает соединение в пул, откатывая незавершённую транзакцию"""
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            connection.close()
+            return
+
+        if not self._reset(connection) or time.monotonic() - entry.created_at >= self.max_lifetime:
+            self._discard(entry)
+            return
+
+        entry.returned_at = time.monotonic()
+        with self._condition:
+            self._idle.append(entry)
+            self._shrink()
+            self._condition.notify()
+        self._log_stats()
+
+    def snapshot(self):
+        """Текущее состояние и накопленная статистика ожидания"""
+        with self._condition:
+            waits = sorted(self.stats.waits)
+            return {
+                'name': self.name,
+                'pid': os.getpid(),
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'max_size': self.max_size,
+                'checkouts': self.stats.checkouts,
+                'created': self.stats.created,
+                'discarded': self.stats.discarded,
+                'failed_checks': self.stats.failed_checks,
+                'timeouts': self.stats.timeouts,
+                'wait_avg_ms': round(self.stats.wait_total / self.stats.checkouts * 1000, 3) if self.stats.checkouts else 0.0,
+                'wait_p95_ms': round(waits[int(len(waits) * 0.95)] * 1000, 3) if waits else 0.0,
+                'wait_max_ms': round(self.stats.wait_max * 1000, 3),
+            }
+
+    def close_all(self):
+        with self._condition:
+            while self._idle:
+                self._close(self._idle.pop())
+
+    def _acquire(self, started):
+        with self._condition:
+            while True:
+                if self._idle:
+                    # Последнее возвращённое соединение - самое «тёплое»
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.stats.timeouts += 1
+                    raise PoolTimeout(
+                        f"Пул {self.name}: нет свободного соединения за {self.timeout} с "
+                        f"(все {self.max_size} заняты)"
+                    )
+                self._condition.wait(remaining)
+
+    def _create(self, factory):
+        try:
+            connection = factory()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.stats.created += 1
+        return _Entry(connection, created_at=time.monotonic())
+
+    def _is_healthy(self, entry):
+        if entry.connection.closed:
+            return False
+        if time.monotonic() - entry.returned_at < self.check_interval:
+            return True
+        try:
+            with entry.connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except Exception:
+            with self._condition:
+                self.stats.failed_checks += 1
+            return False
+
+    def _reset(self, connection):
+        if connection.closed:
+            return False
+        try:
+            status = connection.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, entry):
+        with self._condition:
+            self._close(entry)
+            self._condition.notify()
+
+    def _close(self, entry):
+        # Вызывается под self._condition
+        self._size -= 1
+        self.stats.discarded += 1
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+
+    def _shrink(self):
+        # Закрываем давно простаивающие соединения сверх min_size (под self._condition)
+        now = time.monotonic()
+        while self._size > self.min_size and self._idle and now - self._idle[0].returned_at >= self.max_idle:
+            self._close(self._idle.popleft())
+
+    def _log_stats(self):
+        now = time.monotonic()
+        if now - self._stats_logged_at < self.stats_interval:
+            return
+        self._stats_logged_at = now
+        logger.info('Пул соединений: %s', self.snapshot())
+
+
+# (pid, ключ базы) -> пул. Пулы родительского процесса после fork не закрываются:
+# закрытие разорвало бы соединения, которыми ещё пользуется родитель.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, name='default', **options):
+    """Пул текущего процесса для базы ``key``; ``options`` - параметры ConnectionPool"""
+    key = (os.getpid(), key)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(name=name, **options)
+    return pool
+
+
+def pool_stats():
+    """Статистика всех пулов текущего процесса"""
+    pid = os.getpid()
+    return [pool.snapshot() for (owner, _), pool in _pools.items() if owner == pid]
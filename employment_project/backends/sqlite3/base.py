@@ -0,0 +1,47 @@
+"""
+SQLite для продакшена: PRAGMA при каждом подключении и режим начала транзакций.
+
+Дополнительные ключи ``OPTIONS``:
+
+* ``pragmas`` - словарь PRAGMA, которые выполняются для каждого нового
+  соединения, например ``{'journal_mode': 'WAL', 'synchronous': 'NORMAL'}``;
+* ``transaction_mode`` - ``DEFERRED``, ``IMMEDIATE`` или ``EXCLUSIVE``.
+  С ``IMMEDIATE`` блок ``transaction.atomic()`` сразу берёт блокировку записи,
+  и параллельный писатель ждёт её в пределах ``busy_timeout``, а не получает
+  «database is locked» при попытке повысить блокировку чтения до записи.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = dict(options.get('pragmas') or {})
+        self.transaction_mode = (options.get('transaction_mode') or '').upper() or None
+        if self.transaction_mode and self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"OPTIONS['transaction_mode'] должен быть одним из: {', '.join(TRANSACTION_MODES)}"
+            )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Собственные ключи не передаются в sqlite3.connect()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
+        else:
+            super()._start_transaction_under_autocommit()
@@ -32,7 +32,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    'core.apps.AdminConfig',  # вместо django.contrib.admin, см. core/sites.py
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -47,12 +47,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.compression.CompressionMiddleware',
+    'core.compression.HtmlMinifyMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.ProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.replicas.ReplicaPinMiddleware',
 ]
 
 ROOT_URLCONF = 'employment_project.urls'
@@ -97,6 +102,31 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения (см. core/replicas.py), например
+# DATABASE_REPLICA_URLS=postgres://replica1/db,postgres://replica2/db
+DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+DATABASE_REPLICAS = [f'replica{number}' for number in range(1, len(DATABASE_REPLICA_URLS) + 1)]
+if DATABASE_REPLICA_URLS:
+    import dj_database_url
+    for alias, url in zip(DATABASE_REPLICAS, DATABASE_REPLICA_URLS):
+        # В тестах реплика указывает на тестовую основную базу
+        DATABASES[alias] = {**dj_database_url.parse(url), 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = 10  # сколько читать основную базу после изменений пользователя
+REPLICA_PIN_COOKIE = 'db_pin'
+REPLICA_HEALTH_CHECK_INTERVAL = 30  # секунд между проверками доступности реплики
+
+# PRAGMA для SQLite в продакшене (см. employment_project/backends/sqlite3)
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,  # мс
+    'cache_size': -64000,  # отрицательное значение - в КиБ, т.е. 64 МБ
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -136,6 +166,19 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Хешированные имена, сжатые копии и минификация (см. core/staticfiles.py), собираются командой build_assets
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.staticfiles.StaticFilesStorage'},
+}
+STATIC_MINIFY = True
+STATIC_MINIFY_PATHS = ['css/', 'js/']  # минифицируются только собственные файлы, не статика админки
+
+# Карта сайта (см. core/sitemaps.py): файлы генерирует команда generate_sitemaps
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_SHARD_SIZE = 50000  # адресов в одном файле - ограничение протокола sitemaps
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -145,6 +188,87 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Электронная почта
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'Служба занятости <noreply@sluzba.local>'
+
+# Дайджесты уведомлений (см. core/notifications.py)
+NOTIFICATION_DIGEST_SUBJECT = 'Служба занятости'
+NOTIFICATION_DIGEST_INTERVAL = 15 * 60  # секунд между рассылками в режиме --loop
+NOTIFICATION_BATCH_SIZE = 100  # получателей на одну пачку писем
+
+# События в реальном времени (см. jobs/events.py)
+EVENTS_BROKER_URL = os.environ.get('EVENTS_BROKER_URL')  # redis://... для обмена между процессами
+EVENTS_QUEUE_SIZE = 100  # событий в очереди одного клиента
+EVENTS_HEARTBEAT = 15  # секунд между служебными сообщениями
+EVENTS_STREAM_TIMEOUT = 300  # секунд до переподключения клиента
+EVENTS_RETRY_MS = 5000
+
+# Жизненный цикл вакансий (см. jobs/lifecycle.py)
+VACANCY_LIFETIME_DAYS = 60  # срок публикации новой вакансии
+VACANCY_ARCHIVE_AFTER_DAYS = 90  # через сколько дней закрытая вакансия уходит в архив
+VACANCY_ARCHIVE_BATCH_SIZE = 500  # вакансий в одной транзакции переноса
+# Импорт в админке идёт в запросе воркера; файлы больше импортируются командой import_vacancies
+VACANCY_IMPORT_MAX_UPLOAD_SIZE = 5 * 1024 * 1024  # байт
+
+# Минификация HTML и сжатие ответов (см. core/compression.py)
+HTML_MINIFY = True
+COMPRESSION_ENABLED = os.environ.get('COMPRESSION', 'on') != 'off'  # off, если все ответы сжимает прокси
+COMPRESSION_UPSTREAM_HEADER = os.environ.get('COMPRESSION_UPSTREAM_HEADER')  # ключ request.META, например HTTP_X_COMPRESSED_BY_PROXY
+COMPRESSION_MIN_LENGTH = 500  # байт; короткие ответы не сжимаются
+COMPRESSION_BROTLI_QUALITY = 5  # 0-11; выше 6 сжатие на лету заметно дороже по CPU
+
+# Асинхронные представления (см. core/aio.py): независимые запросы страницы выполняются
+# одновременно, каждый со своим соединением с базой
+ASYNC_CONCURRENT_QUERIES = True
+# Сколько таких запросов и источников поиска (core/search.py) выполняется одновременно во всём процессе
+DB_CONCURRENT_QUERIES = 4
+
+# Кеш (см. core/caching.py). В продакшене нужен общий для всех воркеров кеш
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Сессии и сообщения (см. core/sessions.py)
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cached_db')  # db, cached_db или signed_cookies
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_BACKEND}'
+SESSION_PURGE_BATCH_SIZE = 1000  # сессий в одном DELETE команды purge_sessions
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Ленты RSS/Atom/JSON (см. core/feeds.py)
+FEED_ITEMS = 50  # записей в ленте
+FEED_CACHE_TIMEOUT = 24 * 60 * 60  # секунд хранения отрисованной ленты; изменения данных сбрасывают её сразу
+FEED_MAX_AGE = 5 * 60  # Cache-Control: max-age для агрегаторов
+
+# Поиск по сайту (см. core/search.py)
+SEARCH_PARALLEL = True  # источники ищутся в отдельных потоках
+SEARCH_WORKERS = 6  # потоков поиска на процесс; каждый держит своё соединение с базой на время запроса
+SEARCH_TIMEOUT = 2.0  # секунд на один источник, после чего его запрос прерывается
+SEARCH_FUZZY_THRESHOLD = 0.45  # минимальная доля общих триграмм для слова с опечаткой
+SEARCH_FUZZY_CANDIDATES = 3  # сколько похожих слов из словаря подставлять вместо ненайденного
+SEARCH_CACHE_TIMEOUT = 60 * 60  # секунд хранения результатов поиска и числа вакансий по фильтрам
+
+# Журнал поисковых запросов (см. core/search_log.py)
+SEARCH_LOG_ENABLED = True
+SEARCH_LOG_BATCH_SIZE = 100  # записей в одной вставке
+SEARCH_LOG_FLUSH_INTERVAL = 10  # секунд, не дольше которых записи ждут сохранения
+SEARCH_LOG_RETENTION_DAYS = 30  # сколько дней хранить журнал
+SEARCH_LOG_SLOW_MS = 500  # порог медленного запроса для отчёта search_report
+SEARCH_POPULAR_DAYS = 7  # за сколько дней считаются популярные запросы
+SEARCH_POPULAR_LIMIT = 100  # сколько популярных запросов сохранять
+SEARCH_POPULAR_WARM = 30  # для скольких из них заранее заполнять кеш результатов
+
+# JSON API (см. core/api.py, jobs/api.py)
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+API_CACHE_TIMEOUT = 60 * 60  # секунд хранения ответа; изменения данных сбрасывают его сразу
+API_MAX_AGE = 60  # Cache-Control: max-age
+
+# Личный кабинет (см. users/dashboard.py)
+DASHBOARD_CACHE_TIMEOUT = 24 * 60 * 60  # секунд хранения счётчиков заявок; изменения заявок сбрасывают их сразу
+
 # Настройки аутентификации
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'home'
@@ -45,11 +45,67 @@ if os.environ.get('DATABASE_URL'):
         'default': dj_database_url.parse(os.environ.get('DATABASE_URL'))
     }
 else:
-    # Fallback на SQLite для Render
+    # Fallback на SQLite для Render: WAL позволяет читать параллельно с записью,
+    # BEGIN IMMEDIATE и busy_timeout убирают «database is locked» между воркерами
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'ENGINE': 'employment_project.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': SQLITE_PRODUCTION_PRAGMAS,
+            },
+        }
+    }
+    # Запросы в отдельных потоках открывали бы по новому соединению с настройкой PRAGMA
+    # на каждый запрос; с одним файлом базы выигрыша от них нет (см. core/aio.py)
+    ASYNC_CONCURRENT_QUERIES = False
+    SEARCH_PARALLEL = False
+
+# Реплики добавляются к переопределённому DATABASES заново
+if DATABASE_REPLICA_URLS:
+    import dj_database_url
+    for alias, url in zip(DATABASE_REPLICAS, DATABASE_REPLICA_URLS):
+        DATABASES[alias] = {**dj_database_url.parse(url), 'TEST': {'MIRROR': 'default'}}
+
+# Пул соединений PostgreSQL в каждом воркере (см. employment_project/backends/postgresql).
+# Всего соединений к серверу: WEB_CONCURRENCY * DB_POOL_MAX_SIZE (на каждую базу) не больше лимита тарифа, см. DEPLOY.md
+DATABASE_POOL = {
+    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 4)),
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),  # секунд ожидания свободного соединения
+    'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+    'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 3600)),
+    'check_interval': float(os.environ.get('DB_POOL_CHECK_INTERVAL', 30)),
+}
+# Одновременные запросы страниц и поиска (core/aio.py) занимают не весь пул:
+# одно соединение остаётся для основного потока запросов
+DB_CONCURRENT_QUERIES = int(os.environ.get('DB_CONCURRENT_QUERIES', max(1, DATABASE_POOL['max_size'] - 1)))
+if os.environ.get('DB_POOL', 'on') != 'off':
+    for database in DATABASES.values():
+        if database['ENGINE'] == 'django.db.backends.postgresql':
+            database['ENGINE'] = 'employment_project.backends.postgresql'
+            # Соединение возвращается в пул в конце каждого запроса
+            database['CONN_MAX_AGE'] = 0
+            database.setdefault('OPTIONS', {})['pool'] = DATABASE_POOL
+
+# Общий кеш для всех воркеров: Redis, если задан CACHE_URL, иначе файлы на диске
+if os.environ.get('CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, '.cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
         }
     }
 
@@ -57,16 +113,19 @@ else:
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-# Настройки для Render
-if os.environ.get('RENDER'):
-    # Используем whitenoise для статических файлов на Render
-    MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
-
 # Медиа файлы
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Электронная почта
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '').lower() in ('1', 'true', 'yes')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', DEFAULT_FROM_EMAIL)
+
 # Безопасность
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -84,4 +143,10 @@ LOGGING = {
     'root': {
         'handlers': ['console'],
     },
+    'loggers': {
+        # Периодическая статистика пула соединений и долгие ожидания соединения
+        'employment_project.db_pool': {
+            'level': 'INFO',
+        },
+    },
 }
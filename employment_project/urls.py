@@ -14,24 +14,23 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.urls import path, include
+from django.contrib import admin
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
-from core.admin import admin_site
-
-# Настройка админ-панели
-admin_site.site_header = settings.ADMIN_SITE_HEADER
-admin_site.site_title = settings.ADMIN_SITE_TITLE
-admin_site.index_title = settings.ADMIN_INDEX_TITLE
+from core.views import SitemapFileView
 
 urlpatterns = [
-    path('admin/', admin_site.urls),
+    # Сайт админки - core.sites.CustomAdminSite, модели регистрируются при построении его URL
+    path('admin/', admin.site.urls),
     path('', include('core.urls')),
     path('jobs/', include('jobs.urls')),
     path('users/', include('users.urls')),
+    path('api/v1/', include('jobs.api_urls')),
     path('accounts/', include('django.contrib.auth.urls')),
-    path('sitemap.xml', TemplateView.as_view(template_name='sitemap.xml', content_type='application/xml'), name='sitemap'),
+    path('sitemap.xml', SitemapFileView.as_view(), name='sitemap'),
+    re_path(r'^sitemaps/(?P<path>[\w.-]*)$', SitemapFileView.as_view(), name='sitemap_file'),
     path('404/', TemplateView.as_view(template_name='404.html'), name='404'),
 ]
 
@@ -0,0 +1,68 @@
+"""
+Настройки gunicorn: ``gunicorn --config gunicorn.conf.py``.
+
+SERVER_PROFILE выбирает, как обслуживаются запросы:
+- ``asgi`` (по умолчанию): воркеры uvicorn и employment_project.asgi.
+  Асинхронные представления не занимают воркер, пока ждут базу, и работает
+  поток событий /jobs/events/;
+- ``wsgi``: прежние синхронные воркеры и employment_project.wsgi.
+
+С ``preload_app`` (PRELOAD_APP, по умолчанию включено) приложение загружается и
+подготавливается (core/warmup.py) один раз в главном процессе, воркеры
+получают его готовым при fork и сразу принимают запросы. Без preload_app
+каждый воркер загружает и подготавливает приложение сам до приёма запросов.
+"""
+import gc
+import os
+
+profile = os.environ.get('SERVER_PROFILE', 'asgi')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 20
+keepalive = 5
+accesslog = '-'
+preload_app = os.environ.get('PRELOAD_APP', 'on') != 'off'
+
+if profile == 'wsgi':
+    wsgi_app = 'employment_project.wsgi:application'
+    worker_class = 'sync'
+else:
+    wsgi_app = 'employment_project.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+
+
+def _warm_up(log):
+    from core.warmup import warm_up
+
+    try:
+        steps = warm_up()
+    except Exception:
+        # Неподготовленный воркер всё равно обслуживает запросы, только первые медленнее
+        log.exception('Подготовка приложения не удалась')
+        return
+    log.info('Приложение подготовлено: %s', ', '.join(f"{step.name} {step.seconds * 1000:.0f} мс" for step in steps))
+
+
+def when_ready(server):
+    if preload_app:
+        _warm_up(server.log)
+        # Объекты, созданные до fork, сборщик мусора больше не обходит,
+        # и страницы памяти главного процесса остаются общими с воркерами
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        _warm_up(worker.log)
+
+
+def worker_exit(server, worker):
+    try:
+        from employment_project.backends.postgresql.pool import pool_stats
+    except ImportError:
+        # Без psycopg2 пула нет
+        return
+    for stats in pool_stats():
+        worker.log.info('Пул соединений воркера при остановке: %s', stats)
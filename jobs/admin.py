@@ -1,6 +1,20 @@
-from django.contrib import admin
-from .models import Category, Skill, JobLocation, JobVacancy, JobApplication
-from core.admin import admin_site
+import io
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .models import ArchivedJobApplication, ArchivedJobVacancy, Category, Skill, JobLocation, JobVacancy, JobApplication
+from core import caching
+from users.dashboard import applications_changed
+from . import funnel
+from .events import publish_bulk_status_change
+from .forms import VacancyImportForm
+from .exports import export_applications, export_vacancies
+from .importers import VacancyImporter, detect_format
+from .notifications import notify_bulk_status_change
 
 # Класс администратора для категорий
 class CategoryAdmin(admin.ModelAdmin):
@@ -26,7 +40,7 @@ class JobLocationAdmin(admin.ModelAdmin):
 # Класс администратора для вакансий
 class JobVacancyAdmin(admin.ModelAdmin):
     list_display = ('title', 'employer', 'category', 'salary_min', 'salary_max', 'status', 'created_at')
-    list_filter = ('status', 'category', 'employment_type', 'experience_required', 'is_remote', 'created_at')
+    list_filter = ('status', 'category', 'employment_type', 'experience_required', 'is_remote', 'created_at', 'expires_at')
     search_fields = ('title', 'description', 'requirements', 'employer__company_name')
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'created_at'
@@ -46,23 +60,65 @@ class JobVacancyAdmin(admin.ModelAdmin):
             'fields': ('salary_min', 'salary_max', 'employment_type', 'experience_required', 'is_remote', 'location')
         }),
         ('Публикация', {
-            'fields': ('status', 'created_at', 'updated_at')
+            'fields': ('status', 'expires_at', 'created_at', 'updated_at')
         }),
     )
     
-    actions = ['make_active', 'make_closed', 'make_draft']
+    actions = ['make_active', 'make_closed', 'make_draft', 'export_csv']
     
     def make_active(self, request, queryset):
         queryset.update(status='open')
+        caching.bump(caching.VACANCIES)
     make_active.short_description = "Опубликовать выбранные вакансии"
     
     def make_closed(self, request, queryset):
         queryset.update(status='closed')
+        caching.bump(caching.VACANCIES)
     make_closed.short_description = "Закрыть выбранные вакансии"
     
     def make_draft(self, request, queryset):
         queryset.update(status='archived')
+        caching.bump(caching.VACANCIES)
     make_draft.short_description = "Перевести выбранные вакансии в архив"
+    
+    def export_csv(self, request, queryset):
+        return export_vacancies(queryset, excel=True)
+    export_csv.short_description = "Выгрузить выбранные вакансии в CSV"
+    
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='jobs_jobvacancy_import'),
+        ]
+        return urls + super().get_urls()
+    
+    def import_view(self, request):
+        """Загрузка вакансий из CSV/JSONL файла"""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        
+        form = VacancyImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            importer = VacancyImporter(employer=form.cleaned_data['employer'])
+            result = importer.run(stream, detect_format(upload.name))
+            
+            messages.success(request, (
+                f"Импортировано вакансий: {result.created}, пропущено строк: {result.skipped} "
+                f"({result.rows_per_second:.0f} строк/с)"
+            ))
+            for row_number, error in result.errors[:20]:
+                messages.warning(request, f"Строка {row_number}: {error}")
+            return redirect('admin:jobs_jobvacancy_changelist')
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Импорт вакансий',
+            'opts': self.model._meta,
+            'form': form,
+            'max_upload_mb': settings.VACANCY_IMPORT_MAX_UPLOAD_SIZE // (1024 * 1024),
+        }
+        return TemplateResponse(request, 'admin/jobs/jobvacancy/import_form.html', context)
 
 # Класс администратора для заявок на вакансии
 class JobApplicationAdmin(admin.ModelAdmin):
@@ -90,23 +146,69 @@ class JobApplicationAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['accept_applications', 'reject_applications', 'mark_as_reviewing']
+    actions = ['accept_applications', 'reject_applications', 'mark_as_reviewing', 'export_csv']
+    
+    def _set_status(self, queryset, status):
+        # Массовое обновление не вызывает сигналы, поэтому уведомляем явно. Заявки для уведомлений
+        # выбираются до update(), а события уходят клиентам через on_commit - после фиксации update()
+        with transaction.atomic():
+            notify_bulk_status_change(queryset, status)
+            publish_bulk_status_change(queryset, status)
+            changed = list(queryset.exclude(status=status).values_list(
+                'pk', 'vacancy_id', 'vacancy__employer_id', 'job_seeker_id', 'status',
+            ))
+            queryset.update(status=status)
+            funnel.record_bulk_status_change(
+                [(pk, vacancy_id, employer_id, previous) for pk, vacancy_id, employer_id, _, previous in changed], status,
+            )
+            applications_changed([row[2] for row in changed], [row[3] for row in changed])
     
     def accept_applications(self, request, queryset):
-        queryset.update(status='accepted')
+        self._set_status(queryset, 'accepted')
     accept_applications.short_description = "Принять выбранные заявки"
     
     def reject_applications(self, request, queryset):
-        queryset.update(status='rejected')
+        self._set_status(queryset, 'rejected')
     reject_applications.short_description = "Отклонить выбранные заявки"
     
     def mark_as_reviewing(self, request, queryset):
-        queryset.update(status='reviewing')
-    mark_as_reviewing.short_description = "Отметить выбранные заявки как 'На рассмотрении'"
+        self._set_status(queryset, 'reviewed')
+    mark_as_reviewing.short_description = "Отметить выбранные заявки как рассмотренные"
+    
+    def export_csv(self, request, queryset):
+        return export_applications(queryset, excel=True)
+    export_csv.short_description = "Выгрузить выбранные заявки в CSV"
+
+# Архив доступен только для просмотра: записи в него переносит команда vacancy_lifecycle
+class ArchiveAdminMixin:
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedJobVacancyAdmin(ArchiveAdminMixin, admin.ModelAdmin):
+    list_display = ('title', 'employer', 'category', 'status', 'created_at', 'archived_at')
+    list_filter = ('status', 'category', 'archived_at')
+    search_fields = ('title', 'slug', 'employer__company_name')
+    date_hierarchy = 'archived_at'
+    list_per_page = 20
+
+
+class ArchivedJobApplicationAdmin(ArchiveAdminMixin, admin.ModelAdmin):
+    list_display = ('job_seeker', 'vacancy', 'status', 'created_at', 'archived_at')
+    list_filter = ('status', 'archived_at')
+    search_fields = ('job_seeker__user__username', 'vacancy__title')
+    date_hierarchy = 'archived_at'
+    list_select_related = ('job_seeker__user', 'vacancy')
+    list_per_page = 20
 
-# Регистрация моделей в admin_site
-admin_site.register(Category, CategoryAdmin)
-admin_site.register(Skill, SkillAdmin)
-admin_site.register(JobLocation, JobLocationAdmin)
-admin_site.register(JobVacancy, JobVacancyAdmin)
-admin_site.register(JobApplication, JobApplicationAdmin)
+# Регистрация моделей в админке
+admin.site.register(Category, CategoryAdmin)
+admin.site.register(Skill, SkillAdmin)
+admin.site.register(JobLocation, JobLocationAdmin)
+admin.site.register(JobVacancy, JobVacancyAdmin)
+admin.site.register(JobApplication, JobApplicationAdmin)
+admin.site.register(ArchivedJobVacancy, ArchivedJobVacancyAdmin)
+admin.site.register(ArchivedJobApplication, ArchivedJobApplicationAdmin)
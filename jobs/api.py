@@ -0,0 +1,161 @@
+"""
+JSON API вакансий (``/api/v1/``).
+
+* ``fields=title,salary_min,...`` ограничивает набор полей; в SQL попадают
+  только нужные столбцы и соединения.
+* Список вакансий листается курсором ``cursor`` по (created_at, id), поэтому
+  дальние страницы не медленнее первой.
+"""
+from django.db.models import Count, Q
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+
+from core import caching
+from core.api import ApiError, ApiView, decode_cursor, encode_cursor, parse_fields, parse_limit
+from .models import ArchivedJobVacancy, Category, JobVacancy, Skill
+
+# Поле ответа -> выражение для .values()
+VACANCY_FIELDS = {
+    'slug': 'slug',
+    'title': 'title',
+    'employer': 'employer__company_name',
+    'employer_slug': 'employer__slug',
+    'category': 'category__slug',
+    'category_name': 'category__name',
+    'description': 'description',
+    'requirements': 'requirements',
+    'responsibilities': 'responsibilities',
+    'benefits': 'benefits',
+    'salary_min': 'salary_min',
+    'salary_max': 'salary_max',
+    'city': 'location__city',
+    'region': 'location__region',
+    'is_remote': 'is_remote',
+    'status': 'status',
+    'employment_type': 'employment_type',
+    'experience_required': 'experience_required',
+    'expires_at': 'expires_at',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+# Поля, которые считаются отдельно от .values()
+EXTRA_VACANCY_FIELDS = ('url', 'skills')
+AVAILABLE_VACANCY_FIELDS = (*VACANCY_FIELDS, *EXTRA_VACANCY_FIELDS)
+
+DEFAULT_LIST_FIELDS = (
+    'slug', 'url', 'title', 'employer', 'category', 'salary_min', 'salary_max',
+    'city', 'is_remote', 'employment_type', 'created_at',
+)
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def vacancy_rows(queryset, fields):
+    """Пары (строка .values(), элемент ответа); ``queryset`` уже отфильтрован и упорядочен"""
+    lookups = ['pk', 'created_at', 'slug'] + [VACANCY_FIELDS[name] for name in fields if name in VACANCY_FIELDS]
+    rows = list(queryset.values(*dict.fromkeys(lookups)))
+
+    skills = {}
+    if 'skills' in fields and rows:
+        # Навыки всех вакансий страницы одним запросом к промежуточной таблице
+        field = queryset.model._meta.get_field('skills')
+        owner = f"{field.m2m_field_name()}_id"
+        for vacancy_id, slug in field.remote_field.through.objects.filter(
+            **{f"{owner}__in": [row['pk'] for row in rows]}
+        ).values_list(owner, 'skill__slug'):
+            skills.setdefault(vacancy_id, []).append(slug)
+
+    url_template = reverse('jobs:vacancy_detail', kwargs={'slug': 'slug-placeholder'})
+    results = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            if name == 'url':
+                item[name] = url_template.replace('slug-placeholder', row['slug'])
+            elif name == 'skills':
+                item[name] = sorted(skills.get(row['pk'], []))
+            else:
+                item[name] = row[VACANCY_FIELDS[name]]
+        results.append((row, item))
+    return results
+
+
+class VacancyListView(ApiView):
+    """Открытые вакансии, новые первыми"""
+    cache_namespaces = (caching.VACANCIES,)
+
+    def get_queryset(self):
+        queryset = JobVacancy.objects.filter(status='open')
+        params = self.request.GET
+        if params.get('category'):
+            queryset = queryset.filter(category__slug=params['category'])
+        if params.get('employer'):
+            queryset = queryset.filter(employer__slug=params['employer'])
+        if params.get('employment_type'):
+            if params['employment_type'] not in dict(JobVacancy.EMPLOYMENT_TYPE_CHOICES):
+                raise ApiError('Неизвестный тип занятости')
+            queryset = queryset.filter(employment_type=params['employment_type'])
+        if params.get('experience'):
+            if params['experience'] not in dict(JobVacancy.EXPERIENCE_CHOICES):
+                raise ApiError('Неизвестный требуемый опыт')
+            queryset = queryset.filter(experience_required=params['experience'])
+        if params.get('remote', '').lower() in TRUE_VALUES:
+            queryset = queryset.filter(is_remote=True)
+        return queryset
+
+    def get_data(self, request):
+        fields = parse_fields(request, AVAILABLE_VACANCY_FIELDS, DEFAULT_LIST_FIELDS)
+        limit = parse_limit(request)
+        queryset = self.get_queryset()
+
+        if request.GET.get('cursor'):
+            try:
+                created_at, pk = decode_cursor(request.GET['cursor'])
+                created_at = parse_datetime(created_at)
+                pk = int(pk)
+            except (TypeError, ValueError):
+                created_at = None
+            if created_at is None:
+                raise ApiError('Некорректный параметр cursor')
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+        # Одна лишняя строка показывает, есть ли следующая страница
+        rows = vacancy_rows(queryset.order_by('-created_at', '-pk')[:limit + 1], fields)
+        next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1][0]
+            params = request.GET.copy()
+            # Дата с микросекундами: иначе строки с одинаковым началом времени будут пропущены
+            params['cursor'] = encode_cursor([last['created_at'].isoformat(), last['pk']])
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+        return {'results': [item for _, item in rows], 'next': next_url}
+
+
+class VacancyDetailView(ApiView):
+    """Одна вакансия, в том числе закрытая или перенесённая в архив"""
+    cache_namespaces = (caching.VACANCIES,)
+
+    def get_data(self, request, slug):
+        fields = parse_fields(request, AVAILABLE_VACANCY_FIELDS, AVAILABLE_VACANCY_FIELDS)
+        for model in (JobVacancy, ArchivedJobVacancy):
+            rows = vacancy_rows(model.objects.filter(slug=slug), fields)
+            if rows:
+                return rows[0][1]
+        raise ApiError('Вакансия не найдена', status=404)
+
+
+class CategoryListView(ApiView):
+    """Категории с количеством открытых вакансий"""
+    cache_namespaces = (caching.VACANCIES,)
+    queryset = Category.objects.annotate(
+        open_vacancies=Count('vacancies', filter=Q(vacancies__status='open')),
+    )
+    fields = ('slug', 'name', 'description', 'open_vacancies')
+
+
+class SkillListView(ApiView):
+    """Справочник навыков"""
+    cache_namespaces = (caching.VACANCIES,)
+    queryset = Skill.objects.all()
+    fields = ('slug', 'name')
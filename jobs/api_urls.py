@@ -0,0 +1,11 @@
+from django.urls import path
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('vacancies/', api.VacancyListView.as_view(), name='vacancy_list'),
+    path('vacancies/<slug:slug>/', api.VacancyDetailView.as_view(), name='vacancy_detail'),
+    path('categories/', api.CategoryListView.as_view(), name='category_list'),
+    path('skills/', api.SkillListView.as_view(), name='skill_list'),
+]
@@ -0,0 +1,218 @@
+"""
+Публикация событий о заявках подключённым пользователям (Server-Sent Events).
+
+События рассылаются через брокер публикаций/подписок. По умолчанию он работает
+внутри процесса: подписчики - это потоки событий, открытые в том же ASGI
+процессе. Если задан ``EVENTS_BROKER_URL`` (redis://...), события передаются
+через Redis, и их получают подписчики во всех процессах.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger('jobs.events')
+
+
+class Subscription:
+    """Подписка одного клиента на канал событий"""
+
+    def __init__(self, channel, loop, maxsize):
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, message):
+        # Медленный клиент не должен задерживать остальных - лишние события отбрасываем
+        if not self.queue.full():
+            self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """Брокер событий внутри одного процесса"""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Создаёт подписку; вызывается из работающего event loop"""
+        subscription = Subscription(channel, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscriptions.values())
+
+    def publish(self, channel, event, data):
+        """Публикует событие; безопасно вызывать из любого потока"""
+        self._deliver(channel, event, data)
+
+    def _deliver(self, channel, event, data):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        if not subscribers:
+            return
+        message = format_event(event, data)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # Event loop подписчика уже закрыт
+                self.unsubscribe(subscription)
+
+
+class RedisBroker(LocalBroker):
+    """Брокер, пересылающий события между процессами через Redis
+
+    Слушающий поток переподключается при обрыве соединения с паузой от
+    ``retry_delay`` до ``max_retry_delay`` секунд и пропускает сообщения,
+    которые не удалось разобрать.
+    """
+
+    prefix = 'sluzba:events:'
+    retry_delay = 1
+    max_retry_delay = 30
+
+    def __init__(self, url, queue_size=100):
+        super().__init__(queue_size)
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._listener = None
+
+    def subscribe(self, channel):
+        self._ensure_listener()
+        return super().subscribe(channel)
+
+    def publish(self, channel, event, data):
+        self._redis.publish(self.prefix + channel, json.dumps({'event': event, 'data': data}))
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='events-redis', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        delay = self.retry_delay
+        try:
+            while True:
+                try:
+                    pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                    try:
+                        pubsub.psubscribe(self.prefix + '*')
+                        delay = self.retry_delay
+                        for message in pubsub.listen():
+                            self._handle(message)
+                    finally:
+                        pubsub.close()
+                    logger.warning('Подписка на события Redis завершилась, повтор через %s с', delay)
+                except Exception as error:
+                    logger.warning('Ошибка подписки на события Redis: %s, повтор через %s с', error, delay)
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+        finally:
+            # Следующая подписка запустит поток заново
+            with self._lock:
+                self._listener = None
+
+    def _handle(self, message):
+        try:
+            channel = message['channel'].decode()[len(self.prefix):]
+            payload = json.loads(message['data'])
+            event, data = payload['event'], payload['data']
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            logger.warning('Пропущено некорректное событие из Redis: %r (%s)', message, error)
+            return
+        self._deliver(channel, event, data)
+
+
+def format_event(event, data):
+    """Форматирует событие по протоколу Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Возвращает брокер событий процесса, создавая его при первом обращении"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if settings.EVENTS_BROKER_URL:
+                    _broker = RedisBroker(settings.EVENTS_BROKER_URL, settings.EVENTS_QUEUE_SIZE)
+                else:
+                    _broker = LocalBroker(settings.EVENTS_QUEUE_SIZE)
+    return _broker
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def publish_to_user(user_id, event, data):
+    """Публикует событие пользователю после фиксации текущей транзакции"""
+    transaction.on_commit(lambda: get_broker().publish(user_channel(user_id), event, data))
+
+
+def publish_new_application(application):
+    """Сообщает работодателю о новой заявке"""
+    vacancy = application.vacancy
+    publish_to_user(vacancy.employer.user_id, 'new_application', {
+        'application': application.pk,
+        'vacancy': vacancy.slug,
+        'title': vacancy.title,
+    })
+
+
+def publish_status_change(application):
+    """Сообщает соискателю об изменении статуса заявки"""
+    publish_to_user(application.job_seeker.user_id, 'status_changed', {
+        'application': application.pk,
+        'vacancy': application.vacancy.slug,
+        'title': application.vacancy.title,
+        'status': application.status,
+        'status_display': application.get_status_display(),
+    })
+
+
+def publish_bulk_status_change(queryset, status):
+    """Публикует события для массового изменения статуса заявок
+
+    Вызывается до ``queryset.update()`` внутри той же транзакции: заявки выбираются
+    по прежнему статусу, а события отправляются после фиксации.
+    """
+    status_display = dict(queryset.model.STATUS_CHOICES).get(status, status)
+    rows = queryset.exclude(status=status).values_list(
+        'pk', 'job_seeker__user_id', 'vacancy__slug', 'vacancy__title'
+    )
+    for pk, user_id, slug, title in rows.iterator():
+        publish_to_user(user_id, 'status_changed', {
+            'application': pk,
+            'vacancy': slug,
+            'title': title,
+            'status': status,
+            'status_display': status_display,
+        })
@@ -0,0 +1,89 @@
+"""Ленты открытых вакансий: все, по категории и по работодателю"""
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.text import Truncator
+
+from core import caching
+from core.feeds import CachedFeed
+from users.models import EmployerProfile
+from .models import Category, JobVacancy
+
+
+class VacancyFeed(CachedFeed):
+    """Последние открытые вакансии"""
+    title = 'Вакансии службы занятости'
+    description = 'Новые открытые вакансии'
+    cache_namespaces = (caching.VACANCIES,)
+
+    def link(self):
+        return reverse('jobs:vacancy_list')
+
+    def vacancies(self, obj):
+        return JobVacancy.objects.filter(status='open')
+
+    def items(self, obj):
+        return (
+            self.vacancies(obj)
+            .select_related('employer', 'category', 'location')
+            .order_by('-created_at')[:settings.FEED_ITEMS]
+        )
+
+    def item_description(self, item):
+        parts = [item.employer.company_name]
+        if item.salary_min and item.salary_max:
+            parts.append(f"{item.salary_min:.0f} - {item.salary_max:.0f} руб.")
+        elif item.salary_min:
+            parts.append(f"от {item.salary_min:.0f} руб.")
+        elif item.salary_max:
+            parts.append(f"до {item.salary_max:.0f} руб.")
+        if item.location:
+            parts.append(str(item.location))
+        if item.is_remote:
+            parts.append('удалённая работа')
+        parts.append(Truncator(item.description).words(60))
+        return '. '.join(parts)
+
+    def item_author_name(self, item):
+        return item.employer.company_name
+
+    def item_categories(self, item):
+        return [item.category.name, item.get_employment_type_display()]
+
+
+class CategoryVacancyFeed(VacancyFeed):
+    """Открытые вакансии категории"""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Category, slug=slug)
+
+    def title(self, obj):
+        return f"Вакансии: {obj.name}"
+
+    def description(self, obj):
+        return f"Новые открытые вакансии в категории «{obj.name}»"
+
+    def link(self, obj):
+        return obj.get_absolute_url()
+
+    def vacancies(self, obj):
+        return JobVacancy.objects.filter(status='open', category=obj)
+
+
+class EmployerVacancyFeed(VacancyFeed):
+    """Открытые вакансии работодателя"""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(EmployerProfile, slug=slug)
+
+    def title(self, obj):
+        return f"Вакансии: {obj.company_name}"
+
+    def description(self, obj):
+        return f"Новые открытые вакансии компании «{obj.company_name}»"
+
+    def link(self, obj):
+        return reverse('users:employer_profile', kwargs={'slug': obj.slug})
+
+    def vacancies(self, obj):
+        return JobVacancy.objects.filter(status='open', employer=obj)
@@ -1,5 +1,13 @@
+from urllib.parse import urlencode
+
 from django import forms
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from core import search_index
+from core.analysis import normalize_query
 from .models import JobVacancy, JobApplication, Category, Skill, JobLocation
+from users.models import EmployerProfile
 
 class JobVacancyForm(forms.ModelForm):
     """Форма создания/редактирования вакансии"""
@@ -51,13 +59,14 @@ class JobVacancyForm(forms.ModelForm):
         fields = [
             'title', 'category', 'description', 'requirements', 'responsibilities', 
             'benefits', 'salary_min', 'salary_max', 'location', 'is_remote', 
-            'employment_type', 'experience_required', 'skills'
+            'employment_type', 'experience_required', 'skills', 'expires_at'
         ]
         widgets = {
             'category': forms.Select(attrs={'class': 'form-control'}),
             'location': forms.Select(attrs={'class': 'form-control'}),
             'employment_type': forms.Select(attrs={'class': 'form-control'}),
             'experience_required': forms.Select(attrs={'class': 'form-control'}),
+            'expires_at': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}, format='%Y-%m-%d'),
         }
     
     def __init__(self, *args, **kwargs):
@@ -76,6 +85,7 @@ class JobVacancyForm(forms.ModelForm):
             
         # Устанавливаем help_text для поля location
         self.fields['location'].help_text = 'Выберите местоположение или отметьте "Удаленная работа"'
+        self.fields['expires_at'].help_text = 'После этой даты вакансия будет закрыта автоматически'
         
     def clean(self):
         cleaned_data = super().clean()
@@ -91,6 +101,11 @@ class JobVacancyForm(forms.ModelForm):
         location = cleaned_data.get('location')
         if not is_remote and not location:
             self.add_error('location', 'Укажите местоположение или отметьте "Удаленная работа"')
+        
+        # Срок публикации не может быть в прошлом
+        expires_at = cleaned_data.get('expires_at')
+        if expires_at and expires_at <= timezone.now() and 'expires_at' in self.changed_data:
+            self.add_error('expires_at', 'Дата окончания публикации должна быть в будущем')
             
         return cleaned_data
 
@@ -146,4 +161,84 @@ class JobSearchForm(forms.Form):
         label='Удаленная работа',
         required=False,
         widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
-    ) 
\ No newline at end of file
+    )
+
+    def search_params(self):
+        """Ключевые слова и остальные фильтры строкой запроса в одном порядке
+
+        Используется для журнала поиска и ключей кеша: одинаковые по смыслу
+        запросы дают одинаковые строки.
+        """
+        data = self.cleaned_data
+        filters = {}
+        if data.get('category'):
+            filters['category'] = data['category'].pk
+        for name in ('location', 'employment_type', 'experience'):
+            value = ' '.join((data.get(name) or '').split())
+            if value:
+                filters[name] = value
+        if data.get('remote'):
+            filters['remote'] = 'on'
+        return normalize_query(data.get('keywords', '')), urlencode(sorted(filters.items()))
+
+    def filter(self, queryset):
+        """Применяет фильтры формы к выборке вакансий; форма должна быть проверена
+
+        Ключевые слова ищутся по поисковому индексу (core/search_index.py) с учётом
+        словоформ и опечаток, найденные вакансии упорядочиваются по релевантности.
+        """
+        data = self.cleaned_data
+        # Тот же вид, что в search_params(): результат соответствует ключу кеша числа вакансий
+        keywords = normalize_query(data.get('keywords', ''))
+        terms = search_index.resolve(keywords) if keywords else []
+        if terms:
+            if not all(term.stems for term in terms):
+                # Слова нет ни в словаре, ни среди похожих - совпадений быть не может
+                return queryset.none()
+            ids, score = search_index.matching(queryset.model, terms)
+            queryset = (
+                queryset.filter(pk__in=ids).annotate(search_score=score)
+                .order_by('-search_score', '-created_at')
+            )
+        elif keywords:
+            # В запросе одни стоп-слова или слова, которых нет в словаре, - ищется подстрока, как раньше
+            queryset = queryset.filter(
+                Q(title__icontains=keywords) |
+                Q(description__icontains=keywords) |
+                Q(requirements__icontains=keywords)
+            )
+        if data.get('category'):
+            queryset = queryset.filter(category=data['category'])
+        if data.get('location'):
+            queryset = queryset.filter(location__city__icontains=data['location'])
+        if data.get('employment_type'):
+            queryset = queryset.filter(employment_type=data['employment_type'])
+        if data.get('experience'):
+            queryset = queryset.filter(experience_required=data['experience'])
+        if data.get('remote'):
+            queryset = queryset.filter(is_remote=True)
+        return queryset
+
+
+class VacancyImportForm(forms.Form):
+    """Форма загрузки файла для импорта вакансий"""
+    file = forms.FileField(
+        label='Файл',
+        help_text='CSV с заголовком или JSONL (один JSON-объект вакансии в строке)',
+    )
+    employer = forms.ModelChoiceField(
+        label='Работодатель',
+        queryset=EmployerProfile.objects.all(),
+        required=False,
+        help_text='Используется для строк без колонки employer',
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        limit = settings.VACANCY_IMPORT_MAX_UPLOAD_SIZE
+        if upload.size > limit:
+            raise forms.ValidationError(
+                f"Файл больше {limit // (1024 * 1024)} МБ. Такие файлы импортируются командой "
+                f"python manage.py import_vacancies, которая может продолжить импорт после сбоя (--resume)."
+            )
+        return upload
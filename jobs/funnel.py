@@ -0,0 +1,247 @@
+"""
+Воронка заявок для аналитики работодателя.
+
+Каждое изменение статуса заявки записывается в ``ApplicationStatusEvent``:
+создание заявки из обработчика сигнала, массовые действия админки - явно.
+Вместе с событием увеличиваются счётчики ``ApplicationFunnelRollup`` за день
+и за неделю (неделя начинается с понедельника). График работодателя читает
+только эту таблицу: одна выборка по индексу (работодатель, период, дата), без
+подсчёта по ``JobApplication``.
+
+Этапы воронки: заявка получена, рассмотрена, приглашение на собеседование,
+принята, отклонена. Переход обратно в «На рассмотрении» записывается в
+события, но в воронку не попадает. Команда ``rebuild_funnel_rollups`` заново
+строит счётчики по событиям, а с ``--seed`` создаёт события для заявок,
+появившихся до журнала (при установке это делает миграция 0005).
+"""
+import datetime
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+
+from .models import ApplicationFunnelRollup, ApplicationStatusEvent, ArchivedJobVacancy, JobVacancy
+
+STAGES = (
+    ('received', 'Получено'),
+    ('reviewed', 'Рассмотрено'),
+    ('interview', 'Собеседование'),
+    ('accepted', 'Принято'),
+    ('rejected', 'Отклонено'),
+)
+STAGE_FIELDS = [stage for stage, _ in STAGES]
+PERIODS = {'day': 30, 'week': 12}  # сколько последних периодов показывать на графике
+
+
+@dataclass
+class Transition:
+    employer_id: int
+    vacancy_id: int
+    application_id: int
+    previous_status: str
+    status: str
+    created_at: datetime.datetime
+
+
+def stage_of(previous_status, status):
+    """Этап воронки, в который переходит заявка, или None"""
+    if not previous_status:
+        return 'received'
+    if status in STAGE_FIELDS and status != previous_status:
+        return status
+    return None
+
+
+def period_start(period, moment):
+    day = timezone.localdate(moment)
+    if period == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    return day
+
+
+def record(transitions):
+    """Сохраняет события и увеличивает счётчики воронки в одной транзакции"""
+    transitions = list(transitions)
+    if not transitions:
+        return
+    increments = defaultdict(Counter)
+    for transition in transitions:
+        stage = stage_of(transition.previous_status, transition.status)
+        if stage is None:
+            continue
+        for period in PERIODS:
+            key = (transition.employer_id, transition.vacancy_id, period, period_start(period, transition.created_at))
+            increments[key][stage] += 1
+
+    with transaction.atomic():
+        ApplicationStatusEvent.objects.bulk_create([
+            ApplicationStatusEvent(
+                employer_id=transition.employer_id,
+                vacancy_id=transition.vacancy_id,
+                application_id=transition.application_id,
+                previous_status=transition.previous_status or '',
+                status=transition.status,
+                created_at=transition.created_at,
+            )
+            for transition in transitions
+        ])
+        for key, counts in increments.items():
+            _increment(key, counts)
+
+
+def _increment(key, counts):
+    employer_id, vacancy_id, period, start = key
+    rollup = ApplicationFunnelRollup.objects.filter(
+        employer_id=employer_id, vacancy_id=vacancy_id, period=period, period_start=start,
+    )
+    updates = {stage: F(stage) + amount for stage, amount in counts.items()}
+    if rollup.update(**updates):
+        return
+    try:
+        # Точка сохранения: при гонке с другим процессом откатывается только вставка
+        with transaction.atomic():
+            ApplicationFunnelRollup.objects.create(
+                employer_id=employer_id, vacancy_id=vacancy_id, period=period, period_start=start, **counts,
+            )
+    except IntegrityError:
+        rollup.update(**updates)
+
+
+def record_application(application, previous_status=None):
+    """Событие одной заявки: создание (``previous_status`` пуст) или смена статуса"""
+    record([Transition(
+        employer_id=application.vacancy.employer_id,
+        vacancy_id=application.vacancy_id,
+        application_id=application.pk,
+        previous_status=previous_status or '',
+        status=application.status,
+        created_at=timezone.now(),
+    )])
+
+
+def record_bulk_status_change(rows, status):
+    """События массовой смены статуса; ``rows`` - (id заявки, id вакансии, id работодателя, прежний статус)"""
+    now = timezone.now()
+    record(
+        Transition(employer_id, vacancy_id, application_id, previous_status, status, now)
+        for application_id, vacancy_id, employer_id, previous_status in rows
+        if previous_status != status
+    )
+
+
+def rebuild(employer_ids=None):
+    """Пересчитывает счётчики воронки по журналу событий; возвращает число строк"""
+    events = ApplicationStatusEvent.objects.all()
+    rollups = ApplicationFunnelRollup.objects.all()
+    if employer_ids:
+        events = events.filter(employer_id__in=employer_ids)
+        rollups = rollups.filter(employer_id__in=employer_ids)
+
+    stage_counts = {
+        'received': Count('pk', filter=Q(previous_status='')),
+        **{
+            stage: Count('pk', filter=Q(status=stage) & ~Q(previous_status='') & ~Q(previous_status=stage))
+            for stage in STAGE_FIELDS[1:]
+        },
+    }
+    created = 0
+    with transaction.atomic():
+        rollups.delete()
+        for period, trunc in (('day', TruncDate), ('week', TruncWeek)):
+            rows = (
+                events.annotate(start=trunc('created_at'))
+                .values('employer_id', 'vacancy_id', 'start')
+                .annotate(**stage_counts)
+                .order_by()
+            )
+            batch = [
+                ApplicationFunnelRollup(
+                    employer_id=row['employer_id'],
+                    vacancy_id=row['vacancy_id'],
+                    period=period,
+                    # TruncWeek возвращает дату и время начала недели
+                    period_start=row['start'].date() if isinstance(row['start'], datetime.datetime) else row['start'],
+                    **{stage: row[stage] for stage in STAGE_FIELDS},
+                )
+                for row in rows.iterator()
+                if any(row[stage] for stage in STAGE_FIELDS)
+            ]
+            ApplicationFunnelRollup.objects.bulk_create(batch, batch_size=500)
+            created += len(batch)
+    return created
+
+
+def seed_events(applications, batch_size=1000):
+    """Создаёт события для заявок без журнала: получение и текущий статус
+
+    Время смены статуса неизвестно, поэтому берётся дата последнего изменения заявки.
+    """
+    known = ApplicationStatusEvent.objects.values('application_id')
+    # Строки загружаются заранее: вставка событий не должна менять выборку во время чтения
+    rows = list(
+        applications.exclude(pk__in=known)
+        .values_list('pk', 'vacancy_id', 'vacancy__employer_id', 'status', 'created_at', 'updated_at')
+        .order_by('pk')
+    )
+    created = 0
+    batch = []
+    for pk, vacancy_id, employer_id, status, created_at, updated_at in rows:
+        batch.append(ApplicationStatusEvent(
+            employer_id=employer_id, vacancy_id=vacancy_id, application_id=pk, status='pending', created_at=created_at,
+        ))
+        if status != 'pending':
+            batch.append(ApplicationStatusEvent(
+                employer_id=employer_id, vacancy_id=vacancy_id, application_id=pk,
+                previous_status='pending', status=status, created_at=max(updated_at, created_at),
+            ))
+        if len(batch) >= batch_size:
+            ApplicationStatusEvent.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    ApplicationStatusEvent.objects.bulk_create(batch)
+    return created + len(batch)
+
+
+def employer_series(employer, period='week', vacancy_id=None, today=None):
+    """Ряды графика за последние ``PERIODS[period]`` периодов одним запросом к счётчикам"""
+    today = today or timezone.localdate()
+    end = today - datetime.timedelta(days=today.weekday()) if period == 'week' else today
+    step = datetime.timedelta(weeks=1) if period == 'week' else datetime.timedelta(days=1)
+    starts = [end - step * index for index in reversed(range(PERIODS[period]))]
+
+    rollups = ApplicationFunnelRollup.objects.filter(employer=employer, period=period, period_start__gte=starts[0])
+    if vacancy_id:
+        rollups = rollups.filter(vacancy_id=vacancy_id)
+    rows = {
+        row['period_start']: row
+        for row in rollups.values('period_start').annotate(
+            **{stage: Sum(stage) for stage in STAGE_FIELDS}
+        ).order_by()
+    }
+    return [
+        {'start': start, **{stage: rows.get(start, {}).get(stage) or 0 for stage in STAGE_FIELDS}}
+        for start in starts
+    ]
+
+
+def vacancy_totals(employer, period='week', since=None):
+    """Этапы воронки по каждой вакансии с ``since`` вместе с названиями, включая архивные"""
+    rollups = ApplicationFunnelRollup.objects.filter(employer=employer, period=period)
+    if since:
+        rollups = rollups.filter(period_start__gte=since)
+    rows = list(
+        rollups.values('vacancy_id')
+        .annotate(**{stage: Sum(stage) for stage in STAGE_FIELDS})
+        .order_by('-received')
+    )
+    ids = [row['vacancy_id'] for row in rows]
+    titles = dict(JobVacancy.objects.filter(pk__in=ids).values_list('pk', 'title'))
+    missing = [pk for pk in ids if pk not in titles]
+    if missing:
+        titles.update(ArchivedJobVacancy.objects.filter(original_id__in=missing).values_list('original_id', 'title'))
+    for row in rows:
+        row['title'] = titles.get(row['vacancy_id'], f"Вакансия #{row['vacancy_id']}")
+    return rows
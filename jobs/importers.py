@@ -0,0 +1,263 @@
+"""
+Потоковый импорт вакансий из CSV и JSONL.
+
+Файл читается построчно, справочники (категории, навыки, местоположения,
+работодатели) разрешаются по названию через словари в памяти, а вакансии и
+связи с навыками создаются пачками через ``bulk_create``. После каждой
+сохранённой пачки вызывается ``checkpoint`` с номером последней обработанной
+строки, что позволяет продолжить импорт после сбоя.
+"""
+import csv
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from core import caching, search_index
+from users.models import EmployerProfile
+from .models import Category, JobLocation, JobVacancy, Skill
+
+
+class VacancyImportError(Exception):
+    """Ошибка в данных одной строки импорта"""
+
+
+@dataclass
+class ImportResult:
+    """Итоги импорта"""
+    created: int = 0
+    skipped: int = 0
+    last_row: int = 0
+    elapsed: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        return (self.created + self.skipped) / self.elapsed if self.elapsed else 0.0
+
+
+def detect_format(filename):
+    """Определяет формат файла по расширению"""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_rows(stream, fmt):
+    """Построчно читает файл, возвращая пары (номер строки, словарь значений)"""
+    if fmt == 'jsonl':
+        for row_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as exc:
+                yield row_number, exc
+    else:
+        # Нумерация с 2, так как первая строка CSV - заголовок
+        for row_number, row in enumerate(csv.DictReader(stream), start=2):
+            yield row_number, row
+
+
+def _choice_map(choices):
+    """Принимаем как коды вариантов, так и их названия"""
+    mapping = {}
+    for value, label in choices:
+        mapping[value.lower()] = value
+        mapping[label.lower()] = value
+    return mapping
+
+
+class VacancyImporter:
+    """Импорт вакансий пачками"""
+
+    TRUE_VALUES = {'1', 'true', 'yes', 'да', '+'}
+
+    def __init__(self, employer=None, batch_size=500, create_missing=True):
+        self.employer = employer
+        self.batch_size = batch_size
+        self.create_missing = create_missing
+
+        self.categories = {name.lower(): pk for pk, name in Category.objects.values_list('pk', 'name')}
+        self.skills = {name.lower(): pk for pk, name in Skill.objects.values_list('pk', 'name')}
+        self.locations = {
+            (city.lower(), region.lower(), (address or '').lower()): pk
+            for pk, city, region, address in JobLocation.objects.values_list('pk', 'city', 'region', 'address')
+        }
+        self.employers = {}
+        self.statuses = _choice_map(JobVacancy.STATUS_CHOICES)
+        self.employment_types = _choice_map(JobVacancy.EMPLOYMENT_TYPE_CHOICES)
+        self.experiences = _choice_map(JobVacancy.EXPERIENCE_CHOICES)
+
+    def run(self, stream, fmt='csv', start_row=0, checkpoint=None, progress=None):
+        """Импортирует вакансии из потока, пропуская строки до ``start_row`` включительно"""
+        result = ImportResult(last_row=start_row)
+        started = time.monotonic()
+        batch = []
+
+        for row_number, row in read_rows(stream, fmt):
+            if row_number <= start_row:
+                continue
+            try:
+                if isinstance(row, Exception):
+                    raise VacancyImportError(f"Некорректный JSON: {row}")
+                batch.append(self.build(row))
+            except VacancyImportError as exc:
+                result.skipped += 1
+                result.errors.append((row_number, str(exc)))
+            result.last_row = row_number
+
+            if len(batch) >= self.batch_size:
+                result.created += self.flush(batch)
+                batch = []
+                self._report(result, started, checkpoint, progress)
+
+        if batch:
+            result.created += self.flush(batch)
+        self._report(result, started, checkpoint, progress)
+        return result
+
+    def _report(self, result, started, checkpoint, progress):
+        result.elapsed = time.monotonic() - started
+        if checkpoint:
+            checkpoint(result.last_row)
+        if progress:
+            progress(result)
+
+    def flush(self, batch):
+        """Сохраняет пачку вакансий и их навыков в одной транзакции"""
+        vacancies = [vacancy for vacancy, _ in batch]
+        with transaction.atomic():
+            JobVacancy.objects.bulk_create(vacancies)
+            if any(vacancy.pk is None for vacancy in vacancies):
+                # СУБД не вернула первичные ключи - получаем их по уникальным slug
+                pks = dict(JobVacancy.objects.filter(
+                    slug__in=[vacancy.slug for vacancy in vacancies]
+                ).values_list('slug', 'pk'))
+                for vacancy in vacancies:
+                    vacancy.pk = pks[vacancy.slug]
+
+            through = JobVacancy.skills.through
+            through.objects.bulk_create([
+                through(jobvacancy_id=vacancy.pk, skill_id=skill_id)
+                for vacancy, skill_ids in batch
+                for skill_id in skill_ids
+            ])
+            # bulk_create не отправляет post_save, индексируем пачку сами
+            search_index.index_objects(JobVacancy, vacancies)
+            caching.bump(caching.VACANCIES)
+        return len(vacancies)
+
+    def build(self, row):
+        """Создаёт несохранённую вакансию и список id её навыков из строки файла"""
+        if not isinstance(row, dict):
+            raise VacancyImportError('Строка должна содержать объект с полями вакансии')
+        row = {key.strip().lower(): value for key, value in row.items() if key}
+
+        title = self._text(row, 'title', required=True)
+        employer = self._employer(row)
+        vacancy = JobVacancy(
+            title=title,
+            slug=JobVacancy.build_slug(title, employer.company_name),
+            employer=employer,
+            category_id=self._category(row),
+            description=self._text(row, 'description', required=True),
+            requirements=self._text(row, 'requirements', required=True),
+            responsibilities=self._text(row, 'responsibilities', required=True),
+            benefits=self._text(row, 'benefits') or None,
+            salary_min=self._decimal(row, 'salary_min'),
+            salary_max=self._decimal(row, 'salary_max'),
+            location_id=self._location(row),
+            is_remote=str(row.get('is_remote') or '').strip().lower() in self.TRUE_VALUES,
+            status=self._choice(row, 'status', self.statuses, default='open'),
+            employment_type=self._choice(row, 'employment_type', self.employment_types),
+            experience_required=self._choice(row, 'experience_required', self.experiences),
+            expires_at=JobVacancy.default_expires_at(),
+        )
+        if vacancy.salary_min and vacancy.salary_max and vacancy.salary_min > vacancy.salary_max:
+            raise VacancyImportError('Минимальная зарплата больше максимальной')
+        if not vacancy.is_remote and not vacancy.location_id:
+            raise VacancyImportError('Укажите местоположение или удалённую работу')
+        return vacancy, self._skills(row)
+
+    def _text(self, row, name, required=False):
+        value = row.get(name)
+        value = str(value).strip() if value is not None else ''
+        if required and not value:
+            raise VacancyImportError(f"Не заполнено поле {name}")
+        return value
+
+    def _decimal(self, row, name):
+        value = self._text(row, name).replace(' ', '').replace(',', '.')
+        if not value:
+            return None
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            raise VacancyImportError(f"Некорректное число в поле {name}: {value}")
+
+    def _choice(self, row, name, mapping, default=None):
+        value = self._text(row, name).lower()
+        if not value and default:
+            return default
+        try:
+            return mapping[value]
+        except KeyError:
+            raise VacancyImportError(f"Недопустимое значение поля {name}: {value or '(пусто)'}")
+
+    def _employer(self, row):
+        slug = self._text(row, 'employer')
+        if not slug:
+            if self.employer is None:
+                raise VacancyImportError('Не указан работодатель')
+            return self.employer
+        if slug not in self.employers:
+            self.employers[slug] = EmployerProfile.objects.filter(slug=slug).first()
+        if self.employers[slug] is None:
+            raise VacancyImportError(f"Работодатель не найден: {slug}")
+        return self.employers[slug]
+
+    def _category(self, row):
+        name = self._text(row, 'category', required=True)
+        try:
+            return self.categories[name.lower()]
+        except KeyError:
+            raise VacancyImportError(f"Категория не найдена: {name}")
+
+    def _location(self, row):
+        city = self._text(row, 'city')
+        if not city:
+            return None
+        region = self._text(row, 'region') or city
+        address = self._text(row, 'address')
+        key = (city.lower(), region.lower(), address.lower())
+        if key not in self.locations:
+            if not self.create_missing:
+                raise VacancyImportError(f"Местоположение не найдено: {city}, {region}")
+            location, _ = JobLocation.objects.get_or_create(city=city, region=region, address=address or None)
+            self.locations[key] = location.pk
+        return self.locations[key]
+
+    def _skills(self, row):
+        value = row.get('skills') or []
+        if isinstance(value, str):
+            value = value.replace(';', ',').split(',')
+        skill_ids = []
+        for name in (str(name).strip() for name in value):
+            if not name:
+                continue
+            key = name.lower()
+            if key not in self.skills:
+                if not self.create_missing:
+                    raise VacancyImportError(f"Навык не найден: {name}")
+                skill, _ = Skill.objects.get_or_create(
+                    name=name,
+                    defaults={'slug': f"{slugify(name) or 'skill'}-{uuid.uuid4().hex[:6]}"},
+                )
+                self.skills[key] = skill.pk
+            if self.skills[key] not in skill_ids:
+                skill_ids.append(self.skills[key])
+        return skill_ids
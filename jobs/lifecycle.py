@@ -0,0 +1,150 @@
+"""
+Жизненный цикл вакансий.
+
+* открытые вакансии с истёкшим сроком публикации закрываются;
+* вакансии в статусе «В архиве» и давно закрытые вакансии вместе с заявками
+  переносятся пачками в таблицы ``ArchivedJobVacancy`` и ``ArchivedJobApplication``.
+
+В рабочей таблице остаются только актуальные строки, поэтому списки вакансий
+и поиск не просматривают архив. Страница архивной вакансии по-прежнему
+открывается по старому адресу (см. ``JobVacancyDetailView``).
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core import caching
+from users.dashboard import applications_changed
+from .models import ArchivedJobApplication, ArchivedJobVacancy, JobApplication, JobVacancy
+
+# Поля, которые копируются в архив без изменений
+VACANCY_ARCHIVE_FIELDS = (
+    'title', 'slug', 'employer_id', 'category_id', 'description', 'requirements',
+    'responsibilities', 'benefits', 'salary_min', 'salary_max', 'location_id', 'is_remote',
+    'status', 'employment_type', 'experience_required', 'expires_at', 'created_at', 'updated_at',
+)
+APPLICATION_ARCHIVE_FIELDS = (
+    'job_seeker_id', 'cover_letter', 'resume_file', 'status', 'created_at', 'updated_at',
+    'employer_notes',
+)
+
+
+def expired_vacancies(now=None):
+    """Открытые вакансии, срок публикации которых истёк"""
+    now = now or timezone.now()
+    # У вакансий, созданных до появления срока публикации, он отсчитывается от даты создания
+    lifetime = datetime.timedelta(days=settings.VACANCY_LIFETIME_DAYS)
+    return JobVacancy.objects.filter(status='open').filter(
+        Q(expires_at__lte=now) | Q(expires_at__isnull=True, created_at__lte=now - lifetime)
+    )
+
+
+def archive_candidates(now=None):
+    """Вакансии, которые пора перенести в архив"""
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(days=settings.VACANCY_ARCHIVE_AFTER_DAYS)
+    return JobVacancy.objects.filter(
+        Q(status='archived') | Q(status='closed', updated_at__lte=cutoff)
+    )
+
+
+def close_expired(now=None):
+    """Закрывает вакансии с истёкшим сроком публикации, возвращает их количество"""
+    now = now or timezone.now()
+    # update() не обновляет auto_now, а от updated_at отсчитывается перенос в архив
+    closed = expired_vacancies(now).update(status='closed', updated_at=now)
+    if closed:
+        caching.bump(caching.VACANCIES)
+    return closed
+
+
+def archive_batch(pks, now=None):
+    """Переносит вакансии с указанными id и их заявки в архив одной транзакцией
+
+    Возвращает количество перенесённых вакансий и заявок.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Повторно проверяем условие: вакансию могли открыть заново после выборки id
+        vacancies = list(archive_candidates(now).filter(pk__in=pks).values('pk', *VACANCY_ARCHIVE_FIELDS))
+        if not vacancies:
+            return 0, 0
+        pks = [vacancy['pk'] for vacancy in vacancies]
+
+        ArchivedJobVacancy.objects.bulk_create([
+            ArchivedJobVacancy(
+                original_id=vacancy['pk'],
+                archived_at=now,
+                **{name: vacancy[name] for name in VACANCY_ARCHIVE_FIELDS},
+            )
+            for vacancy in vacancies
+        ])
+        archived_ids = dict(
+            ArchivedJobVacancy.objects.filter(original_id__in=pks).values_list('original_id', 'pk')
+        )
+
+        ArchivedSkill = ArchivedJobVacancy.skills.through
+        ArchivedSkill.objects.bulk_create([
+            ArchivedSkill(archivedjobvacancy_id=archived_ids[vacancy_id], skill_id=skill_id)
+            for vacancy_id, skill_id in JobVacancy.skills.through.objects.filter(
+                jobvacancy_id__in=pks
+            ).values_list('jobvacancy_id', 'skill_id')
+        ])
+
+        applications = JobApplication.objects.filter(vacancy_id__in=pks).values(
+            'pk', 'vacancy_id', *APPLICATION_ARCHIVE_FIELDS
+        )
+        archived_applications = ArchivedJobApplication.objects.bulk_create([
+            ArchivedJobApplication(
+                original_id=application['pk'],
+                vacancy_id=archived_ids[application['vacancy_id']],
+                archived_at=now,
+                **{name: application[name] for name in APPLICATION_ARCHIVE_FIELDS},
+            )
+            for application in applications
+        ])
+
+        # Заявки и связи с навыками удаляются каскадно
+        JobVacancy.objects.filter(pk__in=pks).delete()
+        # Работодателей сбрасывает сигнал удаления вакансии, соискателей - здесь
+        applications_changed(job_seeker_ids=[application['job_seeker_id'] for application in applications])
+    return len(pks), len(archived_applications)
+
+
+def archive_vacancies(batch_size=None, now=None, progress=None):
+    """Переносит все подходящие вакансии в архив пачками по ``batch_size``"""
+    batch_size = batch_size or settings.VACANCY_ARCHIVE_BATCH_SIZE
+    now = now or timezone.now()
+    vacancies = applications = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            archive_candidates(now).filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            break
+        last_pk = pks[-1]
+        moved, moved_applications = archive_batch(pks, now)
+        vacancies += moved
+        applications += moved_applications
+        if progress:
+            progress(vacancies, applications)
+    return vacancies, applications
+
+
+def run(batch_size=None, now=None, progress=None):
+    """Один проход жизненного цикла: закрытие просроченных и перенос в архив"""
+    now = now or timezone.now()
+    started = time.monotonic()
+    closed = close_expired(now)
+    archived, archived_applications = archive_vacancies(batch_size, now, progress)
+    return {
+        'closed': closed,
+        'archived': archived,
+        'archived_applications': archived_applications,
+        'elapsed': time.monotonic() - started,
+    }
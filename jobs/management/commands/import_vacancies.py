@@ -0,0 +1,82 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.importers import VacancyImporter, detect_format
+from users.models import EmployerProfile
+
+
+class Command(BaseCommand):
+    help = 'Импортирует вакансии из CSV или JSONL файла пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу CSV или JSONL')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Формат файла (по умолчанию - по расширению)')
+        parser.add_argument('--employer', help='Slug работодателя для строк без колонки employer')
+        parser.add_argument('--batch-size', type=int, default=500, help='Количество вакансий в одной пачке')
+        parser.add_argument(
+            '--no-create-missing', action='store_true',
+            help='Не создавать отсутствующие навыки и местоположения, а пропускать такие строки',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки (по умолчанию <path>.checkpoint)',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить импорт с последней сохранённой контрольной точки',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        checkpoint_path = options['checkpoint'] or f"{path}.checkpoint"
+
+        employer = None
+        if options['employer']:
+            try:
+                employer = EmployerProfile.objects.get(slug=options['employer'])
+            except EmployerProfile.DoesNotExist:
+                raise CommandError(f"Работодатель не найден: {options['employer']}")
+
+        start_row = 0
+        if options['resume'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding='utf-8') as f:
+                start_row = json.load(f)['last_row']
+            self.stdout.write(f"Продолжаем импорт после строки {start_row}")
+
+        def checkpoint(last_row):
+            with open(checkpoint_path, 'w', encoding='utf-8') as f:
+                json.dump({'path': path, 'last_row': last_row}, f)
+
+        def progress(result):
+            self.stdout.write(
+                f"  строка {result.last_row}: создано {result.created}, пропущено {result.skipped}, "
+                f"{result.rows_per_second:.0f} строк/с"
+            )
+
+        importer = VacancyImporter(
+            employer=employer,
+            batch_size=options['batch_size'],
+            create_missing=not options['no_create_missing'],
+        )
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                result = importer.run(stream, fmt, start_row=start_row, checkpoint=checkpoint, progress=progress)
+        except Exception as exc:
+            raise CommandError(
+                f"Импорт прерван: {exc}. Сохранённые пачки не будут импортированы повторно "
+                f"при запуске с --resume."
+            ) from exc
+
+        for row_number, error in result.errors[:50]:
+            self.stderr.write(f"  строка {row_number}: {error}")
+        if len(result.errors) > 50:
+            self.stderr.write(f"  ... и ещё {len(result.errors) - 50} ошибок")
+
+        os.remove(checkpoint_path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Импортировано вакансий: {result.created}, пропущено строк: {result.skipped} "
+            f"за {result.elapsed:.2f} с ({result.rows_per_second:.0f} строк/с)"
+        ))
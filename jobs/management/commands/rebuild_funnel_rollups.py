@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import funnel
+from jobs.models import JobApplication
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики воронки заявок по журналу событий'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', action='store_true',
+            help='Сначала создать события для заявок, которых нет в журнале (данные до его появления)',
+        )
+        parser.add_argument('--employer', type=int, nargs='*', help='Пересчитать только указанных работодателей (id профиля)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        employer_ids = options['employer']
+        if options['seed']:
+            applications = JobApplication.objects.all()
+            if employer_ids:
+                applications = applications.filter(vacancy__employer_id__in=employer_ids)
+            self.stdout.write(f"Создано событий: {funnel.seed_events(applications)}")
+        rows = funnel.rebuild(employer_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Строк воронки: {rows}, готово за {time.monotonic() - started:.1f} с"
+        ))
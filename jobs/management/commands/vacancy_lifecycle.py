@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs import lifecycle
+
+
+class Command(BaseCommand):
+    help = 'Закрывает просроченные вакансии и переносит архивные вакансии с заявками в архивные таблицы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.VACANCY_ARCHIVE_BATCH_SIZE,
+            help='Количество вакансий, переносимых в архив одной транзакцией',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, сколько вакансий будет закрыто и перенесено в архив',
+        )
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно с интервалом --interval')
+        parser.add_argument('--interval', type=int, default=3600, help='Интервал между проходами в секундах')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if options['dry_run']:
+            self.stdout.write(
+                f"Будет закрыто: {lifecycle.expired_vacancies().count()}, "
+                f"перенесено в архив: {lifecycle.archive_candidates().count()}"
+            )
+            return
+
+        while True:
+            stats = lifecycle.run(batch_size=options['batch_size'], progress=self.progress)
+            self.stdout.write(self.style.SUCCESS(
+                f"Закрыто вакансий: {stats['closed']}, перенесено в архив: {stats['archived']} "
+                f"(заявок: {stats['archived_applications']}) за {stats['elapsed']:.2f} с"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def progress(self, vacancies, applications):
+        if self.verbosity > 1:
+            self.stdout.write(f"  в архиве: вакансий - {vacancies}, заявок - {applications}")
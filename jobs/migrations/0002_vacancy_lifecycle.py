@@ -0,0 +1,74 @@
+# Generated by Django 4.2.20 on 2026-10-19 15:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobvacancy',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Опубликована до'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedJobVacancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True, verbose_name='ID вакансии')),
+                ('title', models.CharField(max_length=255, verbose_name='Название вакансии')),
+                ('slug', models.SlugField(unique=True, verbose_name='URL')),
+                ('description', models.TextField(verbose_name='Описание вакансии')),
+                ('requirements', models.TextField(verbose_name='Требования')),
+                ('responsibilities', models.TextField(verbose_name='Обязанности')),
+                ('benefits', models.TextField(blank=True, null=True, verbose_name='Преимущества')),
+                ('salary_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Минимальная зарплата')),
+                ('salary_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Максимальная зарплата')),
+                ('is_remote', models.BooleanField(default=False, verbose_name='Удаленная работа')),
+                ('status', models.CharField(choices=[('open', 'Открыта'), ('closed', 'Закрыта'), ('archived', 'В архиве')], default='archived', max_length=20, verbose_name='Статус')),
+                ('employment_type', models.CharField(choices=[('full_time', 'Полная занятость'), ('part_time', 'Частичная занятость'), ('contract', 'Контракт'), ('internship', 'Стажировка'), ('remote', 'Удаленная работа')], max_length=20, verbose_name='Тип занятости')),
+                ('experience_required', models.CharField(choices=[('no_experience', 'Без опыта'), ('1-3', '1-3 года'), ('3-5', '3-5 лет'), ('5+', 'Более 5 лет')], max_length=20, verbose_name='Требуемый опыт')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='Опубликована до')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата обновления')),
+                ('archived_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Дата переноса в архив')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_vacancies', to='jobs.category', verbose_name='Категория')),
+                ('employer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_vacancies', to='users.employerprofile', verbose_name='Работодатель')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_vacancies', to='jobs.joblocation', verbose_name='Местоположение')),
+                ('skills', models.ManyToManyField(blank=True, related_name='archived_vacancies', to='jobs.skill', verbose_name='Навыки')),
+            ],
+            options={
+                'verbose_name': 'Архивная вакансия',
+                'verbose_name_plural': 'Архив вакансий',
+                'ordering': ['-archived_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedJobApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True, verbose_name='ID заявки')),
+                ('cover_letter', models.TextField(blank=True, null=True, verbose_name='Сопроводительное письмо')),
+                ('resume_file', models.FileField(blank=True, null=True, upload_to='job_applications/', verbose_name='Файл резюме')),
+                ('status', models.CharField(choices=[('pending', 'На рассмотрении'), ('reviewed', 'Рассмотрена'), ('interview', 'Приглашение на собеседование'), ('rejected', 'Отклонена'), ('accepted', 'Принята')], default='pending', max_length=20, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата обновления')),
+                ('employer_notes', models.TextField(blank=True, null=True, verbose_name='Заметки работодателя')),
+                ('archived_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Дата переноса в архив')),
+                ('job_seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_applications', to='users.jobseekerprofile', verbose_name='Соискатель')),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.archivedjobvacancy', verbose_name='Вакансия')),
+            ],
+            options={
+                'verbose_name': 'Архивная заявка',
+                'verbose_name_plural': 'Архив заявок',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
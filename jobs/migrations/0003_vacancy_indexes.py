@@ -0,0 +1,41 @@
+# Generated by Django 4.2.20 on 2026-10-19 15:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_vacancy_lifecycle'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['vacancy', '-created_at'], name='jobs_application_vacancy'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job_seeker', '-created_at'], name='jobs_application_seeker'),
+        ),
+        migrations.AddIndex(
+            model_name='jobvacancy',
+            index=models.Index(fields=['status', '-created_at'], name='jobs_vacancy_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='jobvacancy',
+            index=models.Index(fields=['category', 'status', '-created_at'], name='jobs_vacancy_category_status'),
+        ),
+        migrations.AddIndex(
+            model_name='jobvacancy',
+            index=models.Index(fields=['employer', '-created_at'], name='jobs_vacancy_employer_created'),
+        ),
+        migrations.AddIndex(
+            model_name='jobvacancy',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['employment_type', '-created_at'], name='jobs_vacancy_open_type'),
+        ),
+        migrations.AddIndex(
+            model_name='jobvacancy',
+            index=models.Index(condition=models.Q(('is_remote', True), ('status', 'open')), fields=['-created_at'], name='jobs_vacancy_open_remote'),
+        ),
+    ]
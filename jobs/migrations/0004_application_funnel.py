@@ -0,0 +1,58 @@
+# Generated by Django 4.2.20 on 2026-10-19 15:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('jobs', '0003_vacancy_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vacancy_id', models.BigIntegerField(verbose_name='ID вакансии')),
+                ('application_id', models.BigIntegerField(verbose_name='ID заявки')),
+                ('previous_status', models.CharField(blank=True, max_length=20, verbose_name='Прежний статус')),
+                ('status', models.CharField(choices=[('pending', 'На рассмотрении'), ('reviewed', 'Рассмотрена'), ('interview', 'Приглашение на собеседование'), ('rejected', 'Отклонена'), ('accepted', 'Принята')], max_length=20, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата события')),
+                ('employer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='application_events', to='users.employerprofile', verbose_name='Работодатель')),
+            ],
+            options={
+                'verbose_name': 'Событие заявки',
+                'verbose_name_plural': 'События заявок',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['employer', 'created_at'], name='jobs_appevent_employer'), models.Index(fields=['application_id'], name='jobs_appevent_application')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ApplicationFunnelRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vacancy_id', models.BigIntegerField(verbose_name='ID вакансии')),
+                ('period', models.CharField(choices=[('day', 'День'), ('week', 'Неделя')], max_length=5, verbose_name='Период')),
+                ('period_start', models.DateField(verbose_name='Начало периода')),
+                ('received', models.PositiveIntegerField(default=0, verbose_name='Получено')),
+                ('reviewed', models.PositiveIntegerField(default=0, verbose_name='Рассмотрено')),
+                ('interview', models.PositiveIntegerField(default=0, verbose_name='Приглашено на собеседование')),
+                ('accepted', models.PositiveIntegerField(default=0, verbose_name='Принято')),
+                ('rejected', models.PositiveIntegerField(default=0, verbose_name='Отклонено')),
+                ('employer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_rollups', to='users.employerprofile', verbose_name='Работодатель')),
+            ],
+            options={
+                'verbose_name': 'Воронка заявок за период',
+                'verbose_name_plural': 'Воронка заявок',
+                'indexes': [models.Index(fields=['vacancy_id', 'period', 'period_start'], name='jobs_funnel_rollup_vacancy')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='applicationfunnelrollup',
+            constraint=models.UniqueConstraint(fields=('employer', 'period', 'period_start', 'vacancy_id'), name='jobs_funnel_rollup_unique'),
+        ),
+    ]
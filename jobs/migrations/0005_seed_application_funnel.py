@@ -0,0 +1,85 @@
+import datetime
+from collections import Counter, defaultdict
+
+from django.db import migrations
+from django.db.models import F
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+# Копия правил jobs/funnel.py на момент миграции: их дальнейшие изменения её не касаются
+STAGES = ('received', 'reviewed', 'interview', 'accepted', 'rejected')
+PERIODS = ('day', 'week')
+
+
+def stage_of(previous_status, status):
+    if not previous_status:
+        return 'received'
+    if status in STAGES and status != previous_status:
+        return status
+    return None
+
+
+def period_start(period, moment):
+    day = timezone.localdate(moment)
+    if period == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    return day
+
+
+def seed_application_funnel(apps, schema_editor):
+    """События и счётчики воронки для заявок, поданных до появления журнала
+
+    То же, что ``rebuild_funnel_rollups --seed``: событие получения заявки и,
+    если статус уже менялся, событие текущего статуса с датой изменения заявки.
+    """
+    db = schema_editor.connection.alias
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    ApplicationStatusEvent = apps.get_model('jobs', 'ApplicationStatusEvent')
+    ApplicationFunnelRollup = apps.get_model('jobs', 'ApplicationFunnelRollup')
+
+    known = ApplicationStatusEvent.objects.using(db).values('application_id')
+    rows = list(
+        JobApplication.objects.using(db).exclude(pk__in=known)
+        .values_list('pk', 'vacancy_id', 'vacancy__employer_id', 'status', 'created_at', 'updated_at')
+        .order_by('pk')
+    )
+    events = []
+    increments = defaultdict(Counter)
+    for pk, vacancy_id, employer_id, status, created_at, updated_at in rows:
+        transitions = [('', 'pending', created_at)]
+        if status != 'pending':
+            transitions.append(('pending', status, max(updated_at, created_at)))
+        for previous_status, new_status, moment in transitions:
+            events.append(ApplicationStatusEvent(
+                employer_id=employer_id, vacancy_id=vacancy_id, application_id=pk,
+                previous_status=previous_status, status=new_status, created_at=moment,
+            ))
+            stage = stage_of(previous_status, new_status)
+            if stage is None:
+                continue
+            for period in PERIODS:
+                increments[employer_id, vacancy_id, period, period_start(period, moment)][stage] += 1
+    ApplicationStatusEvent.objects.using(db).bulk_create(events, batch_size=BATCH_SIZE)
+
+    # Счётчики могут уже быть у заявок, поданных после установки журнала
+    new_rollups = []
+    for (employer_id, vacancy_id, period, start), counts in increments.items():
+        updated = ApplicationFunnelRollup.objects.using(db).filter(
+            employer_id=employer_id, vacancy_id=vacancy_id, period=period, period_start=start,
+        ).update(**{stage: F(stage) + amount for stage, amount in counts.items()})
+        if not updated:
+            new_rollups.append(ApplicationFunnelRollup(
+                employer_id=employer_id, vacancy_id=vacancy_id, period=period, period_start=start, **counts,
+            ))
+    ApplicationFunnelRollup.objects.using(db).bulk_create(new_rollups, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_application_funnel'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_application_funnel, migrations.RunPython.noop),
+    ]
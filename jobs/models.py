@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
 from django.urls import reverse
 from users.models import EmployerProfile, JobSeekerProfile
@@ -107,28 +109,61 @@ class JobVacancy(models.Model):
     employment_type = models.CharField(max_length=20, choices=EMPLOYMENT_TYPE_CHOICES, verbose_name='Тип занятости')
     experience_required = models.CharField(max_length=20, choices=EXPERIENCE_CHOICES, verbose_name='Требуемый опыт')
     skills = models.ManyToManyField(Skill, related_name='vacancies', blank=True, verbose_name='Навыки')
+    expires_at = models.DateTimeField(blank=True, null=True, db_index=True, verbose_name='Опубликована до')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
     
+    is_archived = False
+    
     class Meta:
         verbose_name = 'Вакансия'
         verbose_name_plural = 'Вакансии'
         ordering = ['-created_at']
+        indexes = [
+            # Списки открытых вакансий всегда фильтруются по статусу и сортируются по дате
+            models.Index(fields=['status', '-created_at'], name='jobs_vacancy_status_created'),
+            models.Index(fields=['category', 'status', '-created_at'], name='jobs_vacancy_category_status'),
+            models.Index(fields=['employer', '-created_at'], name='jobs_vacancy_employer_created'),
+            # Частичные индексы только по открытым вакансиям для фильтров списка
+            models.Index(
+                fields=['employment_type', '-created_at'], condition=models.Q(status='open'),
+                name='jobs_vacancy_open_type',
+            ),
+            models.Index(
+                fields=['-created_at'], condition=models.Q(status='open', is_remote=True),
+                name='jobs_vacancy_open_remote',
+            ),
+        ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def build_slug(cls, title, company_name):
+        """Строит уникальный slug без обращения к базе данных"""
+        # Добавляем текущую дату и первые 8 символов UUID для уникальности
+        today = datetime.date.today().strftime('%Y%m%d')
+        unique_id = str(uuid.uuid4())[:8]
+        suffix = f"-{today}-{unique_id}"
+        
+        # Базовый slug из названия вакансии и названия компании, обрезанный под длину поля
+        max_length = cls._meta.get_field('slug').max_length - len(suffix)
+        base_slug = slugify(f"{title}-{company_name}")[:max_length].strip('-')
+        
+        return f"{base_slug}{suffix}"
+    
+    @staticmethod
+    def default_expires_at():
+        """Срок публикации новой вакансии по умолчанию"""
+        return timezone.now() + datetime.timedelta(days=settings.VACANCY_LIFETIME_DAYS)
+    
     def save(self, *args, **kwargs):
         if not self.slug:
-            # Создаём базовый slug из названия вакансии и названия компании
-            base_slug = slugify(f"{self.title}-{self.employer.company_name}")
-            
-            # Добавляем текущую дату для уникальности
-            today = datetime.date.today().strftime('%Y%m%d')
-            unique_id = str(uuid.uuid4())[:8]  # Берём первые 8 символов UUID
-            
-            # Создаём уникальный slug
-            self.slug = f"{base_slug}-{today}-{unique_id}"
+            self.slug = self.build_slug(self.title, self.employer.company_name)
+        
+        # Срок публикации по умолчанию для новых вакансий
+        if self._state.adding and not self.expires_at:
+            self.expires_at = self.default_expires_at()
             
         super().save(*args, **kwargs)
     
@@ -160,6 +195,131 @@ class JobApplication(models.Model):
         verbose_name_plural = 'Заявки на вакансии'
         ordering = ['-created_at']
         unique_together = ['job_seeker', 'vacancy']
+        indexes = [
+            # Заявки соискателя и заявки на вакансии работодателя выводятся от новых к старым
+            models.Index(fields=['vacancy', '-created_at'], name='jobs_application_vacancy'),
+            models.Index(fields=['job_seeker', '-created_at'], name='jobs_application_seeker'),
+        ]
     
     def __str__(self):
         return f"Заявка от {self.job_seeker.user.username} на вакансию {self.vacancy.title}"
+
+
+class ArchivedJobVacancy(models.Model):
+    """Вакансия, перенесённая из рабочей таблицы в архив"""
+    original_id = models.BigIntegerField(unique=True, verbose_name='ID вакансии')
+    title = models.CharField(max_length=255, verbose_name='Название вакансии')
+    slug = models.SlugField(unique=True, verbose_name='URL')
+    employer = models.ForeignKey(EmployerProfile, on_delete=models.CASCADE, related_name='archived_vacancies', verbose_name='Работодатель')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='archived_vacancies', verbose_name='Категория')
+    description = models.TextField(verbose_name='Описание вакансии')
+    requirements = models.TextField(verbose_name='Требования')
+    responsibilities = models.TextField(verbose_name='Обязанности')
+    benefits = models.TextField(blank=True, null=True, verbose_name='Преимущества')
+    salary_min = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, verbose_name='Минимальная зарплата')
+    salary_max = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, verbose_name='Максимальная зарплата')
+    location = models.ForeignKey(JobLocation, on_delete=models.SET_NULL, blank=True, null=True, related_name='archived_vacancies', verbose_name='Местоположение')
+    is_remote = models.BooleanField(default=False, verbose_name='Удаленная работа')
+    status = models.CharField(max_length=20, choices=JobVacancy.STATUS_CHOICES, default='archived', verbose_name='Статус')
+    employment_type = models.CharField(max_length=20, choices=JobVacancy.EMPLOYMENT_TYPE_CHOICES, verbose_name='Тип занятости')
+    experience_required = models.CharField(max_length=20, choices=JobVacancy.EXPERIENCE_CHOICES, verbose_name='Требуемый опыт')
+    skills = models.ManyToManyField(Skill, related_name='archived_vacancies', blank=True, verbose_name='Навыки')
+    expires_at = models.DateTimeField(blank=True, null=True, verbose_name='Опубликована до')
+    created_at = models.DateTimeField(verbose_name='Дата создания')
+    updated_at = models.DateTimeField(verbose_name='Дата обновления')
+    archived_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='Дата переноса в архив')
+
+    is_archived = True
+
+    class Meta:
+        verbose_name = 'Архивная вакансия'
+        verbose_name_plural = 'Архив вакансий'
+        ordering = ['-archived_at']
+
+    def __str__(self):
+        return self.title
+
+    def get_absolute_url(self):
+        return reverse('jobs:vacancy_detail', kwargs={'slug': self.slug})
+
+
+class ArchivedJobApplication(models.Model):
+    """Заявка на вакансию, перенесённая в архив вместе с вакансией"""
+    original_id = models.BigIntegerField(unique=True, verbose_name='ID заявки')
+    job_seeker = models.ForeignKey(JobSeekerProfile, on_delete=models.CASCADE, related_name='archived_applications', verbose_name='Соискатель')
+    vacancy = models.ForeignKey(ArchivedJobVacancy, on_delete=models.CASCADE, related_name='applications', verbose_name='Вакансия')
+    cover_letter = models.TextField(blank=True, null=True, verbose_name='Сопроводительное письмо')
+    resume_file = models.FileField(upload_to='job_applications/', blank=True, null=True, verbose_name='Файл резюме')
+    status = models.CharField(max_length=20, choices=JobApplication.STATUS_CHOICES, default='pending', verbose_name='Статус')
+    created_at = models.DateTimeField(verbose_name='Дата создания')
+    updated_at = models.DateTimeField(verbose_name='Дата обновления')
+    employer_notes = models.TextField(blank=True, null=True, verbose_name='Заметки работодателя')
+    archived_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='Дата переноса в архив')
+
+    class Meta:
+        verbose_name = 'Архивная заявка'
+        verbose_name_plural = 'Архив заявок'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Заявка от {self.job_seeker.user.username} на вакансию {self.vacancy.title}"
+
+
+class ApplicationStatusEvent(models.Model):
+    """Переход заявки в новый статус, по которым строится воронка (см. jobs/funnel.py)
+
+    Вакансия и заявка хранятся по id без внешних ключей: события остаются
+    после переноса вакансии с заявками в архив.
+    """
+    employer = models.ForeignKey(EmployerProfile, on_delete=models.CASCADE, related_name='application_events', verbose_name='Работодатель')
+    vacancy_id = models.BigIntegerField(verbose_name='ID вакансии')
+    application_id = models.BigIntegerField(verbose_name='ID заявки')
+    previous_status = models.CharField(max_length=20, blank=True, verbose_name='Прежний статус')
+    status = models.CharField(max_length=20, choices=JobApplication.STATUS_CHOICES, verbose_name='Статус')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Дата события')
+
+    class Meta:
+        verbose_name = 'Событие заявки'
+        verbose_name_plural = 'События заявок'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['employer', 'created_at'], name='jobs_appevent_employer'),
+            models.Index(fields=['application_id'], name='jobs_appevent_application'),
+        ]
+
+    def __str__(self):
+        return f"Заявка {self.application_id}: {self.previous_status or '-'} -> {self.status}"
+
+
+class ApplicationFunnelRollup(models.Model):
+    """Число заявок, дошедших до каждого этапа воронки, за день или неделю по вакансии"""
+    PERIOD_CHOICES = (
+        ('day', 'День'),
+        ('week', 'Неделя'),
+    )
+
+    employer = models.ForeignKey(EmployerProfile, on_delete=models.CASCADE, related_name='funnel_rollups', verbose_name='Работодатель')
+    vacancy_id = models.BigIntegerField(verbose_name='ID вакансии')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES, verbose_name='Период')
+    period_start = models.DateField(verbose_name='Начало периода')
+    received = models.PositiveIntegerField(default=0, verbose_name='Получено')
+    reviewed = models.PositiveIntegerField(default=0, verbose_name='Рассмотрено')
+    interview = models.PositiveIntegerField(default=0, verbose_name='Приглашено на собеседование')
+    accepted = models.PositiveIntegerField(default=0, verbose_name='Принято')
+    rejected = models.PositiveIntegerField(default=0, verbose_name='Отклонено')
+
+    class Meta:
+        verbose_name = 'Воронка заявок за период'
+        verbose_name_plural = 'Воронка заявок'
+        constraints = [
+            # Он же индекс графика работодателя: employer + period + диапазон дат
+            models.UniqueConstraint(
+                fields=['employer', 'period', 'period_start', 'vacancy_id'], name='jobs_funnel_rollup_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['vacancy_id', 'period', 'period_start'], name='jobs_funnel_rollup_vacancy'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_period_display()} с {self.period_start:%d.%m.%Y}, вакансия {self.vacancy_id}"
@@ -0,0 +1,53 @@
+"""Уведомления о заявках на вакансии"""
+from django.urls import reverse
+
+from core.notifications import enqueue, enqueue_many
+from .models import JobApplication
+
+
+def _employer_email(employer):
+    return employer.company_email or employer.user.email
+
+
+def notify_new_application(application):
+    """Сообщает работодателю о новой заявке на его вакансию"""
+    vacancy = application.vacancy
+    job_seeker = application.job_seeker
+    name = job_seeker.user.get_full_name() or job_seeker.user.username
+    enqueue(
+        _employer_email(vacancy.employer),
+        'new_application',
+        f"Новая заявка на вакансию «{vacancy.title}»",
+        f"Получен отклик от {name} на вакансию «{vacancy.title}».\n"
+        f"Все заявки: {reverse('jobs:employer_applications')}",
+    )
+
+
+def _status_message(title, status):
+    status_display = dict(JobApplication.STATUS_CHOICES).get(status, status)
+    return (
+        f"Статус заявки на вакансию «{title}» изменён",
+        f"Новый статус вашей заявки на вакансию «{title}»: {status_display}.\n"
+        f"Ваши заявки: {reverse('jobs:job_seeker_applications')}",
+    )
+
+
+def notify_status_change(application):
+    """Сообщает соискателю об изменении статуса его заявки"""
+    subject, body = _status_message(application.vacancy.title, application.status)
+    enqueue(application.job_seeker.user.email, 'application_status', subject, body)
+
+
+def notify_bulk_status_change(queryset, status):
+    """Ставит в очередь уведомления для массового изменения статуса заявок
+
+    Вызывается до ``queryset.update()``, так как массовое обновление не
+    отправляет сигналы сохранения моделей.
+    """
+    rows = queryset.exclude(status=status).values_list(
+        'job_seeker__user__email', 'vacancy__title'
+    )
+    enqueue_many(
+        (email, 'application_status', *_status_message(title, status))
+        for email, title in rows.iterator()
+    )
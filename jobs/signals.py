@@ -0,0 +1,72 @@
+"""Обработчики сигналов моделей приложения вакансий"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core import caching, search_index
+from users.dashboard import applications_changed
+from users.models import EmployerProfile
+from . import funnel
+from .models import Category, JobApplication, JobVacancy, Skill
+from .events import publish_new_application, publish_status_change
+from .notifications import notify_new_application, notify_status_change
+
+
+@receiver(post_init, sender=JobApplication)
+def remember_application_status(sender, instance, **kwargs):
+    """Запоминаем исходный статус заявки, чтобы отследить его изменение"""
+    # Через __dict__, чтобы не загружать отложенное поле (.only()/.defer())
+    instance._initial_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=JobApplication)
+def application_saved(sender, instance, created, **kwargs):
+    if created:
+        notify_new_application(instance)
+        publish_new_application(instance)
+        funnel.record_application(instance)
+    elif instance._initial_status is not None and instance.status != instance._initial_status:
+        notify_status_change(instance)
+        publish_status_change(instance)
+        funnel.record_application(instance, instance._initial_status)
+    instance._initial_status = instance.status
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def application_counts_changed(sender, instance, **kwargs):
+    """Счётчики заявок в кабинетах соискателя и работодателя нужно пересчитать"""
+    try:
+        employer_ids = [instance.vacancy.employer_id]
+    except JobVacancy.DoesNotExist:
+        # Заявка удалена вместе с вакансией - работодателя учитывает vacancy_applications_deleted
+        employer_ids = []
+    applications_changed(employer_ids, [instance.job_seeker_id])
+
+
+@receiver(post_save, sender=JobVacancy)
+@receiver(post_delete, sender=JobVacancy)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=EmployerProfile)
+def vacancies_changed(sender, **kwargs):
+    """Закешированные ленты и ответы API по вакансиям нужно построить заново"""
+    caching.bump(caching.VACANCIES)
+
+
+@receiver(post_delete, sender=JobVacancy)
+def vacancy_applications_deleted(sender, instance, **kwargs):
+    # Вместе с вакансией каскадно удаляются её заявки
+    applications_changed([instance.employer_id])
+
+
+@receiver(post_save, sender=JobVacancy)
+def index_vacancy(sender, instance, **kwargs):
+    """Обновляет основы слов вакансии в поисковом индексе"""
+    search_index.index_objects(JobVacancy, [instance])
+
+
+@receiver(post_delete, sender=JobVacancy)
+def remove_vacancy_from_search(sender, instance, **kwargs):
+    search_index.remove_objects(JobVacancy, [instance.pk])
@@ -1,3 +1,291 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.api import encode_cursor
+from users.models import EmployerProfile
+from .events import LocalBroker, RedisBroker
+from .exports import escape_formula
+from .importers import VacancyImporter
+from .models import ArchivedJobVacancy, Category, JobVacancy, Skill
+
+
+class EscapeFormulaTests(SimpleTestCase):
+    """Защита выгрузки CSV для Excel от формул в пользовательском тексте"""
+
+    def test_formula_prefixes_are_escaped(self):
+        for value in ('=HYPERLINK("http://evil")', '+7 999', '-2+3', '@SUM(A1)', '\t=1'):
+            with self.subTest(value=value):
+                self.assertEqual(escape_formula(value), "'" + value)
+
+    def test_plain_values_are_unchanged(self):
+        self.assertEqual(escape_formula('Программист Python'), 'Программист Python')
+        self.assertEqual(escape_formula(''), '')
+        self.assertEqual(escape_formula(Decimal('-100')), Decimal('-100'))
+
+
+class StopListening(BaseException):
+    pass
+
+
+class FakePubSub:
+    def __init__(self, messages=(), error=None, subscribe_error=None):
+        self.messages = messages
+        self.error = error
+        self.subscribe_error = subscribe_error
+        self.closed = False
+
+    def psubscribe(self, pattern):
+        if self.subscribe_error:
+            raise self.subscribe_error
+
+    def listen(self):
+        yield from self.messages
+        if self.error:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+def redis_message(channel, data):
+    return {'channel': f"{RedisBroker.prefix}{channel}".encode(), 'data': data}
+
+
+class RedisBrokerListenerTests(SimpleTestCase):
+    """Поток подписки на Redis переживает обрыв соединения и некорректные сообщения"""
+
+    def test_reconnects_and_skips_bad_messages(self):
+        event = json.dumps({'event': 'status_changed', 'data': {'application': 1}})
+        first = FakePubSub(
+            [redis_message('user:1', b'not json'), {'channel': None, 'data': event}, redis_message('user:1', event)],
+            error=ConnectionError('connection lost'),
+        )
+        second = FakePubSub([redis_message('user:2', event)])
+        unavailable = [FakePubSub(subscribe_error=ConnectionError('refused')) for _ in range(2)]
+        # Без подключения к Redis: __init__ брокера создаёт клиент
+        broker = RedisBroker.__new__(RedisBroker)
+        LocalBroker.__init__(broker)
+        broker._redis = mock.Mock(**{'pubsub.side_effect': [*unavailable, first, second]})
+        broker._listener = object()
+        delivered = []
+        broker._deliver = lambda channel, event, data: delivered.append((channel, event, data))
+
+        with mock.patch('jobs.events.time.sleep', side_effect=[None, None, None, StopListening]) as sleep, \
+                self.assertLogs('jobs.events', 'WARNING'), self.assertRaises(StopListening):
+            broker._listen()
+
+        self.assertEqual(delivered, [
+            ('user:1', 'status_changed', {'application': 1}),
+            ('user:2', 'status_changed', {'application': 1}),
+        ])
+        # Пауза растёт, пока Redis недоступен, и сбрасывается после успешной подписки
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [1, 2, 1, 1])
+        self.assertTrue(first.closed and second.closed)
+        # Поток завершился - следующая подписка запустит новый
+        self.assertIsNone(broker._listener)
+
+
+class VacancyApiTests(TestCase):
+    """JSON API вакансий: проверка параметров, курсор, ETag и архив"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('employer')
+        cls.employer = EmployerProfile.objects.create(user=user, company_name='Компания')
+        cls.category = Category.objects.create(name='Разработка', slug='it')
+        cls.vacancies = [
+            JobVacancy.objects.create(
+                title=f'Вакансия {number}', slug=f'vacancy-{number}', employer=cls.employer,
+                category=cls.category, description='Описание', requirements='Требования',
+                responsibilities='Обязанности', employment_type='full_time', experience_required='1-3',
+            )
+            for number in range(7)
+        ]
+        # Несколько вакансий с одинаковым временем создания: курсор различает их по id
+        moment = timezone.now() - datetime.timedelta(days=1)
+        JobVacancy.objects.filter(pk__in=[vacancy.pk for vacancy in cls.vacancies[2:5]]).update(created_at=moment)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, path, **params):
+        return self.client.get(path, params)
+
+    def test_invalid_cursor(self):
+        url = reverse('api:vacancy_list')
+        for cursor in ('не-курсор', encode_cursor(['не дата', 1]), encode_cursor({'id': 1}), encode_cursor([1])):
+            with self.subTest(cursor=cursor):
+                response = self.get(url, cursor=cursor)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('cursor', response.json()['error'])
+
+    def test_unknown_field(self):
+        response = self.get(reverse('api:vacancy_list'), fields='title,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['error'])
+
+    def test_cursor_paging_has_no_duplicates_or_gaps(self):
+        url, params, slugs = reverse('api:vacancy_list'), {'limit': 2, 'fields': 'slug'}, []
+        while url:
+            data = self.client.get(url, params).json()
+            slugs += [item['slug'] for item in data['results']]
+            # В адресе следующей страницы уже есть все параметры
+            url, params = data['next'], None
+        expected = JobVacancy.objects.order_by('-created_at', '-pk').values_list('slug', flat=True)
+        self.assertEqual(slugs, list(expected))
+
+    def test_if_none_match(self):
+        url = reverse('api:vacancy_list')
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        # Изменение вакансии после коммита меняет поколение кеша и ETag
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vacancies[0].save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_detail_falls_back_to_archive(self):
+        ArchivedJobVacancy.objects.create(
+            original_id=1000, title='Архивная вакансия', slug='archived', employer=self.employer,
+            category=self.category, description='Описание', requirements='Требования',
+            responsibilities='Обязанности', employment_type='full_time', experience_required='1-3',
+            created_at=timezone.now(), updated_at=timezone.now(),
+        )
+        response = self.get(reverse('api:vacancy_detail', kwargs={'slug': 'archived'}), fields='title,status')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'title': 'Архивная вакансия', 'status': 'archived'})
+        self.assertEqual(self.get(reverse('api:vacancy_detail', kwargs={'slug': 'missing'})).status_code, 404)
+
+
+IMPORT_HEADER = 'title,category,description,requirements,responsibilities,employment_type,experience_required,is_remote,city,salary_min,salary_max,skills\n'
+
+
+def import_row(title, category='Разработка', is_remote='да', city='', salary_min='', salary_max='', skills=''):
+    return f'{title},{category},Описание,Требования,Обязанности,full_time,1-3,{is_remote},{city},{salary_min},{salary_max},"{skills}"\n'
+
+
+class VacancyImporterTests(TestCase):
+    """Импорт вакансий: ошибки строк, навыки и продолжение после сбоя"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('employer')
+        cls.employer = EmployerProfile.objects.create(user=user, company_name='Компания')
+        Category.objects.create(name='Разработка', slug='it')
+        Skill.objects.create(name='Django', slug='django')
+
+    def run_import(self, content, **kwargs):
+        importer = VacancyImporter(employer=self.employer, batch_size=kwargs.pop('batch_size', 500))
+        return importer.run(io.StringIO(content), **kwargs)
+
+    def test_row_errors_are_skipped(self):
+        result = self.run_import(
+            IMPORT_HEADER
+            + import_row('Программист')
+            + import_row('')
+            + import_row('Бухгалтер', category='Финансы')
+            + import_row('Дизайнер', salary_min='много')
+            + import_row('Аналитик', salary_min='200000', salary_max='100000')
+            + import_row('Курьер', is_remote='')
+        )
+        self.assertEqual((result.created, result.skipped), (1, 5))
+        # Нумерация строк файла: первая - заголовок
+        self.assertEqual([row_number for row_number, _ in result.errors], [3, 4, 5, 6, 7])
+        self.assertIn('title', result.errors[0][1])
+        self.assertIn('Финансы', result.errors[1][1])
+        self.assertEqual(list(JobVacancy.objects.values_list('title', flat=True)), ['Программист'])
+
+    def test_invalid_json_line(self):
+        result = self.run_import('{"title": \n', fmt='jsonl')
+        self.assertEqual((result.created, result.skipped), (0, 1))
+        self.assertIn('JSON', result.errors[0][1])
+
+    def test_duplicate_skills(self):
+        result = self.run_import(
+            IMPORT_HEADER
+            + import_row('Программист', skills='Python, python; django, Python')
+            + import_row('Разработчик', skills='PYTHON')
+        )
+        self.assertEqual(result.created, 2)
+        self.assertEqual(sorted(Skill.objects.values_list('name', flat=True)), ['Django', 'Python'])
+        for vacancy in JobVacancy.objects.all():
+            with self.subTest(vacancy=vacancy.title):
+                expected = ['Django', 'Python'] if vacancy.title == 'Программист' else ['Python']
+                self.assertEqual(sorted(vacancy.skills.values_list('name', flat=True)), expected)
+
+    def test_resume_from_checkpoint(self):
+        content = ''.join(
+            json.dumps({
+                'title': f'Вакансия {number}', 'category': 'Разработка', 'description': 'Описание',
+                'requirements': 'Требования', 'responsibilities': 'Обязанности',
+                'employment_type': 'full_time', 'experience_required': '1-3', 'is_remote': 'да',
+            }, ensure_ascii=False) + '\n'
+            for number in range(1, 6)
+        )
+        importer = VacancyImporter(employer=self.employer, batch_size=2)
+        flush, checkpoints = importer.flush, []
+
+        def failing_flush(batch):
+            if checkpoints:
+                raise RuntimeError('Соединение с базой потеряно')
+            return flush(batch)
+
+        with mock.patch.object(importer, 'flush', side_effect=failing_flush):
+            with self.assertRaises(RuntimeError):
+                importer.run(io.StringIO(content), 'jsonl', checkpoint=checkpoints.append)
+        self.assertEqual(checkpoints, [2])
+
+        result = self.run_import(content, fmt='jsonl', start_row=checkpoints[-1], batch_size=2)
+        self.assertEqual((result.created, result.last_row), (3, 5))
+        self.assertEqual(
+            sorted(JobVacancy.objects.values_list('title', flat=True)),
+            [f'Вакансия {number}' for number in range(1, 6)],
+        )
+
+
+class VacancyImportAdminTests(TestCase):
+    """Страница импорта в админке: права и размер файла"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.staff = User.objects.create_user('staff', is_staff=True)
+        user = User.objects.create_user('employer')
+        cls.employer = EmployerProfile.objects.create(user=user, company_name='Компания')
+        Category.objects.create(name='Разработка', slug='it')
+
+    def upload(self, content):
+        return self.client.post(reverse('admin:jobs_jobvacancy_import'), {
+            'file': SimpleUploadedFile('vacancies.csv', content.encode('utf-8')),
+            'employer': self.employer.pk,
+        })
+
+    def test_requires_add_permission(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(reverse('admin:jobs_jobvacancy_import')).status_code, 403)
+
+    def test_import(self):
+        self.client.force_login(self.admin)
+        response = self.upload(IMPORT_HEADER + import_row('Программист'))
+        self.assertRedirects(response, reverse('admin:jobs_jobvacancy_changelist'))
+        self.assertTrue(JobVacancy.objects.filter(title='Программист').exists())
+
+    @override_settings(VACANCY_IMPORT_MAX_UPLOAD_SIZE=100)
+    def test_large_file_is_rejected(self):
+        self.client.force_login(self.admin)
+        response = self.upload(IMPORT_HEADER + import_row('Программист'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('import_vacancies', ' '.join(response.context['form'].errors['file']))
+        self.assertFalse(JobVacancy.objects.exists())
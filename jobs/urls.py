@@ -1,5 +1,8 @@
-from django.urls import path
-from . import views
+from django.urls import path, register_converter
+from core.feeds import FeedFormatConverter
+from . import feeds, views
+
+register_converter(FeedFormatConverter, 'feed')
 
 app_name = 'jobs'
 
@@ -8,11 +11,17 @@ urlpatterns = [
     path('', views.JobVacancyListView.as_view(), name='vacancy_list'),
     path('category/<slug:slug>/', views.CategoryVacancyListView.as_view(), name='category'),
     
+    # Ленты вакансий: rss, atom, json
+    path('feed/<feed:feed_format>/', feeds.VacancyFeed(), name='vacancy_feed'),
+    path('category/<slug:slug>/feed/<feed:feed_format>/', feeds.CategoryVacancyFeed(), name='category_feed'),
+    path('employer/<slug:slug>/feed/<feed:feed_format>/', feeds.EmployerVacancyFeed(), name='employer_feed'),
+    
     # Создание и управление вакансиями (для работодателей)
     path('vacancy/create/', views.JobVacancyCreateView.as_view(), name='vacancy_create'),
     path('vacancy/<slug:slug>/update/', views.JobVacancyUpdateView.as_view(), name='vacancy_update'),
     path('vacancy/<slug:slug>/delete/', views.JobVacancyDeleteView.as_view(), name='vacancy_delete'),
     path('my-vacancies/', views.EmployerVacanciesView.as_view(), name='employer_vacancies'),
+    path('my-vacancies/export/', views.EmployerVacanciesExportView.as_view(), name='employer_vacancies_export'),
     
     # Детальная информация о вакансии (должна быть ПОСЛЕ специфических URL)
     path('vacancy/<slug:slug>/', views.JobVacancyDetailView.as_view(), name='vacancy_detail'),
@@ -21,4 +30,9 @@ urlpatterns = [
     path('vacancy/<slug:vacancy_slug>/apply/', views.JobApplicationCreateView.as_view(), name='apply'),
     path('my-applications/', views.JobSeekerApplicationsView.as_view(), name='job_seeker_applications'),
     path('employer/applications/', views.EmployerApplicationsView.as_view(), name='employer_applications'),
+    path('employer/applications/export/', views.EmployerApplicationsExportView.as_view(), name='employer_applications_export'),
+    path('employer/analytics/', views.EmployerAnalyticsView.as_view(), name='employer_analytics'),
+    
+    # Поток событий о заявках (Server-Sent Events)
+    path('events/', views.EventStreamView.as_view(), name='events'),
 ] 
\ No newline at end of file
@@ -1,70 +1,87 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
-from django.db.models import Q
 from django.contrib import messages
-from .models import JobVacancy, Category, Skill, JobLocation, JobApplication
-from users.models import EmployerProfile, JobSeekerProfile
+from .models import ApplicationFunnelRollup, ArchivedJobApplication, ArchivedJobVacancy, JobVacancy, Category, Skill, JobLocation, JobApplication
+from core.aio import aget_object_or_404, run_concurrently
+from core.caching import CachedCountPaginator
+from core.replicas import ReplicaReadMixin
+from core.search_log import SearchLogMixin, vacancy_count_key
 from .forms import JobVacancyForm, JobApplicationForm, JobSearchForm
+from . import funnel
+from .events import get_broker, user_channel
+from .exports import export_applications, export_vacancies
+from users.middleware import aresolve_profile
 
-class JobVacancyListView(ListView):
+class JobVacancyListView(SearchLogMixin, ReplicaReadMixin, ListView):
     """Представление списка вакансий"""
     model = JobVacancy
     template_name = 'jobs/vacancy_list.html'
     context_object_name = 'vacancies'
     paginate_by = 10
+    search_log_source = 'vacancies'
     
     def get_queryset(self):
-        queryset = JobVacancy.objects.filter(status='open')
+        queryset = JobVacancy.objects.filter(status='open').select_related('employer', 'location')
         
         # Фильтрация по форме поиска
-        form = JobSearchForm(self.request.GET)
-        if form.is_valid():
-            # Поиск по ключевым словам
-            keywords = form.cleaned_data.get('keywords')
-            if keywords:
-                queryset = queryset.filter(
-                    Q(title__icontains=keywords) | 
-                    Q(description__icontains=keywords) |
-                    Q(requirements__icontains=keywords)
-                )
-            
-            # Фильтрация по категории
-            category = form.cleaned_data.get('category')
-            if category:
-                queryset = queryset.filter(category=category)
-            
-            # Фильтрация по местоположению
-            location = form.cleaned_data.get('location')
-            if location:
-                queryset = queryset.filter(location__city__icontains=location)
-            
-            # Фильтрация по типу занятости
-            employment_type = form.cleaned_data.get('employment_type')
-            if employment_type:
-                queryset = queryset.filter(employment_type=employment_type)
-            
-            # Фильтрация по опыту
-            experience = form.cleaned_data.get('experience')
-            if experience:
-                queryset = queryset.filter(experience_required=experience)
-            
-            # Фильтрация по удаленной работе
-            remote = form.cleaned_data.get('remote')
-            if remote:
-                queryset = queryset.filter(is_remote=True)
+        self.search_form = JobSearchForm(self.request.GET)
+        self.search_params = ('', '')
+        if self.search_form.is_valid():
+            queryset = self.search_form.filter(queryset)
+            self.search_params = self.search_form.search_params()
         
         return queryset
     
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        # Число вакансий по одинаковым фильтрам берётся из кеша до изменения вакансий
+        return CachedCountPaginator(
+            queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+            cache_key=vacancy_count_key(*self.search_params), timeout=settings.SEARCH_CACHE_TIMEOUT,
+            **kwargs,
+        )
+    
+    async def get(self, request, *args, **kwargs):
+        # Проверка формы обращается к базе (выбор категории и местоположения)
+        self.object_list = await sync_to_async(self.get_queryset)()
+        # Страница вакансий с числом найденных и список категорий загружаются одновременно
+        loaded = await run_concurrently(
+            categories=Category.objects.all(),
+            page=lambda: self._load_page(self.object_list),
+        )
+        paginator, page, vacancies = loaded['page']
+        context = self.get_context_data(
+            object_list=vacancies, paginator=paginator, page_obj=page,
+            is_paginated=page.has_other_pages(), categories=loaded['categories'],
+        )
+        return self.render_to_response(context)
+    
+    def _load_page(self, queryset):
+        paginator, page, object_list, is_paginated = self.paginate_queryset(queryset, self.paginate_by)
+        return paginator, page, list(object_list)
+    
+    def get_paginate_by(self, queryset):
+        # Страница загружается в get() (_load_page), повторно ListView её не разбивает
+        return None
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['search_form'] = JobSearchForm(self.request.GET)
-        context['categories'] = Category.objects.all()
+        context['search_form'] = self.search_form
+        # В журнал попадают поиски с фильтрами, листание страниц - нет
+        keywords, filters = self.search_params
+        if (keywords or filters) and context['page_obj'].number == 1:
+            self.logged_search = (keywords, filters, context['paginator'].count)
         return context
 
 
-class CategoryVacancyListView(ListView):
+class CategoryVacancyListView(ReplicaReadMixin, ListView):
     """Представление вакансий по категории"""
     model = JobVacancy
     template_name = 'jobs/category_vacancies.html'
@@ -82,35 +99,44 @@ class CategoryVacancyListView(ListView):
         return context
 
 
-class JobVacancyDetailView(DetailView):
+class JobVacancyDetailView(ReplicaReadMixin, DetailView):
     """Представление отдельной вакансии"""
     model = JobVacancy
     template_name = 'jobs/vacancy_detail.html'
     context_object_name = 'vacancy'
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # Добавляем похожие вакансии из той же категории
-        vacancy = self.object
-        context['similar_vacancies'] = JobVacancy.objects.filter(
-            category=vacancy.category, 
-            status='open'
-        ).exclude(id=vacancy.id)[:4]
+    related = ('employer__user', 'location', 'category')
+    
+    async def get(self, request, *args, **kwargs):
+        slug = kwargs[self.slug_url_kwarg]
+        try:
+            vacancy = await aget_object_or_404(
+                JobVacancy.objects.select_related(*self.related).prefetch_related('skills'), slug=slug,
+            )
+        except Http404:
+            # Вакансии, перенесённые в архив, доступны по прежнему адресу
+            vacancy = await aget_object_or_404(
+                ArchivedJobVacancy.objects.select_related(*self.related).prefetch_related('skills'), slug=slug,
+            )
+        self.object = vacancy
+        profile = await aresolve_profile(request)
         
-        # Добавляем форму заявки, если пользователь авторизован и является соискателем
-        if self.request.user.is_authenticated:
-            try:
-                job_seeker = JobSeekerProfile.objects.get(user=self.request.user)
-                # Проверяем, не подавал ли уже пользователь заявку на эту вакансию
-                has_applied = JobApplication.objects.filter(job_seeker=job_seeker, vacancy=vacancy).exists()
-                context['has_applied'] = has_applied
-                
-                if not has_applied:
-                    context['application_form'] = JobApplicationForm()
-            except JobSeekerProfile.DoesNotExist:
-                pass
+        # Похожие вакансии из той же категории и заявка соискателя проверяются одновременно
+        queries = {
+            'similar_vacancies': JobVacancy.objects.filter(
+                category_id=vacancy.category_id,
+                status='open'
+            ).exclude(slug=vacancy.slug).select_related('employer')[:4],
+        }
+        if profile.is_job_seeker:
+            queries['has_applied'] = vacancy.applications.filter(job_seeker_id=profile.job_seeker_id).exists
+        context = self.get_context_data(object=vacancy, **await run_concurrently(**queries))
         
-        return context
+        # Форма заявки - соискателю, который ещё не откликался на действующую вакансию
+        if profile.is_job_seeker and not context['has_applied'] and not vacancy.is_archived:
+            context['application_form'] = JobApplicationForm()
+        
+        return self.render_to_response(context)
 
 
 class JobVacancyCreateView(LoginRequiredMixin, CreateView):
@@ -125,14 +151,12 @@ class JobVacancyCreateView(LoginRequiredMixin, CreateView):
         return kwargs
     
     def form_valid(self, form):
-        try:
-            employer = EmployerProfile.objects.get(user=self.request.user)
-            form.instance.employer = employer
-            messages.success(self.request, 'Вакансия успешно создана!')
-            return super().form_valid(form)
-        except EmployerProfile.DoesNotExist:
+        if not self.request.profile.is_employer:
             messages.error(self.request, 'Вы должны создать профиль работодателя перед публикацией вакансий.')
             return redirect('users:employer_profile_create')
+        form.instance.employer = self.request.profile.get_employer()
+        messages.success(self.request, 'Вакансия успешно создана!')
+        return super().form_valid(form)
 
 
 class JobVacancyUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
@@ -148,7 +172,7 @@ class JobVacancyUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     
     def test_func(self):
         vacancy = self.get_object()
-        return vacancy.employer.user == self.request.user or self.request.user.is_staff
+        return vacancy.employer_id == self.request.profile.employer_id or self.request.user.is_staff
     
     def form_valid(self, form):
         messages.success(self.request, 'Вакансия успешно обновлена!')
@@ -163,7 +187,7 @@ class JobVacancyDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     
     def test_func(self):
         vacancy = self.get_object()
-        return vacancy.employer.user == self.request.user or self.request.user.is_staff
+        return vacancy.employer_id == self.request.profile.employer_id or self.request.user.is_staff
     
     def delete(self, request, *args, **kwargs):
         messages.success(self.request, 'Вакансия успешно удалена!')
@@ -178,11 +202,20 @@ class EmployerVacanciesView(LoginRequiredMixin, ListView):
     paginate_by = 10
     
     def get_queryset(self):
-        try:
-            employer = EmployerProfile.objects.get(user=self.request.user)
-            return JobVacancy.objects.filter(employer=employer)
-        except EmployerProfile.DoesNotExist:
+        if not self.request.profile.is_employer:
             return JobVacancy.objects.none()
+        return JobVacancy.objects.filter(employer_id=self.request.profile.employer_id).select_related('location')
+
+
+class EmployerVacanciesExportView(LoginRequiredMixin, View):
+    """Выгрузка вакансий работодателя в CSV"""
+    
+    def get(self, request):
+        if not request.profile.is_employer:
+            messages.error(request, 'Выгрузка доступна только работодателям.')
+            return redirect('users:dashboard')
+        queryset = JobVacancy.objects.filter(employer_id=request.profile.employer_id)
+        return export_vacancies(queryset, excel=request.GET.get('format') == 'excel')
 
 
 class JobApplicationCreateView(LoginRequiredMixin, CreateView):
@@ -200,51 +233,171 @@ class JobApplicationCreateView(LoginRequiredMixin, CreateView):
         return context
     
     def form_valid(self, form):
-        try:
-            job_seeker = JobSeekerProfile.objects.get(user=self.request.user)
-            form.instance.job_seeker = job_seeker
-            form.instance.vacancy = self.get_vacancy()
-            
-            # Проверяем, не подавал ли пользователь уже заявку на эту вакансию
-            if JobApplication.objects.filter(job_seeker=job_seeker, vacancy=form.instance.vacancy).exists():
-                messages.error(self.request, 'Вы уже подали заявку на эту вакансию.')
-                return redirect('jobs:vacancy_detail', slug=form.instance.vacancy.slug)
-            
-            messages.success(self.request, 'Заявка успешно отправлена!')
-            return super().form_valid(form)
-        except JobSeekerProfile.DoesNotExist:
+        if not self.request.profile.is_job_seeker:
             messages.error(self.request, 'Вы должны создать профиль соискателя перед подачей заявок.')
             return redirect('users:job_seeker_profile_create')
+        job_seeker = self.request.profile.get_job_seeker()
+        form.instance.job_seeker = job_seeker
+        form.instance.vacancy = self.get_vacancy()
+        
+        # Проверяем, не подавал ли пользователь уже заявку на эту вакансию
+        if JobApplication.objects.filter(job_seeker=job_seeker, vacancy=form.instance.vacancy).exists():
+            messages.error(self.request, 'Вы уже подали заявку на эту вакансию.')
+            return redirect('jobs:vacancy_detail', slug=form.instance.vacancy.slug)
+        
+        messages.success(self.request, 'Заявка успешно отправлена!')
+        return super().form_valid(form)
     
     def get_success_url(self):
         return reverse_lazy('jobs:vacancy_detail', kwargs={'slug': self.get_vacancy().slug})
 
 
-class JobSeekerApplicationsView(LoginRequiredMixin, ListView):
+class ApplicationArchiveTabMixin:
+    """Вкладка «Архив» (?archive=1): заявки вакансий, перенесённых в архив (см. jobs/lifecycle.py)"""
+    
+    @property
+    def show_archive(self):
+        return self.request.GET.get('archive') == '1'
+    
+    def get_application_model(self):
+        return ArchivedJobApplication if self.show_archive else JobApplication
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['show_archive'] = self.show_archive
+        # Ссылки пагинации остаются на выбранной вкладке
+        context['tab_query'] = 'archive=1&' if self.show_archive else ''
+        return context
+
+
+class JobSeekerApplicationsView(LoginRequiredMixin, ApplicationArchiveTabMixin, ListView):
     """Представление списка заявок соискателя"""
-    model = JobApplication
     template_name = 'jobs/job_seeker_applications.html'
     context_object_name = 'applications'
     paginate_by = 10
     
     def get_queryset(self):
-        try:
-            job_seeker = JobSeekerProfile.objects.get(user=self.request.user)
-            return JobApplication.objects.filter(job_seeker=job_seeker)
-        except JobSeekerProfile.DoesNotExist:
-            return JobApplication.objects.none()
+        model = self.get_application_model()
+        if not self.request.profile.is_job_seeker:
+            return model.objects.none()
+        return model.objects.filter(
+            job_seeker_id=self.request.profile.job_seeker_id
+        ).select_related('vacancy__employer')
 
 
-class EmployerApplicationsView(LoginRequiredMixin, ListView):
+class EmployerApplicationsView(LoginRequiredMixin, ApplicationArchiveTabMixin, ListView):
     """Представление списка заявок на вакансии работодателя"""
-    model = JobApplication
     template_name = 'jobs/employer_applications.html'
     context_object_name = 'applications'
     paginate_by = 10
     
     def get_queryset(self):
+        model = self.get_application_model()
+        if not self.request.profile.is_employer:
+            return model.objects.none()
+        return model.objects.filter(
+            vacancy__employer_id=self.request.profile.employer_id
+        ).select_related('vacancy', 'job_seeker__user')
+
+
+class EmployerApplicationsExportView(LoginRequiredMixin, View):
+    """Выгрузка заявок на вакансии работодателя в CSV"""
+    
+    def get(self, request):
+        if not request.profile.is_employer:
+            messages.error(request, 'Выгрузка доступна только работодателям.')
+            return redirect('users:dashboard')
+        queryset = JobApplication.objects.filter(vacancy__employer_id=request.profile.employer_id)
+        return export_applications(queryset, excel=request.GET.get('format') == 'excel')
+
+
+class EmployerAnalyticsView(LoginRequiredMixin, TemplateView):
+    """Воронка заявок работодателя по дням или неделям (см. jobs/funnel.py)"""
+    template_name = 'jobs/employer_analytics.html'
+    stage_colors = {
+        'received': 'bg-primary',
+        'reviewed': 'bg-info',
+        'interview': 'bg-warning',
+        'accepted': 'bg-success',
+        'rejected': 'bg-danger',
+    }
+    
+    def get(self, request, *args, **kwargs):
+        if not request.profile.is_employer:
+            messages.error(request, 'Аналитика доступна только работодателям.')
+            return redirect('users:dashboard')
+        self.employer_id = request.profile.employer_id
+        return super().get(request, *args, **kwargs)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        period = self.request.GET.get('period')
+        if period not in funnel.PERIODS:
+            period = 'week'
         try:
-            employer = EmployerProfile.objects.get(user=self.request.user)
-            return JobApplication.objects.filter(vacancy__employer=employer)
-        except EmployerProfile.DoesNotExist:
-            return JobApplication.objects.none()
+            vacancy_id = int(self.request.GET.get('vacancy', ''))
+        except ValueError:
+            vacancy_id = None
+        
+        series = funnel.employer_series(self.employer_id, period, vacancy_id)
+        # Высота столбцов графика в процентах от самого большого значения
+        peak = max((row[stage] for row in series for stage in funnel.STAGE_FIELDS), default=0) or 1
+        for row in series:
+            row['bars'] = [
+                (label, self.stage_colors[stage], row[stage], round(row[stage] * 100 / peak))
+                for stage, label in funnel.STAGES
+            ]
+        context.update({
+            'period': period,
+            'periods': ApplicationFunnelRollup.PERIOD_CHOICES,
+            'vacancy_id': vacancy_id,
+            # Этапы с итогами за весь показанный период
+            'stages': [
+                (label, self.stage_colors[stage], sum(row[stage] for row in series))
+                for stage, label in funnel.STAGES
+            ],
+            'series': series,
+            'vacancies': funnel.vacancy_totals(self.employer_id, period, since=series[0]['start']),
+        })
+        return context
+
+
+class EventStreamView(View):
+    """Поток событий о заявках для работодателей и соискателей (Server-Sent Events)
+
+    Работает только при запуске через ASGI (employment_project.asgi): под WSGI
+    каждый открытый поток занимал бы целый рабочий процесс.
+    """
+
+    async def get(self, request):
+        user_id = await sync_to_async(
+            lambda: request.user.pk if request.user.is_authenticated else None
+        )()
+        if user_id is None:
+            return HttpResponse(status=403)
+        if not isinstance(request, ASGIRequest):
+            # Код 204 сообщает EventSource, что переподключаться не нужно
+            return HttpResponse(status=204)
+
+        broker = get_broker()
+        subscription = broker.subscribe(user_channel(user_id))
+
+        async def stream():
+            loop = asyncio.get_running_loop()
+            # Поток периодически закрывается, и браузер переподключается сам:
+            # так не остаются висеть подписки отключившихся клиентов
+            deadline = loop.time() + settings.EVENTS_STREAM_TIMEOUT
+            try:
+                yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+                while loop.time() < deadline:
+                    try:
+                        yield await asyncio.wait_for(subscription.get(), settings.EVENTS_HEARTBEAT)
+                    except asyncio.TimeoutError:
+                        yield ": ping\n\n"
+            finally:
+                broker.unsubscribe(subscription)
+
+        response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
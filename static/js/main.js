@@ -45,4 +45,46 @@ document.addEventListener('DOMContentLoaded', function() {
     if (fontSizeToggle) {
         fontSizeToggle.addEventListener('click', toggleLargeFont);
     }
-}); 
\ No newline at end of file
+}); 
+
+// Уведомления о заявках в реальном времени (Server-Sent Events)
+function showEventNotice(text, url) {
+    let container = document.getElementById('event-notices');
+    if (!container) {
+        container = document.createElement('div');
+        container.id = 'event-notices';
+        container.className = 'position-fixed bottom-0 end-0 p-3';
+        container.style.zIndex = '1080';
+        document.body.appendChild(container);
+    }
+    const notice = document.createElement('div');
+    notice.className = 'alert alert-info alert-dismissible fade show shadow';
+    const link = document.createElement('a');
+    link.href = url;
+    link.className = 'alert-link';
+    link.textContent = text;
+    const close = document.createElement('button');
+    close.type = 'button';
+    close.className = 'btn-close';
+    close.setAttribute('data-bs-dismiss', 'alert');
+    notice.appendChild(link);
+    notice.appendChild(close);
+    container.appendChild(notice);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const eventsUrl = document.body.dataset.eventsUrl;
+    if (!eventsUrl || !window.EventSource) {
+        return;
+    }
+
+    const source = new EventSource(eventsUrl);
+    source.addEventListener('new_application', function(event) {
+        const data = JSON.parse(event.data);
+        showEventNotice('Новая заявка на вакансию «' + data.title + '»', '/jobs/employer/applications/');
+    });
+    source.addEventListener('status_changed', function(event) {
+        const data = JSON.parse(event.data);
+        showEventNotice('Заявка на вакансию «' + data.title + '»: ' + data.status_display, '/jobs/my-applications/');
+    });
+});
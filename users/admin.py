@@ -2,7 +2,6 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from .models import JobSeekerProfile, EmployerProfile
-from core.admin import admin_site
 
 # Расширяем стандартный UserAdmin, чтобы отображать связанные профили
 class UserAdmin(BaseUserAdmin):
@@ -87,9 +86,9 @@ class EmployerProfileAdmin(admin.ModelAdmin):
     vacancy_count.short_description = 'Вакансий'
 
 # Перерегистрация User с нашим кастомным UserAdmin
-admin_site.unregister(User)
-admin_site.register(User, UserAdmin)
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
 
-# Регистрация моделей в admin_site
-admin_site.register(JobSeekerProfile, JobSeekerProfileAdmin)
-admin_site.register(EmployerProfile, EmployerProfileAdmin)
+# Регистрация моделей в админке
+admin.site.register(JobSeekerProfile, JobSeekerProfileAdmin)
+admin.site.register(EmployerProfile, EmployerProfileAdmin)
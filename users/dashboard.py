@@ -0,0 +1,152 @@
+"""
+Данные личного кабинета соискателя и работодателя.
+
+Тип профиля берётся из ``request.profile`` (users/middleware.py), сам профиль
+загружается одним запросом по первичному ключу. Затем кабинет работодателя
+загружает последние вакансии и последние заявки, а кабинет соискателя -
+последние заявки. Каждый список загружается одним запросом вместе со
+связанными записями.
+
+Число заявок по статусам (для работодателя - ещё и по каждой вакансии)
+считается одним ``GROUP BY`` и кешируется. Ключ кеша включает поколение заявок
+профиля. Оно увеличивается при сохранении заявки, массовой смене статусов в
+админке и удалении вакансий вместе с заявками. Поэтому кабинет обходится
+фиксированным числом запросов, сколько бы вакансий и заявок ни было.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from core import caching
+from jobs.models import JobApplication, JobVacancy
+
+RECENT_ITEMS = 5
+
+
+def employer_namespace(employer_id):
+    return f"applications:employer:{employer_id}"
+
+
+def job_seeker_namespace(job_seeker_id):
+    return f"applications:seeker:{job_seeker_id}"
+
+
+def applications_changed(employer_ids=(), job_seeker_ids=()):
+    """Сбрасывает закешированные счётчики заявок в кабинетах профилей"""
+    namespaces = [employer_namespace(pk) for pk in set(employer_ids)]
+    namespaces += [job_seeker_namespace(pk) for pk in set(job_seeker_ids)]
+    if namespaces:
+        caching.bump(*namespaces)
+
+
+def status_list(counts):
+    """Список (статус, название, число) в порядке ``STATUS_CHOICES`` без нулевых"""
+    return [
+        (status, label, counts[status])
+        for status, label in JobApplication.STATUS_CHOICES
+        if counts.get(status)
+    ]
+
+
+@dataclass
+class Dashboard:
+    profile_type: str = None
+    profile: object = None
+    vacancies: list = field(default_factory=list)
+    applications: list = field(default_factory=list)
+    status_counts: list = field(default_factory=list)
+    applications_total: int = 0
+
+    def context(self):
+        return {
+            'profile_type': self.profile_type,
+            'profile': self.profile,
+            'vacancies': self.vacancies,
+            'applications': self.applications,
+            'status_counts': self.status_counts,
+            'applications_total': self.applications_total,
+        }
+
+
+def cached_counts(namespace, compute):
+    key = f"dashboard:{namespace}:{caching.generation(namespace)}"
+    counts = cache.get(key)
+    if counts is None:
+        counts = compute()
+        cache.set(key, counts, settings.DASHBOARD_CACHE_TIMEOUT)
+    return counts
+
+
+def employer_status_counts(employer):
+    """Число заявок по статусам для каждой вакансии работодателя: {id вакансии: {статус: число}}"""
+    def compute():
+        counts = defaultdict(dict)
+        rows = (
+            JobApplication.objects.filter(vacancy__employer=employer)
+            .order_by()
+            .values_list('vacancy_id', 'status')
+            .annotate(total=Count('pk'))
+        )
+        for vacancy_id, status, total in rows:
+            counts[vacancy_id][status] = total
+        return dict(counts)
+
+    return cached_counts(employer_namespace(employer.pk), compute)
+
+
+def job_seeker_status_counts(job_seeker):
+    """Число заявок соискателя по статусам: {статус: число}"""
+    def compute():
+        return dict(
+            JobApplication.objects.filter(job_seeker=job_seeker)
+            .order_by()
+            .values_list('status')
+            .annotate(total=Count('pk'))
+        )
+
+    return cached_counts(job_seeker_namespace(job_seeker.pk), compute)
+
+
+def employer_dashboard(employer):
+    by_vacancy = employer_status_counts(employer)
+    vacancies = list(JobVacancy.objects.filter(employer=employer)[:RECENT_ITEMS])
+    for vacancy in vacancies:
+        counts = by_vacancy.get(vacancy.pk, {})
+        vacancy.status_counts = status_list(counts)
+        vacancy.applications_total = sum(counts.values())
+
+    totals = defaultdict(int)
+    for counts in by_vacancy.values():
+        for status, total in counts.items():
+            totals[status] += total
+
+    applications = list(
+        JobApplication.objects.filter(vacancy__employer=employer)
+        .select_related('vacancy', 'job_seeker__user')[:RECENT_ITEMS]
+    )
+    return Dashboard(
+        'employer', employer, vacancies, applications, status_list(totals), sum(totals.values()),
+    )
+
+
+def job_seeker_dashboard(job_seeker):
+    counts = job_seeker_status_counts(job_seeker)
+    applications = list(
+        JobApplication.objects.filter(job_seeker=job_seeker).select_related('vacancy')[:RECENT_ITEMS]
+    )
+    return Dashboard(
+        'job_seeker', job_seeker, applications=applications,
+        status_counts=status_list(counts), applications_total=sum(counts.values()),
+    )
+
+
+def build_dashboard(profile):
+    """Кабинет по ``request.profile`` (users/middleware.py)"""
+    if profile.role == 'job_seeker':
+        return job_seeker_dashboard(profile.get_job_seeker())
+    if profile.role == 'employer':
+        return employer_dashboard(profile.get_employer())
+    return Dashboard()
@@ -0,0 +1,118 @@
+"""
+Профиль текущего пользователя в ``request.profile``.
+
+Роль пользователя (соискатель или работодатель), id и slug его профилей
+определяются одним запросом и запоминаются в сессии. Последующие запросы
+берут их из сессии без обращения к таблицам профилей. Сохранение или удаление
+профиля увеличивает поколение профилей пользователя в кеше (users/signals.py).
+Сессия с прежним поколением определяется заново: так новый профиль виден
+сразу, в том числе в других сессиях того же пользователя.
+
+Сам объект профиля загружается только когда он нужен представлению:
+``request.profile.get_job_seeker()`` / ``get_employer()``. Асинхронные
+представления получают профиль через ``await aresolve_profile(request)``.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from core import caching
+from .models import EmployerProfile, JobSeekerProfile
+
+SESSION_KEY = '_profile'
+
+
+def profile_namespace(user_id):
+    return f"profile:{user_id}"
+
+
+class RequestProfile:
+    """Роль и профили пользователя запроса; у анонимного пользователя профилей нет"""
+
+    def __init__(self, user, job_seeker=None, employer=None):
+        self.user = user
+        self.job_seeker_id, self.job_seeker_slug = job_seeker or (None, None)
+        self.employer_id, self.employer_slug = employer or (None, None)
+        self._instances = {}
+
+    @property
+    def is_job_seeker(self):
+        return self.job_seeker_id is not None
+
+    @property
+    def is_employer(self):
+        return self.employer_id is not None
+
+    @property
+    def role(self):
+        """'job_seeker', 'employer' или None, если профиль ещё не создан"""
+        if self.is_job_seeker:
+            return 'job_seeker'
+        if self.is_employer:
+            return 'employer'
+        return None
+
+    def _load(self, model, pk):
+        if pk is None:
+            raise model.DoesNotExist(f"У пользователя нет профиля {model._meta.verbose_name}")
+        if model not in self._instances:
+            instance = model.objects.get(pk=pk)
+            # Пользователь профиля - это пользователь запроса, повторно его не загружаем
+            instance.user = self.user
+            self._instances[model] = instance
+        return self._instances[model]
+
+    def get_job_seeker(self):
+        """Профиль соискателя; ``JobSeekerProfile.DoesNotExist``, если его нет"""
+        return self._load(JobSeekerProfile, self.job_seeker_id)
+
+    def get_employer(self):
+        """Профиль работодателя; ``EmployerProfile.DoesNotExist``, если его нет"""
+        return self._load(EmployerProfile, self.employer_id)
+
+
+def resolve(user):
+    """Определяет профили пользователя одним запросом"""
+    row = (
+        User.objects.filter(pk=user.pk)
+        .values_list('job_seeker_profile__id', 'job_seeker_profile__slug', 'employer_profile__id', 'employer_profile__slug')
+        .first()
+    ) or (None, None, None, None)
+    job_seeker = row[:2] if row[0] is not None else None
+    employer = row[2:] if row[2] is not None else None
+    return job_seeker, employer
+
+
+def get_profile(request):
+    user = request.user
+    if not user.is_authenticated:
+        return RequestProfile(user)
+    generation = caching.generation(profile_namespace(user.pk))
+    stored = request.session.get(SESSION_KEY)
+    if stored and stored.get('user') == user.pk and stored.get('generation') == generation:
+        return RequestProfile(user, stored['job_seeker'], stored['employer'])
+    job_seeker, employer = resolve(user)
+    request.session[SESSION_KEY] = {
+        'user': user.pk,
+        'generation': generation,
+        'job_seeker': list(job_seeker) if job_seeker else None,
+        'employer': list(employer) if employer else None,
+    }
+    return RequestProfile(user, job_seeker, employer)
+
+
+async def aresolve_profile(request):
+    """``request.profile`` для асинхронных представлений
+
+    Сессия и кеш читаются в потоке, после этого атрибуты профиля доступны без обращений к базе.
+    """
+    await sync_to_async(lambda: request.profile.role)()
+    return request.profile
+
+
+class ProfileMiddleware(MiddlewareMixin):
+    """Добавляет ``request.profile``; профиль определяется при первом обращении"""
+
+    def process_request(self, request):
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
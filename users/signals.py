@@ -0,0 +1,16 @@
+"""Обработчики сигналов моделей приложения пользователей"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import caching
+from .middleware import profile_namespace
+from .models import EmployerProfile, JobSeekerProfile
+
+
+@receiver(post_save, sender=JobSeekerProfile)
+@receiver(post_delete, sender=JobSeekerProfile)
+@receiver(post_save, sender=EmployerProfile)
+@receiver(post_delete, sender=EmployerProfile)
+def profile_changed(sender, instance, **kwargs):
+    """Сессии пользователя должны заново определить его профили (см. users/middleware.py)"""
+    caching.bump(profile_namespace(instance.user_id))
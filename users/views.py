@@ -9,6 +9,8 @@ from django.contrib import messages
 from .models import JobSeekerProfile, EmployerProfile
 from .forms import JobSeekerProfileForm, EmployerProfileForm, UserRegistrationForm
 from jobs.models import JobApplication, JobVacancy
+from core.replicas import ReplicaReadMixin
+from .dashboard import build_dashboard
 
 class UserRegistrationView(CreateView):
     """Представление для регистрации пользователя"""
@@ -98,7 +100,7 @@ class JobSeekerProfileUpdateView(LoginRequiredMixin, UserPassesTestMixin, Update
         return context
 
 
-class JobSeekerProfileDetailView(DetailView):
+class JobSeekerProfileDetailView(ReplicaReadMixin, DetailView):
     """Представление просмотра профиля соискателя"""
     model = JobSeekerProfile
     template_name = 'users/job_seeker_profile.html'
@@ -155,7 +157,7 @@ class EmployerProfileUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateV
         return context
 
 
-class EmployerProfileDetailView(DetailView):
+class EmployerProfileDetailView(ReplicaReadMixin, DetailView):
     """Представление просмотра профиля работодателя"""
     model = EmployerProfile
     template_name = 'users/employer_profile.html'
@@ -184,24 +186,6 @@ class UserDashboardView(LoginRequiredMixin, TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        
-        try:
-            # Проверяем, является ли пользователь соискателем
-            job_seeker_profile = JobSeekerProfile.objects.get(user=user)
-            context['profile_type'] = 'job_seeker'
-            context['profile'] = job_seeker_profile
-            context['applications'] = JobApplication.objects.filter(job_seeker=job_seeker_profile)[:5]
-        except JobSeekerProfile.DoesNotExist:
-            try:
-                # Проверяем, является ли пользователь работодателем
-                employer_profile = EmployerProfile.objects.get(user=user)
-                context['profile_type'] = 'employer'
-                context['profile'] = employer_profile
-                context['vacancies'] = JobVacancy.objects.filter(employer=employer_profile)[:5]
-                context['applications'] = JobApplication.objects.filter(vacancy__employer=employer_profile)[:5]
-            except EmployerProfile.DoesNotExist:
-                # Профиль еще не создан
-                context['profile_type'] = None
-        
+        # Профиль, последние вакансии и заявки, счётчики по статусам (см. users/dashboard.py)
+        context.update(build_dashboard(self.request.profile).context())
         return context